@@ -1,11 +1,20 @@
 import pandas as pd
-import ast
-from sklearn.impute import SimpleImputer
-from sklearn.compose import ColumnTransformer
 import requests
 import datetime
 import numpy as np
 import sqlite3
+import re
+import gzip
+import io
+import os
+import collections
+import contextlib
+import json
+import zlib
+import hashlib
+import base64
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 '''Web scraping function to fetch laptop data from Amazon using SerpAPI'''
 
@@ -46,13 +55,251 @@ def web_scraping():
     print("Scraping complete. Data saved to 'amazon_scrape_data.csv'.")
 
 
+'''raw snapshot archive'''
+
+RAW_ARCHIVE_DIR = "raw_archive"
+URL_PREFIX_PATTERN = r'^(https?://[^/?#]+/(?:[A-Za-z_.]+/)*(?:[A-Za-z_.]+\?)?)'  # host plus plain path stems like /sspa/click? or /dp/
+
+
+def _load_url_prefixes(archive_dir):
+    path = os.path.join(archive_dir, "url_prefixes.json")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_url_prefixes(prefixes, archive_dir):
+    path = os.path.join(archive_dir, "url_prefixes.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(prefixes, f, indent=0)
+    os.replace(tmp_path, path)
+
+
+def archive_raw_snapshot(csv_path="amazon_scrape_data.csv", archive_dir=RAW_ARCHIVE_DIR):
+    """
+    Store the raw scrape as one zstd-compressed Parquet file per scrape date.
+    URL columns are split into an id into a shared dictionary of repeated URL prefixes
+    ('https://www.amazon.com/sspa/', 'https://serpapi.com/search.json?', ...) plus the remaining suffix.
+    The dictionary is append-only, so ids stay valid for every older snapshot.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(archive_dir, exist_ok=True)
+    df = pd.read_csv(csv_path)
+    prefixes = _load_url_prefixes(archive_dir)
+    prefix_ids = {prefix: i for i, prefix in enumerate(prefixes)}
+
+    for col in df.select_dtypes(include=['object']).columns:
+        values = df[col]
+        is_url = values.astype(str).str.startswith(('http://', 'https://'))
+        if not is_url.any() or not is_url[values.notna()].all():
+            continue
+        prefix = values.str.extract(URL_PREFIX_PATTERN, expand=False)
+        # one-off prefixes (product slugs) aren't worth a dictionary entry
+        counts = prefix.value_counts()
+        for new_prefix in counts[counts > 1].index:
+            if new_prefix not in prefix_ids:
+                prefix_ids[new_prefix] = len(prefixes)
+                prefixes.append(new_prefix)
+        prefix = prefix.where(prefix.isin(prefix_ids))
+        df[f"{col}__prefix"] = prefix.map(prefix_ids).astype('Int32')
+        df[col] = [v[len(p):] if isinstance(p, str) else v for v, p in zip(values, prefix)]
+
+    _save_url_prefixes(prefixes, archive_dir)
+
+    written = []
+    for scrape_date, snapshot in df.groupby('scrape_date'):
+        path = os.path.join(archive_dir, f"{scrape_date}.parquet")
+        table = pa.Table.from_pandas(snapshot.reset_index(drop=True), preserve_index=False)
+        pq.write_table(table, path, compression='zstd', compression_level=9, use_dictionary=True)
+        written.append(path)
+    print(f"🗄️ Archived raw snapshot(s): {', '.join(written)}")
+    return written
+
+
+def list_raw_snapshots(archive_dir=RAW_ARCHIVE_DIR):
+    """
+    Scrape dates with an archived raw snapshot, oldest first
+    """
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(name[:-len(".parquet")] for name in os.listdir(archive_dir) if name.endswith(".parquet"))
+
+
+def read_raw_snapshot(scrape_date, columns=None, archive_dir=RAW_ARCHIVE_DIR):
+    """
+    Read one archived raw snapshot. Only the requested columns are read and decompressed;
+    URL columns are rebuilt from the prefix dictionary.
+    """
+    import pyarrow.parquet as pq
+
+    path = os.path.join(archive_dir, f"{pd.Timestamp(scrape_date).strftime('%Y-%m-%d')}.parquet")
+    stored = pq.read_schema(path).names
+    if columns is None:
+        columns = [col for col in stored if not col.endswith("__prefix")]
+    url_cols = [col for col in columns if f"{col}__prefix" in stored]
+    read_cols = list(columns) + [f"{col}__prefix" for col in url_cols]
+
+    df = pq.read_table(path, columns=read_cols).to_pandas()
+    if url_cols:
+        prefixes = dict(enumerate(_load_url_prefixes(archive_dir)))
+        for col in url_cols:
+            prefix = df.pop(f"{col}__prefix").map(prefixes)
+            df[col] = df[col].where(prefix.isna(), prefix + df[col])
+    return df[list(columns)]
+
+
+'''validation of the scraped data'''
+
+ASIN_PATTERN = r'[A-Z0-9]{10}'
+
+def _as_number(values):
+    # non-numeric text becomes NaN so the range rules below reject it
+    return pd.to_numeric(values, errors='coerce')
+
+# (rule, column, check) - each check is vectorized and returns True where the value is acceptable
+VALIDATION_RULES = [
+    ('asin_format', 'asin', lambda s: s.astype(str).str.fullmatch(ASIN_PATTERN)),
+    ('title_present', 'title', lambda s: s.fillna('').astype(str).str.strip() != ''),
+    ('price_positive', 'extracted_price', lambda s: _as_number(s) > 0),
+    ('rating_range', 'rating', lambda s: s.isna() | _as_number(s).between(0, 5)),
+    ('reviews_non_negative', 'reviews', lambda s: s.isna() | (_as_number(s) >= 0)),
+    ('scrape_date_valid', 'scrape_date', lambda s: pd.to_datetime(s, errors='coerce', format='ISO8601').notna()),
+    ('specs_format', 'specs', lambda s: s.isna() | s.astype(str).str.fullmatch(r'\{.*\}')),
+]
+
+def validate_batch(df):
+    """
+    Run every rule over the whole batch in one pass.
+    Returns (valid rows, rejected rows with a 'reasons' column, {rule: failure count})
+    """
+    passed = pd.DataFrame({rule: check(df[column]).fillna(False).astype(bool)
+                           for rule, column, check in VALIDATION_RULES}, index=df.index)
+    ok = passed.all(axis=1)
+    failed = ~passed[~ok]
+    rejected = df[~ok].copy()
+    rejected['reasons'] = failed.dot(failed.columns + ';').str.rstrip(';')
+    failures = (~passed).sum().astype(int).to_dict()
+    return df[ok], rejected, failures
+
+def record_validation(rejected, failures, db_path="laptop_prices.db"):
+    """
+    Store the rejected rows in `quarantine` and one `validation_runs` row per rule for this run
+    """
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS quarantine (
+            run_id TEXT,
+            asin TEXT,
+            scrape_date TEXT,
+            reasons TEXT,
+            raw TEXT
+        );
+        CREATE TABLE IF NOT EXISTS validation_runs (
+            run_id TEXT,
+            rule TEXT,
+            failures INTEGER
+        );
+    """)
+    run_id = datetime.datetime.now().isoformat()
+    raw = rejected.drop(columns=['reasons']).to_json(orient='records', lines=True, date_format='iso')
+    conn.executemany(
+        "INSERT INTO quarantine (run_id, asin, scrape_date, reasons, raw) VALUES (?, ?, ?, ?, ?)",
+        zip([run_id] * len(rejected), rejected['asin'].astype(str), rejected['scrape_date'].astype(str),
+            rejected['reasons'], raw.splitlines())
+    )
+    conn.executemany(
+        "INSERT INTO validation_runs (run_id, rule, failures) VALUES (?, ?, ?)",
+        [(run_id, rule, count) for rule, count in failures.items()] + [(run_id, 'quarantined', len(rejected))]
+    )
+    conn.commit()
+    conn.close()
+    if len(rejected):
+        print(f"🚧 Quarantined {len(rejected)} rows: " + ", ".join(f"{r}={n}" for r, n in failures.items() if n))
+    return run_id
+
+
+'''change detection'''
+
+# what makes a listing "changed"; delivery dates and tracking links move every scrape and are left out
+FINGERPRINT_COLUMNS = ['title', 'extracted_price', 'rating', 'reviews', 'specs', 'thumbnail']
+
+def content_fingerprints(df):
+    """
+    Vectorized per-row hash of FINGERPRINT_COLUMNS as a hex string
+    """
+    values = df[FINGERPRINT_COLUMNS]
+    # missing is NaN read from CSV but None read from the Parquet archive; both must hash alike
+    hashes = pd.util.hash_pandas_object(values.where(values.notna(), np.nan).astype(str), index=False)
+    return hashes.map('{:016x}'.format)
+
+def _init_fingerprint_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS listing_fingerprints (
+            asin TEXT PRIMARY KEY,
+            content_hash TEXT,
+            scrape_date TEXT
+        );
+        CREATE TABLE IF NOT EXISTS listing_seen (
+            asin TEXT,
+            scrape_date TEXT,
+            PRIMARY KEY (asin, scrape_date)
+        );
+    """)
+
+def load_fingerprints(db_path="laptop_prices.db"):
+    conn = sqlite3.connect(db_path)
+    _init_fingerprint_tables(conn)
+    df = pd.read_sql_query("SELECT asin, content_hash FROM listing_fingerprints", conn)
+    conn.close()
+    return df.set_index('asin')['content_hash']
+
+def skip_unchanged(df, fingerprints, db_path="laptop_prices.db"):
+    """
+    Tag raw rows with their content_hash and split off the ones identical to the ASIN's last stored observation.
+    Those only get a "seen again" marker in listing_seen; the changed rows are returned for the full pipeline.
+    """
+    if 'content_hash' not in df.columns:  # the replay hashes the raw rows before cleaning them
+        df = df.assign(content_hash=content_fingerprints(df))
+    unchanged = df['content_hash'].eq(df['asin'].map(fingerprints))
+    seen = df.loc[unchanged, ['asin', 'scrape_date']]
+    if len(seen):
+        conn = sqlite3.connect(db_path)
+        _init_fingerprint_tables(conn)
+        conn.executemany(
+            "INSERT OR IGNORE INTO listing_seen (asin, scrape_date) VALUES (?, ?)",
+            zip(seen['asin'], pd.to_datetime(seen['scrape_date'], format='ISO8601').dt.strftime('%Y-%m-%d'))
+        )
+        conn.commit()
+        conn.close()
+    return df[~unchanged], int(unchanged.sum())
+
+def store_fingerprints(df, db_path="laptop_prices.db"):
+    """
+    Remember the content_hash of the rows just written, so the next scrape can skip them if nothing moved
+    """
+    rows = df.dropna(subset=['content_hash']).sort_values('scrape_date').drop_duplicates('asin', keep='last')
+    conn = sqlite3.connect(db_path)
+    _init_fingerprint_tables(conn)
+    conn.executemany(
+        "INSERT OR REPLACE INTO listing_fingerprints (asin, content_hash, scrape_date) VALUES (?, ?, ?)",
+        zip(rows['asin'], rows['content_hash'], pd.to_datetime(rows['scrape_date']).dt.strftime('%Y-%m-%d'))
+    )
+    conn.commit()
+    conn.close()
+
+
 '''cleaning functions for the scraped data'''
 
-def clean_delivery(col):
-    try:
-        return str(col)[2:15]
-    except:
-        return "Info not available"
+def clean_delivery(values):
+    """
+    First entry of the scraped delivery list, e.g. "['FREE delivery Wed, Apr 22', ...]" -> 'FREE delivery Wed, Apr 22'
+    """
+    first = values.astype(str).str.extract(r"""^\[\s*(?:'([^']*)'|"([^"]*)")""")
+    return first[0].fillna(first[1]).fillna("Info not available")
 
 def change_datatype(df):
     df['extracted_price'] = df['extracted_price'].astype(float)
@@ -61,13 +308,40 @@ def change_datatype(df):
     df['scrape_date'] = pd.to_datetime(df['scrape_date'])
     return df
 
-def parse_specs(spec_str):
-    DEFAULT_KEYS = ['display_size', 'ram', 'disk_size', 'operating_system']
-    try:
-        spec_dict = ast.literal_eval(spec_str)
-        return pd.Series({key: spec_dict.get(key) for key in DEFAULT_KEYS})
-    except:
-        return pd.Series({key: None for key in DEFAULT_KEYS})
+SPEC_KEYS = ['display_size', 'ram', 'disk_size', 'operating_system']
+
+def parse_specs(specs):
+    """
+    Vectorized read of the spec keys out of the scraped dict strings; missing keys and values come back as None
+    """
+    text = specs.astype(str)
+    parsed = {}
+    for key in SPEC_KEYS:
+        value = text.str.extract(rf"""'{key}':\s*(?:'([^']*)'|"([^"]*)")""")
+        value = value[0].fillna(value[1]).astype(object)
+        parsed[key] = value.where(value.notna(), None)
+    return pd.DataFrame(parsed, index=specs.index)
+
+BRANDS = ['Apple', 'Lenovo', 'Dell', 'HP', 'Asus', 'Acer', 'MSI', 'Samsung', 'Microsoft', 'LG']
+
+def extract_brand(titles):
+    """
+    Vectorized brand extraction from a Series of titles (first matching brand wins, else 'Other')
+    """
+    upper = titles.fillna('').astype(str).str.upper()
+    brand = pd.Series('Other', index=titles.index, dtype=object)
+    for name in reversed(BRANDS):
+        brand = brand.mask(upper.str.contains(name.upper(), regex=False), name)
+    return brand
+
+def spec_to_gb(values):
+    """
+    Vectorized '16 GB' / '1 TB' / '512 MB' -> float GB, NaN when the spec isn't a size
+    """
+    parts = values.astype(str).str.extract(r'([\d.]+)\s*(TB|GB|MB)', flags=re.IGNORECASE)
+    size = pd.to_numeric(parts[0], errors='coerce')
+    unit = parts[1].str.upper().map({'TB': 1024.0, 'GB': 1.0, 'MB': 1 / 1024})
+    return size * unit
 
 def clean_spec_values(df):
     """
@@ -78,12 +352,17 @@ def clean_spec_values(df):
         df[col] = df[col].fillna("Info not available")
     return df
 
-def data_cleaning(df='amazon_scrape_data.csv'):
-    df = pd.read_csv(df)
-    df = df[['rating', 'reviews', 'extracted_price', 'asin', 'title', 'link_clean', 'thumbnail', 'delivery', 'scrape_date', 'specs']]
+RAW_COLUMNS = ['rating', 'reviews', 'extracted_price', 'asin', 'title', 'link_clean', 'thumbnail', 'delivery', 'scrape_date', 'specs']
+
+def clean_chunk(df):
+    """
+    Steps 1-4 of the cleaning: row-level parsing and normalizing that needs no global statistics,
+    so it can run on any slice of the raw data independently
+    """
+    df = df[RAW_COLUMNS + [col for col in ['content_hash'] if col in df.columns]]
 
     # Step 1: Parse specs
-    specs_df = df['specs'].apply(parse_specs)
+    specs_df = parse_specs(df['specs'])
     df = pd.concat([df.drop(columns=['specs']), specs_df], axis=1)
 
     # Step 2: Clean spec fields
@@ -93,23 +372,406 @@ def data_cleaning(df='amazon_scrape_data.csv'):
     df = change_datatype(df)
 
     # Step 4: Clean delivery info
-    df['delivery'] = df['delivery'].fillna('Info not available').apply(clean_delivery)
+    df['delivery'] = clean_delivery(df['delivery'].fillna('Info not available'))
+    return df
 
-    # Step 5: Impute only numerical columns
-    numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    imputer = SimpleImputer(strategy='mean')
-    df[numerical_cols] = imputer.fit_transform(df[numerical_cols])
+def data_cleaning(df='amazon_scrape_data.csv', db_path="laptop_prices.db"):
+    df = pd.read_csv(df, usecols=RAW_COLUMNS)
 
-    # step:6 fill missing categorical columns with 'Info not available'
-    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
-    df[categorical_cols] = df[categorical_cols].fillna("Info not available")
+    # Step 0: validate the raw rows, failures go to the quarantine table
+    df, rejected, failures = validate_batch(df)
+    record_validation(rejected, failures, db_path=db_path)
+
+    # Listings identical to their last stored observation skip the rest of the pipeline;
+    # duplicates go first so the row compared is the same one step 7 would keep
+    df = df.drop_duplicates(subset=["asin"], keep="first")
+    df, unchanged = skip_unchanged(df, load_fingerprints(db_path=db_path), db_path=db_path)
+    print(f"♻️ {unchanged} unchanged listings marked as seen, {len(df)} changed or new.")
+    if df.empty:
+        df.to_csv('cleaned_Data.csv')
+        return df
+
+    # Steps 1-4: parse specs, clean spec fields, fix data types, clean delivery info
+    df = clean_chunk(df)
+
+    # Steps 5-6: impute numerical columns, fill categorical ones
+    df = fill_missing(df, db_path=db_path)
 
     # step 7 : handling duplicated
     df = df.drop_duplicates(subset=["asin"], keep="first")
+
+    # step 8 : group near-duplicate listings of the same model
+    df = assign_model_groups(df, db_path=db_path)
     
     df.to_csv('cleaned_Data.csv')
     return df
 
+IMPUTE_COLUMNS = ['extracted_price', 'rating', 'reviews']
+# most specific grouping first; the empty level is the global mean
+IMPUTE_LEVELS = [('brand', 'ram_bucket', 'disk_bucket'), ('brand', 'ram_bucket'), ('brand',), ()]
+IMPUTE_MIN_GROUP = 3  # a group needs this many observations before its mean is trusted
+
+def _impute_keys(df):
+    """
+    Group keys for every imputation level: brand plus RAM and storage buckets
+    """
+    ram = spec_to_gb(df['ram'])
+    disk = spec_to_gb(df['disk_size'])
+    parts = pd.DataFrame({
+        'brand': extract_brand(df['title']),
+        'ram_bucket': pd.cut(ram, [0, 4, 8, 16, 32, np.inf], labels=['<=4', '8', '16', '32', '64+']).astype(object).fillna('unknown'),
+        'disk_bucket': pd.cut(disk, [0, 128, 256, 512, 1024, np.inf], labels=['<=128', '256', '512', '1TB', '2TB+']).astype(object).fillna('unknown'),
+    }, index=df.index)
+    keys = {}
+    for level in IMPUTE_LEVELS:
+        key = pd.Series('all', index=df.index)
+        if level:
+            key = parts[level[0]]
+            for part in level[1:]:
+                key = key + '|' + parts[part]
+        keys['|'.join(level) or 'global'] = key
+    return keys
+
+def update_imputation_stats(df, keys, db_path="laptop_prices.db"):
+    """
+    Fold a batch's observed values into the persisted per-group sums and counts.
+    Each scrape date is absorbed only once, so re-running a batch doesn't double count it.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS imputation_stats (
+            level TEXT NOT NULL,
+            group_key TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            n REAL NOT NULL,
+            total REAL NOT NULL,
+            PRIMARY KEY (level, group_key, column_name)
+        );
+        CREATE TABLE IF NOT EXISTS imputation_batches (scrape_date TEXT PRIMARY KEY);
+    """)
+    dates = df['scrape_date'].dt.strftime('%Y-%m-%d')
+    absorbed = {row[0] for row in conn.execute("SELECT scrape_date FROM imputation_batches")}
+    fresh = ~dates.isin(absorbed)
+
+    if fresh.any():
+        batch = df.loc[fresh, IMPUTE_COLUMNS]
+        frames = []
+        for level, key in keys.items():
+            grouped = batch.groupby(key[fresh])
+            agg = pd.DataFrame({'n': grouped.count().stack(), 'total': grouped.sum().stack()}).reset_index()
+            agg.columns = ['group_key', 'column_name', 'n', 'total']
+            agg.insert(0, 'level', level)
+            frames.append(agg[agg['n'] > 0])
+        rows = pd.concat(frames, ignore_index=True).values.tolist()
+        conn.executemany("""
+            INSERT INTO imputation_stats (level, group_key, column_name, n, total) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(level, group_key, column_name) DO UPDATE SET n = n + excluded.n, total = total + excluded.total
+        """, rows)
+        conn.executemany("INSERT OR IGNORE INTO imputation_batches (scrape_date) VALUES (?)",
+                         [(d,) for d in dates[fresh].unique()])
+        conn.commit()
+
+    stats = pd.read_sql_query("SELECT * FROM imputation_stats", conn)
+    conn.close()
+    return stats
+
+def fill_missing(df, db_path="laptop_prices.db"):
+    # Step 5: Impute numerical columns from the closest brand / RAM / storage group with enough history
+    keys = _impute_keys(df)
+    stats = update_imputation_stats(df, keys, db_path=db_path)
+    stats = stats[stats['n'] >= IMPUTE_MIN_GROUP]
+    stats = stats.assign(mean=stats['total'] / stats['n'])
+    means = {
+        (level, column): group.set_index('group_key')['mean']
+        for (level, column), group in stats.groupby(['level', 'column_name'])
+    }
+    # imputed ratings are estimates: the event log compares observed ones only
+    df['rating_imputed'] = np.where(df['rating'].isna(), 'Yes', 'No')
+    for column in IMPUTE_COLUMNS:
+        for level, key in keys.items():
+            missing = df[column].isna()
+            if not missing.any() or (level, column) not in means:
+                continue
+            df.loc[missing, column] = key[missing].map(means[(level, column)])
+        # no history at all for this column yet: fall back to the batch mean
+        df[column] = df[column].fillna(df[column].mean())
+
+    # step:6 fill missing categorical columns with 'Info not available'
+    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+    df[categorical_cols] = df[categorical_cols].fillna("Info not available")
+    return df
+
+def _drop_seen_asins(chunk, seen):
+    """
+    Global dedup across chunks: keep the first row per (asin, scrape_date) ever seen
+    """
+    dates = pd.to_datetime(chunk['scrape_date'], format='ISO8601').dt.strftime('%Y-%m-%d')  # validated already
+    keys = chunk['asin'].astype(str) + '|' + dates
+    keep = ~keys.isin(seen) & ~keys.duplicated()
+    seen.update(keys[keep])
+    return chunk[keep]
+
+def data_cleaning_chunked(paths='amazon_scrape_data.csv', chunksize=20000, workers=None, output='cleaned_Data.csv',
+                          db_path="laptop_prices.db"):
+    """
+    Chunked, multi-process version of data_cleaning for large raw dumps (or a list of them):
+    only the needed columns are read, chunk by chunk, and the parse/normalize work (steps 1-4)
+    is fanned out to a process pool. At most 2 chunks per worker are in flight, so memory stays bounded.
+    As in data_cleaning, chunks are validated before they are deduplicated on asin (per scrape date),
+    so a rejected row never hides a valid copy of its listing; unchanged listings are skipped as they are read,
+    results are merged in file order, then imputed once.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    workers = workers or os.cpu_count() or 1
+
+    seen = set()
+    parts, rejected = [], []
+    failures = collections.Counter()
+
+    fingerprints = load_fingerprints(db_path=db_path)
+    unchanged = 0
+    pending = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path in paths:
+            for chunk in pd.read_csv(path, usecols=RAW_COLUMNS, chunksize=chunksize):
+                chunk, chunk_rejected, chunk_failures = validate_batch(chunk)
+                rejected.append(chunk_rejected)
+                failures.update(chunk_failures)
+                chunk = _drop_seen_asins(chunk, seen)
+                chunk, chunk_unchanged = skip_unchanged(chunk, fingerprints, db_path=db_path)
+                unchanged += chunk_unchanged
+                if chunk.empty:
+                    continue
+                pending.append(pool.submit(clean_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    parts.append(pending.popleft().result())
+        while pending:
+            parts.append(pending.popleft().result())
+
+    if rejected:
+        record_validation(pd.concat(rejected, ignore_index=True), dict(failures), db_path=db_path)
+    print(f"♻️ {unchanged} unchanged listings marked as seen.")
+    if not parts:
+        df = pd.DataFrame(columns=RAW_COLUMNS)
+        df.to_csv(output)
+        return df
+    df = pd.concat(parts, ignore_index=True)
+    df = fill_missing(df, db_path=db_path)
+    df = assign_model_groups(df, db_path=db_path)
+
+    df.to_csv(output)
+    print(f"🧹 Cleaned {len(df)} rows from {len(paths)} file(s) with {workers} workers.")
+    return df
+
+
+'''near-duplicate model groups'''
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16                  # 16 bands of 4 rows: pairs above ~0.5 title similarity usually share a bucket
+MINHASH_THRESHOLD = 0.6         # estimated title Jaccard needed to link two listings
+SHINGLE_SIZE = 5                # character shingles of the normalized title
+_MINHASH_PRIME = np.uint64((1 << 31) - 1)
+_MINHASH_RNG = np.random.RandomState(20240601)
+_MINHASH_A = _MINHASH_RNG.randint(1, (1 << 31) - 1, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+_MINHASH_B = _MINHASH_RNG.randint(0, (1 << 31) - 1, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+
+
+def minhash_signatures(titles):
+    """
+    MinHash signature (n_titles x MINHASH_PERMUTATIONS) of each title's character shingles
+    """
+    normalized = titles.fillna('').astype(str).str.lower().str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+    signatures = np.full((len(normalized), MINHASH_PERMUTATIONS), _MINHASH_PRIME, dtype=np.uint64)
+    for i, title in enumerate(normalized):
+        shingles = {title[j:j + SHINGLE_SIZE] for j in range(max(len(title) - SHINGLE_SIZE + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(sh.encode()) for sh in shingles), dtype=np.uint64, count=len(shingles))
+        signatures[i] = ((_MINHASH_A[:, None] * hashes[None, :] + _MINHASH_B[:, None]) % _MINHASH_PRIME).min(axis=1)
+    return signatures
+
+
+def lsh_buckets(signatures):
+    """
+    One bucket id per band (n_titles x LSH_BANDS), hashing each band's rows together
+    """
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    banded = signatures.reshape(len(signatures), LSH_BANDS, rows)
+    weights = np.array([1000003 ** j for j in range(rows)], dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        buckets = (banded * weights).sum(axis=2)
+    return (buckets & np.uint64((1 << 63) - 1)).astype(np.int64)
+
+
+SPEC_KEY_FIELDS = ['ram', 'disk_size', 'display_size']
+UNKNOWN_SPEC_VALUES = {'Info not available', 'nan', 'None', ''}
+
+
+def _title_model_tokens(titles):
+    """
+    The sorted tokens of each title that carry a digit (16gb, rtx 5060 -> 5060, i7-14650hx -> i7, 14650hx),
+    which tell apart models whose titles otherwise read the same
+    """
+    text = titles.fillna('').astype(str).str.lower()
+    text = text.str.replace(r'(\d)\s*(gb|tb|ghz|hz|inch|in)\b', r'\1\2', regex=True)
+    return text.str.findall(r'[a-z]*\d[a-z0-9]*').map(lambda tokens: ','.join(sorted(set(tokens))))
+
+
+def _spec_keys(df):
+    """
+    brand|ram|disk|display|title model tokens: unknown spec fields are '?' and never match on their own,
+    the title tokens then still have to agree
+    """
+    key = extract_brand(df['title'])
+    for col in SPEC_KEY_FIELDS:
+        values = df[col].astype(str).str.strip()
+        key = key + '|' + values.where(~values.isin(UNKNOWN_SPEC_VALUES), '?')
+    return key + '|' + _title_model_tokens(df['title'])
+
+
+def _connected_components(n, left, right):
+    """
+    Component label of each of n nodes joined by the edges left[i]-right[i] (union-find)
+    """
+    parent = list(range(n))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for a, b in zip(left.tolist(), right.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+    return np.array([find(node) for node in range(n)], dtype=np.int64)
+
+
+def _init_model_group_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS model_groups (
+            asin TEXT PRIMARY KEY,
+            model_group_id TEXT NOT NULL,
+            spec_key TEXT,
+            signature BLOB
+        );
+        CREATE INDEX IF NOT EXISTS idx_model_groups_group ON model_groups(model_group_id);
+        CREATE TABLE IF NOT EXISTS model_group_bands (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            asin TEXT NOT NULL,
+            PRIMARY KEY (band, bucket, asin)
+        );
+    """)
+
+
+def assign_model_groups(df, db_path="laptop_prices.db"):
+    """
+    Give every listing a model_group_id shared by near-duplicate ASINs (colour/config variants, resellers):
+    titles must look alike under MinHash/LSH, brand, RAM, storage and display must be equal (an unknown
+    one only matches another unknown one) and so must the titles' digit-bearing tokens, which keep e.g. RTX 5050 and 5060 builds apart.
+    Only ASINs never seen before are hashed; they are matched against each other and, through the
+    persisted LSH buckets, against the existing catalogue, so nothing is compared pairwise.
+    """
+    conn = sqlite3.connect(db_path)
+    _init_model_group_tables(conn)
+
+    listings = df
+    if conn.execute("SELECT 1 FROM model_groups WHERE spec_key NOT LIKE '%|%|%|%|%' LIMIT 1").fetchone():
+        # groups keyed before the title tokens were part of the spec key: group the whole catalogue again
+        conn.executescript("DELETE FROM model_groups; DELETE FROM model_group_bands;")
+        if conn.execute("PRAGMA main.table_info(laptops)").fetchall():
+            catalogue = pd.read_sql_query(
+                f"SELECT asin, title, {', '.join(SPEC_KEY_FIELDS)} FROM laptops ORDER BY scrape_date DESC", conn
+            )
+            listings = pd.concat([df, catalogue], ignore_index=True)
+    known = pd.read_sql_query("SELECT asin FROM model_groups", conn)['asin']
+    new = listings.loc[~listings['asin'].isin(known)].drop_duplicates(subset=['asin'])
+    if not new.empty:
+        signatures = minhash_signatures(new['title'])
+        buckets = lsh_buckets(signatures)
+        new_bands = pd.DataFrame({
+            'band': np.tile(np.arange(LSH_BANDS), len(new)),
+            'bucket': buckets.ravel(),
+            'asin': np.repeat(new['asin'].to_numpy(), LSH_BANDS),
+        })
+
+        # candidates already in the catalogue, found through the bucket index
+        conn.execute("CREATE TEMP TABLE new_bands (band INTEGER, bucket INTEGER, asin TEXT)")
+        conn.executemany("INSERT INTO new_bands VALUES (?, ?, ?)", new_bands.values.tolist())
+        old = pd.read_sql_query("""
+            SELECT DISTINCT g.asin, g.model_group_id, g.spec_key, g.signature
+            FROM new_bands n
+            JOIN model_group_bands b ON b.band = n.band AND b.bucket = n.bucket
+            JOIN model_groups g ON g.asin = b.asin
+        """, conn)
+        conn.execute("DROP TABLE new_bands")
+
+        nodes = pd.concat([
+            pd.DataFrame({'asin': new['asin'].to_numpy(), 'model_group_id': None, 'spec_key': _spec_keys(new).to_numpy()}),
+            old[['asin', 'model_group_id', 'spec_key']],
+        ], ignore_index=True)
+        all_signatures = np.vstack([signatures] + [
+            np.frombuffer(blob, dtype=np.uint64) for blob in old['signature']
+        ]) if len(old) else signatures
+        node_ids = pd.Series(np.arange(len(nodes)), index=nodes['asin'])
+
+        # candidate pairs: any shared (band, bucket), within the batch or against the catalogue
+        all_bands = pd.concat([new_bands, pd.DataFrame({
+            'band': np.tile(np.arange(LSH_BANDS), len(old)),
+            'bucket': lsh_buckets(all_signatures[len(new):]).ravel() if len(old) else np.array([], dtype=np.int64),
+            'asin': np.repeat(old['asin'].to_numpy(), LSH_BANDS),
+        })], ignore_index=True)
+        all_bands['node'] = node_ids.reindex(all_bands['asin']).to_numpy()
+        pairs = all_bands.merge(all_bands, on=['band', 'bucket'])
+        # old-old pairs were already decided on earlier runs
+        pairs = pairs.loc[(pairs['node_x'] < pairs['node_y']) & (pairs['node_x'] < len(new)), ['node_x', 'node_y']].drop_duplicates()
+        left, right = pairs['node_x'].to_numpy(), pairs['node_y'].to_numpy()
+
+        # verify: same specs and enough estimated title similarity
+        similarity = (all_signatures[left] == all_signatures[right]).mean(axis=1) if len(pairs) else np.array([])
+        spec = nodes['spec_key'].to_numpy()
+        keep = (similarity >= MINHASH_THRESHOLD) & (spec[left] == spec[right]) if len(pairs) else np.array([], dtype=bool)
+        nodes['component'] = _connected_components(len(nodes), left[keep], right[keep])
+
+        # a component keeps the smallest existing group id it touches, or starts a new one
+        existing = nodes.dropna(subset=['model_group_id']).groupby('component')['model_group_id'].min()
+        fresh_ids = 'MG-' + nodes.groupby('component')['asin'].min()
+        nodes['new_group_id'] = nodes['component'].map(existing).fillna(nodes['component'].map(fresh_ids))
+
+        merged = nodes.dropna(subset=['model_group_id'])
+        merged = merged[merged['model_group_id'] != merged['new_group_id']]
+        conn.executemany(
+            "UPDATE model_groups SET model_group_id = ? WHERE model_group_id = ?",
+            merged[['new_group_id', 'model_group_id']].drop_duplicates().values.tolist()
+        )
+        new_nodes = nodes.iloc[:len(new)]
+        conn.executemany(
+            "INSERT INTO model_groups (asin, model_group_id, spec_key, signature) VALUES (?, ?, ?, ?)",
+            [(a, g, k, sig.tobytes()) for a, g, k, sig in zip(
+                new_nodes['asin'], new_nodes['new_group_id'], new_nodes['spec_key'], signatures
+            )]
+        )
+        conn.executemany("INSERT OR IGNORE INTO model_group_bands (band, bucket, asin) VALUES (?, ?, ?)",
+                         new_bands.values.tolist())
+        conn.commit()
+        print(f"🧩 Grouped {len(new)} new ASINs ({len(merged)} existing listings moved by group merges).")
+
+    conn.close()
+    df['model_group_id'] = df['asin'].map(fetch_model_groups(db_path=db_path))
+    return df
+
+
+def fetch_model_groups(db_path="laptop_prices.db"):
+    """
+    asin -> model_group_id for the whole catalogue
+    """
+    conn = sqlite3.connect(db_path)
+    _init_model_group_tables(conn)
+    groups = pd.read_sql_query("SELECT asin, model_group_id FROM model_groups", conn)
+    conn.close()
+    return groups.set_index('asin')['model_group_id']
+
 
 '''file merging part'''
 
@@ -136,6 +798,13 @@ def upsert_to_sqlite(df, db_path="laptop_prices.db", table_name="laptops"):
         );
     """)
 
+    # add columns introduced by newer pipeline stages to an existing table
+    existing_cols = {row[1] for row in cursor.execute(f'PRAGMA table_info("{table_name}")')}
+    for col in columns:
+        if col not in existing_cols:
+            col_type = 'REAL' if np.issubdtype(df[col].dtype, np.number) else 'TEXT'
+            cursor.execute(f'ALTER TABLE {table_name} ADD COLUMN "{col}" {col_type}')
+
     placeholders = ", ".join(["?"] * len(columns))
     columns_joined = ", ".join([f'"{col}"' for col in columns])
     update_clause = ", ".join([f'"{col}"=excluded."{col}"' for col in columns if col not in ['asin', 'scrape_date']])
@@ -152,106 +821,2220 @@ def upsert_to_sqlite(df, db_path="laptop_prices.db", table_name="laptops"):
     conn.close()
 
 
-def fetch_merged_data_from_sqlite(db_path="laptop_prices.db", table_name="laptops"):
+def create_indexes(db_path="laptop_prices.db", table_name="laptops"):
+    """
+    Index the deal-signal columns so deal lookups don't scan the whole table
+    """
     conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+    cursor = conn.cursor()
+    existing_cols = {row[1] for row in cursor.execute(f'PRAGMA table_info("{table_name}")')}
+    for col in DEAL_SIGNAL_COLS:
+        if col in existing_cols:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table_name}_{col} ON {table_name}("{col}", rating DESC)')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table_name}_asin_date ON {table_name}(asin, scrape_date)')
+    conn.commit()
+    conn.close()
+
+
+def fetch_merged_data_from_sqlite(db_path="laptop_prices.db", table_name="laptops", start_date=None, end_date=None):
+    conn = connect_partitioned(db_path, start_date, end_date, table_name, readonly=True)
+    df = pd.read_sql_query(f"SELECT * FROM {table_name}_all", conn)
     conn.close()
     return df
 
 
-def update_merged_data(new_data_path="cleaned_Data.csv", db_path="laptop_prices.db", table_name="laptops"):
+def fetch_listing_history(asins, db_path="laptop_prices.db", table_name="laptops", start_date=None, end_date=None):
+    """
+    Every stored row of the given ASINs, optionally limited to [start_date, end_date]
+    """
+    conn = connect_partitioned(db_path, start_date, end_date, table_name, readonly=True)
+    conn.execute("CREATE TEMP TABLE wanted_asins (asin TEXT PRIMARY KEY)")
+    conn.executemany("INSERT OR IGNORE INTO wanted_asins VALUES (?)", ((a,) for a in asins))
+    df = pd.read_sql_query(f"SELECT l.* FROM {table_name}_all l JOIN wanted_asins w ON w.asin = l.asin", conn)
+    conn.close()
+    return df
+
+
+def fetch_latest_listings(db_path="laptop_prices.db", table_name="laptops", start_date=None, end_date=None):
+    """
+    The most recent row of every ASIN (seen within [start_date, end_date] when given)
+    """
+    conn = connect_partitioned(db_path, start_date, end_date, table_name, readonly=True)
+    df = pd.read_sql_query(f"""
+        SELECT l.* FROM {table_name}_all l
+        JOIN (SELECT asin, MAX(scrape_date) AS scrape_date FROM {table_name}_all GROUP BY asin) latest
+          ON latest.asin = l.asin AND latest.scrape_date = l.scrape_date
+    """, conn)
+    conn.close()
+    return df
+
+
+def bump_data_version(db_path="laptop_prices.db"):
+    """
+    Mark the data as changed; derived artifacts and caches key on this version
+    """
+    version = datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE IF NOT EXISTS data_meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("INSERT OR REPLACE INTO data_meta (key, value) VALUES ('data_version', ?)", (version,))
+    conn.commit()
+    conn.close()
+    return version
+
+
+def get_data_version(db_path="laptop_prices.db"):
     try:
-        merged_df = fetch_merged_data_from_sqlite(db_path=db_path, table_name=table_name)
-    except:
-        merged_df = pd.DataFrame()
+        conn = connect_reader(db_path)
+    except sqlite3.OperationalError:
+        return "0"  # nothing written yet
+    try:
+        row = conn.execute("SELECT value FROM data_meta WHERE key = 'data_version'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    conn.close()
+    return row[0] if row else "0"
 
-    new_df = pd.read_csv(new_data_path)
 
-    if not merged_df.empty:
-        merged_df['scrape_date'] = pd.to_datetime(merged_df['scrape_date'], errors='coerce')
-    new_df['scrape_date'] = pd.to_datetime(new_df['scrape_date'], errors='coerce')
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_KEEP = 3  # published versions kept on disk for readers still pinned to an older one
 
-    combined_df = pd.concat([merged_df, new_df], ignore_index=True)
-    combined_df = combined_df.drop_duplicates(subset=['asin', 'scrape_date'], keep='last')
-    combined_df = combined_df.sort_values(by=['asin', 'scrape_date'])
 
-    combined_df['extracted_price'] = pd.to_numeric(combined_df['extracted_price'], errors='coerce')
-    combined_df['rating'] = pd.to_numeric(combined_df['rating'], errors='coerce')
-    combined_df['previous_price'] = combined_df.groupby('asin')['extracted_price'].shift(1)
-    combined_df['previous_scrape_date'] = combined_df.groupby('asin')['scrape_date'].shift(1)
+def enable_wal(db_path="laptop_prices.db"):
+    """
+    The pipeline is the single writer of the working database; WAL keeps its own reads from blocking on its writes
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
 
-    combined_df['price_difference'] = combined_df['extracted_price'] - combined_df['previous_price']
-    combined_df['price_change_percent'] = (combined_df['price_difference'] / combined_df['previous_price']) * 100
 
-    mask = combined_df['previous_price'].isna()
-    combined_df.loc[mask, 'previous_price'] = combined_df.loc[mask, 'extracted_price']
-    combined_df.loc[mask, 'price_difference'] = 0
-    combined_df.loc[mask, 'price_change_percent'] = 0
-    combined_df.loc[mask, 'previous_scrape_date'] = combined_df.loc[mask, 'scrape_date']
+def connect_readonly(db_path, immutable=True):
+    """
+    Read-only connection; `immutable` skips all locking and is only safe for published snapshots, which never change
+    """
+    return sqlite3.connect(f"file:{db_path}?mode=ro{'&immutable=1' if immutable else ''}", uri=True,
+                           check_same_thread=False)
 
-    combined_df['buy_now'] = np.where(
-        (combined_df['price_change_percent'] < -5) & (combined_df['rating'] > 3.2),
-        'Yes', 'No'
-    )
-    
-    # 💡 Price stability calculation
-    stability_df = combined_df.groupby('asin')['extracted_price'].std().reset_index()
-    stability_df.rename(columns={'extracted_price': 'price_stability'}, inplace=True)
 
-    # Debug print for stability_df
-    print("🔍 Stability DF Preview:\n", stability_df.head())
+def is_snapshot(db_path, snapshot_dir=SNAPSHOT_DIR):
+    """True for a database published under snapshot_dir, which is never written again"""
+    return os.path.realpath(os.path.dirname(os.path.abspath(db_path))) == os.path.realpath(snapshot_dir)
 
-       # Step 8: Merge price stability (left join with 'asin')
-    combined_df = pd.merge(combined_df, stability_df, on='asin', how='left', suffixes=('', '_stability'))
-    
-    # Step 9: Handle missing price_stability
-    if 'price_stability' not in combined_df.columns:
-        print("⚠️ Warning: 'price_stability' column missing after merge. Filling with 0.")
-        combined_df['price_stability'] = 0
-    else:
-        combined_df['price_stability'] = combined_df['price_stability'].fillna(0)
-    
-    # Step 10: Label stability
-    combined_df['stability_label'] = np.where(
-        combined_df['price_stability'] < 5, 'Stable', 'Unstable'
-    )
-    
-    # Clean up: Drop any extra columns that were added accidentally (e.g., price_stability_stability)
-    extra_cols = [col for col in combined_df.columns if col.endswith('_stability') and col != 'price_stability']
-    combined_df.drop(columns=extra_cols, inplace=True)
 
-    combined_df = combined_df.sort_values(by=['asin', 'scrape_date'])
+def connect_reader(db_path):
+    """
+    Read-only connection for functions that only read: immutable on a published snapshot,
+    plain read-only on the working database, where the pipeline may be writing
+    """
+    return connect_readonly(db_path, immutable=is_snapshot(db_path))
 
-    upsert_to_sqlite(combined_df, db_path=db_path, table_name=table_name)
 
-    print("✅ Merged data updated and saved to database.")
+def _freeze_partitions(conn, parts_dir):
+    """
+    Give a snapshot its own copy of every partition file (hard links where the filesystem allows)
+    and point its registry at them, so rewrites of the live partitions never reach published readers
+    """
+    try:
+        rows = conn.execute("SELECT name, path FROM partitions").fetchall()
+    except sqlite3.OperationalError:
+        return 0
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    os.makedirs(parts_dir)
+    for name, path in rows:
+        if not os.path.exists(path):
+            continue
+        frozen = os.path.join(parts_dir, os.path.basename(path))
+        try:
+            os.link(path, frozen)  # partition files are swapped, never edited, so the link keeps this version
+        except OSError:
+            shutil.copyfile(path, frozen)
+            os.chmod(frozen, 0o444)
+        conn.execute("UPDATE partitions SET path = ? WHERE name = ?", (frozen, name))
+    conn.commit()
+    return len(rows)
 
 
-def run_all():
+def publish_snapshot(db_path="laptop_prices.db", snapshot_dir=SNAPSHOT_DIR, keep=SNAPSHOT_KEEP):
     """
-    Runs the full pipeline:
-    1. Scrape Amazon laptop data via SerpAPI
-    2. Clean and preprocess the scraped data
-    3. Update SQLite database with the cleaned data
+    Copy the working database into snapshots/laptop_prices-<data version>.db with the SQLite backup API,
+    with its month partitions frozen under snapshots/laptop_prices-<data version>.parts/,
+    and atomically point snapshots/CURRENT at it. Readers open the file CURRENT names and never see a partial write.
     """
-    print(" Starting full pipeline...")
+    os.makedirs(snapshot_dir, exist_ok=True)
+    version = get_data_version(db_path=db_path)
+    name = f"laptop_prices-{version}.db"
+    target = os.path.join(snapshot_dir, name)
+    staging = target + ".tmp"
+    if os.path.exists(staging):
+        os.remove(staging)
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(staging)
+    src.backup(dst)
+    dst.execute("PRAGMA journal_mode=DELETE")  # a single self-contained file for immutable readers
+    _freeze_partitions(dst, target[:-len(".db")] + ".parts")
+    dst.close()
+    src.close()
+    os.replace(staging, target)
 
-    # Step 1: Web Scraping
-    print("\n Step 1: Web scraping started...")
-    web_scraping()
-    print(" Web scraping complete.")
+    pointer = os.path.join(snapshot_dir, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(name)
+    os.replace(pointer + ".tmp", pointer)
 
-    # Step 2: Data Cleaning
-    print("\n Step 2: Cleaning data...")
-    
-    cleaned_df = data_cleaning()
-    print(f" Data cleaning complete. Saved to 'cleaned_Data.csv' ({len(cleaned_df)} rows).")
+    published = sorted(f for f in os.listdir(snapshot_dir) if f.startswith("laptop_prices-") and f.endswith(".db"))
+    for old in published[:-keep]:
+        if old != name:
+            os.remove(os.path.join(snapshot_dir, old))
+            shutil.rmtree(os.path.join(snapshot_dir, old[:-len(".db")] + ".parts"), ignore_errors=True)
+    print(f"📦 Published snapshot {target}")
+    return target
 
-    # Step 3: Merge & Update DB
-    print("\n Step 3: Updating database...")
-    update_merged_data(new_data_path="cleaned_Data.csv")
-    print(" Database update complete.")
 
-    print("\n All steps completed successfully!")
+def current_snapshot(snapshot_dir=SNAPSHOT_DIR, fallback="laptop_prices.db"):
+    """
+    Path of the currently published snapshot, or the working database when nothing was published yet
+    """
+    try:
+        with open(os.path.join(snapshot_dir, "CURRENT")) as f:
+            path = os.path.join(snapshot_dir, f.read().strip())
+    except FileNotFoundError:
+        return fallback
+    return path if os.path.exists(path) else fallback
 
-    
+
+def latest_rows_join(table_name="laptops"):
+    """
+    FROM clause selecting each ASIN's latest row as `l`; the current table keeps every listing's latest row,
+    so no partition is opened
+    """
+    return f"""
+    FROM {table_name} l
+    JOIN (SELECT asin, MAX(scrape_date) AS scrape_date FROM {table_name} GROUP BY asin) latest
+      ON latest.asin = l.asin AND latest.scrape_date = l.scrape_date
+"""
+
+
+def fetch_top_deals(limit=3, signal="is_deal", db_path="laptop_prices.db", table_name="laptops"):
+    """
+    Highest rated listings whose latest row is flagged by a deal signal
+    """
+    conn = connect_reader(db_path)
+    existing_cols = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    if signal not in existing_cols:
+        signal = "buy_now"  # database written before the deal-signal stage existed
+    df = pd.read_sql_query(
+        f"""SELECT l.* {latest_rows_join(table_name)} WHERE l."{signal}" = 'Yes' ORDER BY l.rating DESC LIMIT ?""",
+        conn, params=(limit,)
+    )
+    conn.close()
+    return df
+
+
+'''deal signals'''
+
+DEAL_WINDOW_WEEKS = 4   # rolling window of the trend signal, in weekly scrapes
+DEAL_STD_K = 1.0        # how many rolling std devs below the mean counts as a deal
+DEAL_SIGNAL_COLS = ['buy_now', 'all_time_low', 'below_rolling_mean', 'brand_top_drop', 'is_deal']
+
+
+def add_deal_signals(df, window_weeks=DEAL_WINDOW_WEEKS, k=DEAL_STD_K, changed_asins=None, series=None):
+    """
+    Windowed deal signals over each ASIN's price history, computed on its rows of `series`
+    (the price_series of `df`, built from `df` alone when None):
+    - all_time_low: price at its lowest level so far, compacted history included, after having been higher
+    - below_rolling_mean: price below the mean of the `window_weeks` scrapes before it by `k` std devs
+    - brand_top_drop: biggest percentage drop within its brand on that scrape date
+    - is_deal: any of the above or the classic buy_now rule
+    When `changed_asins` is given only those ASINs' windows are recomputed, the rest keep their stored values.
+    """
+    df = df.sort_values(by=['asin', 'scrape_date'], kind='mergesort').reset_index(drop=True)
+
+    stored = all(col in df.columns for col in ['rolling_mean', 'rolling_std', 'all_time_low', 'below_rolling_mean'])
+    if changed_asins is None or not stored:
+        mask = pd.Series(True, index=df.index)
+    else:
+        mask = df['asin'].isin(changed_asins)
+
+    part = df.loc[mask, ['asin', 'scrape_date', 'extracted_price']]
+    if series is None:
+        series = price_series(part)
+    rows, cols = _series_cells(series, part)
+    listings, rows = np.unique(rows, return_inverse=True)
+    prices = series['prices'][listings]
+    rolling_mean, rolling_std = matrix_rolling_stats(prices, window_weeks)
+    prior_min = np.fmin.accumulate(prices, axis=1)
+    prior_max = np.fmax.accumulate(prices, axis=1)
+
+    def before(values):
+        # value at the scrape before each row, so the current observation stays out of its own window
+        return np.where(cols > 0, values[rows, cols - 1], np.nan)
+
+    price = part['extracted_price'].to_numpy(dtype=float)
+    rolling_mean, rolling_std = before(rolling_mean), before(rolling_std)
+    # compacted history is only in the rollups, whose min / max still bound the lowest and highest price seen
+    prior_min = np.fmin(before(prior_min), series['low'][listings][rows])
+    prior_max = np.fmax(before(prior_max), series['high'][listings][rows])
+    df.loc[mask, 'rolling_mean'] = rolling_mean
+    df.loc[mask, 'rolling_std'] = rolling_std
+    df.loc[mask, 'all_time_low'] = np.where((price <= prior_min) & (price < prior_max), 'Yes', 'No')
+    df.loc[mask, 'below_rolling_mean'] = np.where(price < rolling_mean - k * rolling_std, 'Yes', 'No')
+
+    # biggest drop per brand is relative to the rest of the same scrape, so it's always recomputed
+    biggest_drop = df.groupby(['brand', 'scrape_date'])['price_change_percent'].transform('min')
+    df['brand_top_drop'] = np.where(
+        (df['price_change_percent'] < 0) & (df['price_change_percent'] == biggest_drop), 'Yes', 'No'
+    )
+
+    signals = df[['buy_now', 'all_time_low', 'below_rolling_mean', 'brand_top_drop']] == 'Yes'
+    df['is_deal'] = np.where(signals.any(axis=1), 'Yes', 'No')
+    return df
+
+
+def compute_price_features(combined_df, changed_asins=None, db_path="laptop_prices.db", table_name="laptops"):
+    """
+    Derived columns of a per-ASIN price history: previous price and difference, buy_now,
+    brand, model group, deal signals and price stability.
+    Price changes, windows and stability are whole-array operations on the rows' price_series: the weekly series
+    rebuilt from the stored change points and the seen-again markers, laid out on every scrape date of the database,
+    so weeks a listing was skipped as unchanged still count, the result doesn't depend on which listings are merged
+    together and a replay gives the same result.
+    """
+    combined_df = combined_df.sort_values(by=['asin', 'scrape_date'], kind='mergesort').reset_index(drop=True)
+    combined_df['extracted_price'] = combined_df['extracted_price'].astype(float)
+    combined_df['rating'] = combined_df['rating'].astype(float)
+    series = fetch_price_series(combined_df, db_path=db_path, table_name=table_name)
+    rows, cols = _series_cells(series, combined_df)
+
+    # previous observation of every cell: its price from the forward-filled matrix, its date from the last observed column
+    previous, change, dropped = matrix_price_drops(series['prices'])
+    last = np.where(series['observed'], np.arange(len(series['dates'])), -1)
+    np.maximum.accumulate(last, axis=1, out=last)
+    previous_col = np.where(cols > 0, last[rows, cols - 1], -1)
+    first = previous_col < 0
+
+    price = combined_df['extracted_price'].to_numpy()
+    combined_df['previous_price'] = np.where(first, price, previous[rows, cols])
+    combined_df['previous_scrape_date'] = combined_df['scrape_date'].where(
+        first, pd.Series(series['dates'][np.maximum(previous_col, 0)], index=combined_df.index)
+    )
+    combined_df['price_difference'] = np.where(first, 0, price - previous[rows, cols])
+    combined_df['price_change_percent'] = np.where(first, 0, change[rows, cols])
+    combined_df['buy_now'] = np.where(dropped[rows, cols] & (combined_df['rating'] > 3.2), 'Yes', 'No')
+
+    # 💡 Price stability: std dev of each listing's prices, Stable below 5
+    stability = np.nan_to_num(matrix_price_stability(series['prices']), nan=0.0)
+    combined_df['price_stability'] = stability[rows]
+    combined_df['stability_label'] = np.where(combined_df['price_stability'] < 5, 'Stable', 'Unstable')
+
+    # Windowed deal signals, recomputed only for `changed_asins` (all when None)
+    combined_df['brand'] = extract_brand(combined_df['title'])
+    combined_df['model_group_id'] = combined_df['asin'].map(fetch_model_groups(db_path=db_path))
+    combined_df = add_deal_signals(combined_df, changed_asins=changed_asins, series=series)
+
+    return combined_df
+
+
+def update_merged_data(new_data_path="cleaned_Data.csv", db_path="laptop_prices.db", table_name="laptops"):
+    new_df = pd.read_csv(new_data_path)
+    if new_df.empty:
+        print("✅ Nothing changed since the last scrape, database left untouched.")
+        record_price_events(db_path=db_path, table_name=table_name)  # listings missing from the scrape still count
+        return new_df
+
+    # only the ASINs of this batch can change, so only their history is loaded
+    try:
+        merged_df = fetch_listing_history(new_df['asin'].unique(), db_path=db_path, table_name=table_name)
+    except (sqlite3.OperationalError, pd.errors.DatabaseError):  # first run: no database or no table yet
+        merged_df = pd.DataFrame()
+
+    # rows were validated while cleaning, so anything unparseable here is a real error
+    if not merged_df.empty:
+        merged_df['scrape_date'] = pd.to_datetime(merged_df['scrape_date'], format='ISO8601')
+    new_df['scrape_date'] = pd.to_datetime(new_df['scrape_date'], format='ISO8601')
+
+    combined_df = pd.concat([merged_df, new_df], ignore_index=True)
+    combined_df = combined_df.drop_duplicates(subset=['asin', 'scrape_date'], keep='last')
+    combined_df = combined_df.sort_values(by=['asin', 'scrape_date'])
+
+    combined_df = compute_price_features(combined_df, changed_asins=new_df['asin'].unique(), db_path=db_path,
+                                         table_name=table_name)
+
+    # Only this batch's rows are written; older rows of the same ASINs just get their refreshed stability
+    batch_keys = new_df[['asin', 'scrape_date']].drop_duplicates()
+    batch_df = combined_df.merge(batch_keys, on=['asin', 'scrape_date'], how='inner')
+    upsert_to_sqlite(batch_df, db_path=db_path, table_name=table_name)
+    stability = combined_df.drop_duplicates('asin')[['price_stability', 'stability_label', 'asin']]
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        f"UPDATE {table_name} SET price_stability = ?, stability_label = ? WHERE asin = ?",
+        stability.itertuples(index=False)
+    )
+    conn.commit()
+    conn.close()
+    create_indexes(db_path=db_path, table_name=table_name)
+    store_fingerprints(batch_df, db_path=db_path)
+    record_price_events(combined_df, batch_keys, db_path=db_path, table_name=table_name)
+    bump_data_version(db_path=db_path)
+
+    print(f"✅ Merged data updated: {len(batch_df)} rows written for {len(stability)} listings.")
+
+    # Rows of this batch that are new listings or moved in price, for the stages that follow
+    is_new = batch_df['previous_scrape_date'] == batch_df['scrape_date']
+    return batch_df[is_new | (batch_df['price_difference'] != 0)].reset_index(drop=True)
+
+
+def fetch_changed_rows(db_path="laptop_prices.db", table_name="laptops"):
+    """
+    Rows of the newest scrape that are new listings or moved in price, as returned by the update_merged_data run that wrote them
+    """
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f"""
+        SELECT * FROM {table_name}
+        WHERE scrape_date = (SELECT MAX(scrape_date) FROM {table_name})
+          AND (previous_scrape_date = scrape_date OR price_difference != 0)
+    """, conn)
+    conn.close()
+    return df
+
+
+'''history retention'''
+
+RAW_RETENTION_DAYS = 180      # full-width rows kept this long, older ones roll up into weeks
+WEEKLY_RETENTION_DAYS = 730   # weekly rollups kept this long, older ones roll up into months
+ROLLUP_TABLES = {'week': 'price_rollup_weekly', 'month': 'price_rollup_monthly'}
+ROLLUP_COLUMNS = ['asin', 'period_start', 'min_price', 'mean_price', 'max_price', 'last_price',
+                  'last_rating', 'last_reviews', 'last_date', 'n']
+
+
+def _init_rollup_tables(conn):
+    for table in ROLLUP_TABLES.values():
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                asin TEXT,
+                period_start TEXT,
+                min_price REAL,
+                mean_price REAL,
+                max_price REAL,
+                last_price REAL,
+                last_rating REAL,
+                last_reviews REAL,
+                last_date TEXT,
+                n INTEGER,
+                PRIMARY KEY (asin, period_start)
+            )
+        """)
+
+
+def _period_start(dates, granularity):
+    dates = pd.to_datetime(dates)
+    if granularity == 'week':
+        start = dates - pd.to_timedelta(dates.dt.weekday, unit='D')
+    else:
+        start = dates.dt.to_period('M').dt.start_time
+    return start.dt.strftime('%Y-%m-%d')
+
+
+def _combine_rollups(rollups):
+    """
+    Collapse rollup rows sharing (asin, period_start): min of mins, max of maxes,
+    count-weighted mean and the last_* values of the latest observation
+    """
+    if rollups.empty:  # most retention runs have nothing old enough to fold
+        return rollups.reindex(columns=ROLLUP_COLUMNS)
+    rollups = rollups.sort_values('last_date')
+    rollups = rollups.assign(weighted=rollups['mean_price'] * rollups['n'])
+    grouped = rollups.groupby(['asin', 'period_start'], sort=False)
+    out = grouped.agg(
+        min_price=('min_price', 'min'), max_price=('max_price', 'max'), weighted=('weighted', 'sum'), n=('n', 'sum'),
+        last_price=('last_price', 'last'), last_rating=('last_rating', 'last'),
+        last_reviews=('last_reviews', 'last'), last_date=('last_date', 'last')
+    ).reset_index()
+    out['mean_price'] = out['weighted'] / out['n']
+    return out[ROLLUP_COLUMNS]
+
+
+def _merge_into_rollup(conn, granularity, rollups):
+    """
+    Fold `rollups` (already keyed by this granularity's period_start) into its table
+    """
+    if rollups.empty:
+        return 0
+    table = ROLLUP_TABLES[granularity]
+    keys = rollups[['asin', 'period_start']].drop_duplicates()
+    conn.execute("CREATE TEMP TABLE rollup_keys (asin TEXT, period_start TEXT)")
+    conn.executemany("INSERT INTO rollup_keys VALUES (?, ?)", keys.itertuples(index=False))
+    existing = pd.read_sql_query(
+        f"SELECT r.* FROM {table} r JOIN rollup_keys k ON k.asin = r.asin AND k.period_start = r.period_start", conn
+    )
+    conn.execute("DROP TABLE rollup_keys")
+    merged = _combine_rollups(pd.concat([existing, rollups], ignore_index=True) if len(existing) else rollups)
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {table} ({', '.join(ROLLUP_COLUMNS)}) VALUES ({', '.join(['?'] * len(ROLLUP_COLUMNS))})",
+        merged.astype(object).where(merged.notna(), None).itertuples(index=False)
+    )
+    return len(merged)
+
+
+def compact_history(keep_days=RAW_RETENTION_DAYS, weekly_keep_days=WEEKLY_RETENTION_DAYS,
+                    db_path="laptop_prices.db", table_name="laptops", vacuum=True):
+    """
+    Retention stage:
+    - raw rows older than `keep_days` are folded into weekly min/mean/max/last rollups and deleted,
+      except the latest row of every ASIN, which stays raw for the current listing
+    - weekly rollups older than `weekly_keep_days` are folded into monthly rollups
+    - month partitions entirely past `keep_days` are rolled up the same way and dropped,
+      their listings' latest rows moving back into the current table
+    - the file is VACUUMed so the freed pages are returned, unless `vacuum` is False (the replay VACUUMs once at the end)
+    The three levels never overlap, so fetch_price_history simply unions them.
+    """
+    conn = connect_partitioned(db_path, table_name=table_name)
+    _init_rollup_tables(conn)
+    newest = conn.execute(f"SELECT MAX(scrape_date) FROM {table_name}_all").fetchone()[0]
+    if newest is None:
+        conn.close()
+        return
+    newest = pd.to_datetime(newest)
+    raw_cutoff = (newest - pd.Timedelta(days=keep_days)).strftime('%Y-%m-%d')
+    weekly_cutoff = (newest - pd.Timedelta(days=weekly_keep_days)).strftime('%Y-%m-%d')
+
+    conn.execute(f"""CREATE TEMP TABLE latest_dates AS
+                     SELECT asin, MAX(scrape_date) AS scrape_date FROM {table_name}_all GROUP BY asin""")
+    conn.execute("CREATE UNIQUE INDEX temp.idx_latest_dates ON latest_dates(asin)")
+    old = pd.read_sql_query(f"""
+        SELECT l.rowid AS row_id, l.asin, l.scrape_date, l.extracted_price, l.rating, l.reviews
+        FROM main.{table_name} l JOIN latest_dates latest ON latest.asin = l.asin
+        WHERE l.scrape_date < ? AND l.scrape_date < latest.scrape_date
+    """, conn, params=(raw_cutoff,))
+
+    expired = [(name, path) for name, path, _, end in list_partitions(conn) if end <= raw_cutoff and os.path.exists(path)]
+    columns = [row[1] for row in conn.execute(f'PRAGMA main.table_info("{table_name}")')]
+    for name, _ in expired:
+        alias = f"part_{name}"
+        available = {row[1] for row in conn.execute(f'PRAGMA {alias}.table_info("{table_name}")')}
+        shared = ", ".join(f'"{col}"' for col in columns if col in available)
+        conn.execute(f"""
+            INSERT OR IGNORE INTO main.{table_name} ({shared})
+            SELECT {", ".join(f'l."{col}"' for col in columns if col in available)}
+            FROM {alias}.{table_name} l JOIN latest_dates latest ON latest.asin = l.asin AND latest.scrape_date = l.scrape_date
+        """)
+        rows = pd.read_sql_query(f"""
+            SELECT NULL AS row_id, l.asin, l.scrape_date, l.extracted_price, l.rating, l.reviews
+            FROM {alias}.{table_name} l JOIN latest_dates latest ON latest.asin = l.asin
+            WHERE l.scrape_date < latest.scrape_date
+        """, conn)
+        old = pd.concat([df for df in [old, rows] if not df.empty] or [old], ignore_index=True)
+    old['scrape_date'] = pd.to_datetime(old['scrape_date']).dt.strftime('%Y-%m-%d')
+    price = pd.to_numeric(old['extracted_price'], errors='coerce')
+    as_rollup = pd.DataFrame({
+        'asin': old['asin'], 'period_start': _period_start(old['scrape_date'], 'week'),
+        'min_price': price, 'mean_price': price, 'max_price': price, 'last_price': price,
+        'last_rating': pd.to_numeric(old['rating'], errors='coerce'),
+        'last_reviews': pd.to_numeric(old['reviews'], errors='coerce'),
+        'last_date': old['scrape_date'], 'n': 1,
+    })
+    weeks = _merge_into_rollup(conn, 'week', _combine_rollups(as_rollup))
+    conn.executemany(f"DELETE FROM main.{table_name} WHERE rowid = ?",
+                     ((int(r),) for r in old['row_id'].dropna()))
+
+    old_weeks = pd.read_sql_query(
+        f"SELECT * FROM {ROLLUP_TABLES['week']} WHERE period_start < ?", conn, params=(weekly_cutoff,)
+    )
+    months = _merge_into_rollup(conn, 'month', _combine_rollups(
+        old_weeks.assign(period_start=_period_start(old_weeks['period_start'], 'month'))
+    ))
+    conn.execute(f"DELETE FROM {ROLLUP_TABLES['week']} WHERE period_start < ?", (weekly_cutoff,))
+    conn.commit()
+
+    conn.execute(f"DROP VIEW IF EXISTS temp.{table_name}_all")
+    for name, path in expired:
+        conn.execute(f"DETACH DATABASE part_{name}")
+        conn.execute("DELETE FROM main.partitions WHERE name = ?", (name,))
+        conn.commit()
+        os.remove(path)
+
+    size_before = os.path.getsize(db_path)
+    if vacuum and (len(old) or len(old_weeks)):
+        conn.execute("VACUUM")
+    conn.close()
+    print(f"🗜️ Compacted {len(old)} raw rows into {weeks} weekly rollups and {len(old_weeks)} weeks into {months} monthly rollups "
+          f"({size_before / 1e6:.1f} MB -> {os.path.getsize(db_path) / 1e6:.1f} MB).")
+    if len(old):
+        bump_data_version(db_path=db_path)
+
+
+def price_history_query(conn, where="", table_name="laptops"):
+    """
+    SQL unioning raw rows with the weekly and monthly rollups into one history shape:
+    asin, scrape_date, granularity, extracted_price (mean for rollups), min/max/last price, rating, reviews, observations.
+    `where` filters on asin and is applied to every level.
+    """
+    rollup_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    parts = [f"""SELECT asin, scrape_date, 'raw' AS granularity, extracted_price, extracted_price AS min_price,
+                        extracted_price AS max_price, extracted_price AS last_price, rating, reviews, 1 AS observations
+                 FROM {table_name} {where}"""]
+    for granularity, table in ROLLUP_TABLES.items():
+        if table in rollup_tables:
+            parts.append(f"""SELECT asin, period_start, '{granularity}', mean_price, min_price, max_price, last_price,
+                                    last_rating, last_reviews, n
+                             FROM {table} {where}""")
+    return " UNION ALL ".join(parts) + " ORDER BY asin, scrape_date"
+
+
+def fetch_price_history(asins=None, db_path="laptop_prices.db", table_name="laptops", start_date=None, end_date=None):
+    """
+    Price history of the given ASINs (all when None), reading rollups transparently where raw rows were compacted.
+    start_date / end_date limit the raw rows, and so the partitions that are opened.
+    """
+    if asins is not None:
+        chunks = iter_price_history(asins, db_path=db_path, table_name=table_name, start_date=start_date, end_date=end_date)
+        return pd.concat(list(chunks) or [pd.DataFrame()], ignore_index=True)
+    conn = connect_partitioned(db_path, start_date, end_date, table_name, readonly=True)
+    df = pd.read_sql_query(price_history_query(conn, table_name=f"{table_name}_all"), conn)
+    conn.close()
+    return df
+
+
+'''time partitions'''
+
+PARTITION_DIR = "partitions"
+
+
+def _init_partition_registry(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS partitions (
+            name TEXT PRIMARY KEY,
+            path TEXT,
+            start_date TEXT,
+            end_date TEXT,
+            rows INTEGER,
+            archived INTEGER
+        )
+    """)
+
+
+def _as_date(value):
+    return None if value is None else pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def list_partitions(conn, start_date=None, end_date=None):
+    """
+    Registered (name, path, start_date, end_date) of the month partitions overlapping [start_date, end_date]
+    """
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    try:
+        rows = conn.execute("SELECT name, path, start_date, end_date FROM main.partitions ORDER BY start_date").fetchall()
+    except sqlite3.OperationalError:
+        return []
+    return [row for row in rows
+            if (start_date is None or row[3] > start_date) and (end_date is None or row[2] <= end_date)]
+
+
+def attach_partitions(conn, start_date=None, end_date=None, table_name="laptops", immutable=False):
+    """
+    Routing layer under the fetch functions: attach the partitions overlapping [start_date, end_date] read-only
+    and create the temp view <table_name>_all over them and the current table, limited to the same dates.
+    Partitions outside the range are never opened. `conn` must be opened with uri=True.
+    `immutable` opens them without locking, for the frozen partitions of a published snapshot.
+    """
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    for _, alias, _ in conn.execute("PRAGMA database_list").fetchall():
+        if alias.startswith("part_"):
+            conn.execute(f"DETACH DATABASE {alias}")
+
+    columns = [row[1] for row in conn.execute(f'PRAGMA main.table_info("{table_name}")')]
+    sources = [("main", set(columns))]
+    for name, path, _, _ in list_partitions(conn, start_date, end_date):
+        if not os.path.exists(path):
+            continue  # dropped by retention after this database was published
+        alias = f"part_{name}"
+        conn.execute(f"ATTACH DATABASE ? AS {alias}", (f"file:{path}?mode=ro{'&immutable=1' if immutable else ''}",))
+        sources.append((alias, {row[1] for row in conn.execute(f'PRAGMA {alias}.table_info("{table_name}")')}))
+
+    view = f"{table_name}_all"
+    conn.execute(f"DROP VIEW IF EXISTS temp.{view}")
+    if not columns:
+        return view
+    bounds = []
+    if start_date:
+        bounds.append(f"scrape_date >= '{start_date}'")
+    if end_date:
+        bounds.append(f"scrape_date <= '{end_date}'")
+    where = f" WHERE {' AND '.join(bounds)}" if bounds else ""
+    selects = []
+    for alias, available in sources:
+        # partitions archived before a column was added read it as NULL
+        select_list = ", ".join(f'"{col}"' if col in available else f'NULL AS "{col}"' for col in columns)
+        selects.append(f"SELECT {select_list} FROM {alias}.{table_name}{where}")
+    conn.execute(f"CREATE TEMP VIEW {view} AS " + " UNION ALL ".join(selects))
+    return view
+
+
+def connect_partitioned(db_path="laptop_prices.db", start_date=None, end_date=None, table_name="laptops",
+                        readonly=False):
+    """
+    Connection on which <table_name>_all holds the rows of [start_date, end_date] across the current table and partitions;
+    `readonly` for callers that only read, immutable when db_path is a published snapshot
+    """
+    if readonly:
+        conn = connect_reader(db_path)
+    else:
+        conn = sqlite3.connect(f"file:{db_path}", uri=True)
+    attach_partitions(conn, start_date, end_date, table_name, immutable=readonly and is_snapshot(db_path))
+    return conn
+
+
+def _rewrite_partition(conn, name, path, start, end, table_name, columns, fill=None, remove=None):
+    """
+    Rebuild the read-only file of one month partition: copy it to a staging file, run `fill`
+    (INSERT ... INTO staging.<table>) and / or `remove` (DELETE FROM staging.<table> ...) as (sql, params),
+    then swap it in atomically and update its registry row. Returns the rows the partition now holds.
+    """
+    staging = path + ".tmp"
+    if os.path.exists(staging):
+        os.remove(staging)
+    if os.path.exists(path):
+        shutil.copyfile(path, staging)
+        os.chmod(staging, 0o644)
+
+    conn.execute("ATTACH DATABASE ? AS staging", (staging,))
+    existing_cols = {row[1] for row in conn.execute(f'PRAGMA staging.table_info("{table_name}")')}
+    if not existing_cols:
+        conn.execute(f"CREATE TABLE staging.{table_name} AS SELECT * FROM main.{table_name} WHERE 0")
+        conn.execute(f"CREATE UNIQUE INDEX staging.idx_{table_name}_asin_date ON {table_name}(asin, scrape_date)")
+    for col in columns:
+        if existing_cols and col not in existing_cols:
+            conn.execute(f'ALTER TABLE staging.{table_name} ADD COLUMN "{col}"')
+    for statement in (fill, remove):
+        if statement is not None:
+            conn.execute(*statement)
+    rows = conn.execute(f"SELECT COUNT(*) FROM staging.{table_name}").fetchone()[0]
+    conn.commit()
+    conn.execute("DETACH DATABASE staging")
+    os.chmod(staging, 0o444)
+    os.replace(staging, path)
+    conn.execute("INSERT OR REPLACE INTO main.partitions VALUES (?, ?, ?, ?, ?, 1)", (name, path, start, end, rows))
+    return rows
+
+
+def partition_history(keep_days=RAW_RETENTION_DAYS, db_path="laptop_prices.db", table_name="laptops",
+                      partition_dir=PARTITION_DIR, vacuum=True):
+    """
+    Move the rows of closed months out of the current table into one read-only file per month,
+    partitions/<table>_<YYYY_MM>.db, registered in the `partitions` table.
+    The latest row of every ASIN always stays in the current table, whatever its month, so readers of the
+    current listings never need the partitions; a row is moved once a newer one of its ASIN exists.
+    The current table keeps the month of the newest scrape, so weekly writes and recent reads touch only it.
+    Months already past raw retention are left in place: compact_history has reduced them to each listing's latest row.
+    """
+    conn = connect_partitioned(db_path, table_name=table_name)
+    _init_partition_registry(conn)
+    columns = [row[1] for row in conn.execute(f'PRAGMA main.table_info("{table_name}")')]
+    newest = conn.execute(f"SELECT MAX(scrape_date) FROM main.{table_name}").fetchone()[0] if columns else None
+    if newest is None:
+        conn.close()
+        return 0
+    newest = pd.to_datetime(newest)
+    current_start = newest.to_period('M').start_time.strftime('%Y-%m-%d')
+    expired_before = (newest - pd.Timedelta(days=keep_days)).strftime('%Y-%m-%d')
+    column_list = ", ".join(f'"{col}"' for col in columns)
+
+    conn.execute(f"""CREATE TEMP TABLE latest_dates AS
+                     SELECT asin, MAX(scrape_date) AS scrape_date FROM {table_name}_all GROUP BY asin""")
+    conn.execute("CREATE UNIQUE INDEX temp.idx_latest_dates ON latest_dates(asin)")
+    is_latest = f"scrape_date = (SELECT scrape_date FROM latest_dates WHERE latest_dates.asin = {table_name}.asin)"
+
+    # partitions written before latest rows were kept in place give them back to the current table
+    restored = 0
+    for name, path, start, end in list_partitions(conn):
+        alias = f"part_{name}"
+        if not os.path.exists(path) or alias not in {row[1] for row in conn.execute("PRAGMA database_list")}:
+            continue
+        if not conn.execute(f"SELECT 1 FROM {alias}.{table_name} WHERE {is_latest} LIMIT 1").fetchone():
+            continue
+        available = {row[1] for row in conn.execute(f'PRAGMA {alias}.table_info("{table_name}")')}
+        shared = ", ".join(f'"{col}"' for col in columns if col in available)
+        restored += conn.execute(f"""
+            INSERT OR IGNORE INTO main.{table_name} ({shared})
+            SELECT {shared} FROM {alias}.{table_name} WHERE {is_latest}
+        """).rowcount
+        _rewrite_partition(conn, name, path, start, end, table_name, columns,
+                           remove=(f"DELETE FROM staging.{table_name} WHERE {is_latest}", ()))
+        conn.commit()
+
+    months = [row[0] for row in conn.execute(f"""
+        SELECT DISTINCT substr(scrape_date, 1, 7) FROM main.{table_name}
+        WHERE scrape_date < ? AND NOT {is_latest} ORDER BY 1
+    """, (current_start,))]
+    os.makedirs(partition_dir, exist_ok=True)
+    moved = 0
+    for month in months:
+        start = f"{month}-01"
+        end = (pd.Timestamp(start) + pd.offsets.MonthBegin(1)).strftime('%Y-%m-%d')
+        if end <= expired_before:
+            continue
+        name = f"{table_name}_{month.replace('-', '_')}"
+        path = os.path.join(partition_dir, f"{name}.db")
+        in_month = f"scrape_date >= ? AND scrape_date < ? AND NOT {is_latest}"
+        # late rows for an archived month are added to a copy of its file, which is swapped in
+        _rewrite_partition(conn, name, path, start, end, table_name, columns, fill=(f"""
+            INSERT OR REPLACE INTO staging.{table_name} ({column_list})
+            SELECT {column_list} FROM main.{table_name} WHERE {in_month}
+        """, (start, end)))
+        moved += conn.execute(f"DELETE FROM main.{table_name} WHERE {in_month}", (start, end)).rowcount
+        conn.commit()
+
+    conn.close()
+    if moved or restored:
+        if vacuum:
+            conn = sqlite3.connect(db_path)
+            conn.execute("VACUUM")
+            conn.close()
+        print(f"🗂️ Moved {moved} rows of closed months into partitions under '{partition_dir}'"
+              f"{f', {restored} latest rows back into the current table' if restored else ''}.")
+        bump_data_version(db_path=db_path)
+    return moved
+
+
+'''replay'''
+
+# user state and caches that don't derive from the scraped history; copied as-is into a replayed database
+REPLAY_CARRY_TABLES = ['watches', 'watch_outbox', 'thumbnails', 'model_groups', 'model_group_bands',
+                       'price_events', 'event_cursors']
+
+
+def _replay_clean_date(scrape_date, archive_dir=RAW_ARCHIVE_DIR):
+    """
+    Worker task of the replay: validation, dedup, fingerprint and steps 1-4 for one archived scrape
+    """
+    raw = read_raw_snapshot(scrape_date, columns=RAW_COLUMNS, archive_dir=archive_dir)
+    valid, rejected, failures = validate_batch(raw)
+    valid = valid.drop_duplicates(subset=['asin'], keep='first')
+    valid = valid.assign(content_hash=content_fingerprints(valid))
+    return scrape_date, clean_chunk(valid), rejected, failures
+
+
+def _replay_fingerprint_date(scrape_date, archive_dir=RAW_ARCHIVE_DIR):
+    """
+    Worker task of a partial replay: content_hash of every listing on one archived scrape before the replayed range
+    """
+    raw = read_raw_snapshot(scrape_date, columns=RAW_COLUMNS, archive_dir=archive_dir)
+    valid = validate_batch(raw)[0].drop_duplicates(subset=['asin'], keep='first')
+    return valid[['asin', 'scrape_date']].assign(content_hash=content_fingerprints(valid))
+
+
+def _seed_replay(conn, db_path, first_date, table_name="laptops"):
+    """
+    Copy into the replay database what the replay does not rebuild: the REPLAY_CARRY_TABLES,
+    and the raw rows, rollups and seen markers from before the first replayed date.
+    Returns the stored rows dated after the replayed range, which are added back unchanged at the end.
+    """
+    if not os.path.exists(db_path):
+        return pd.DataFrame()
+    conn.execute("ATTACH DATABASE ? AS live", (db_path,))
+    live_tables = {row[0] for row in conn.execute("SELECT name FROM live.sqlite_master WHERE type = 'table'")}
+    for table in REPLAY_CARRY_TABLES:
+        if table in live_tables:
+            conn.execute(f"INSERT INTO main.{table} SELECT * FROM live.{table}")
+    for table in ROLLUP_TABLES.values():
+        if table in live_tables:
+            conn.execute(f"INSERT INTO main.{table} SELECT * FROM live.{table} WHERE period_start < ?", (first_date,))
+    if 'listing_seen' in live_tables:
+        conn.execute("INSERT INTO main.listing_seen SELECT * FROM live.listing_seen WHERE scrape_date < ?", (first_date,))
+    conn.commit()
+    conn.execute("DETACH DATABASE live")
+    if table_name not in live_tables:
+        return pd.DataFrame()
+    # the live history spans the current table and its month partitions
+    return fetch_merged_data_from_sqlite(db_path=db_path, table_name=table_name)
+
+
+def _stage_partition_swap(tmp_path, replay_dir, partition_dir=PARTITION_DIR):
+    """
+    Point the registry of a replayed database at the paths its partition files will have under partition_dir,
+    before anything is swapped. Returns the (replayed file, live path) renames and the file names it keeps.
+    """
+    conn = sqlite3.connect(tmp_path)
+    _init_partition_registry(conn)
+    moves, kept = [], set()
+    for name, path in conn.execute("SELECT name, path FROM partitions").fetchall():
+        target = os.path.join(partition_dir, os.path.basename(path))
+        if os.path.abspath(path) != os.path.abspath(target) and os.path.exists(path):
+            moves.append((path, target))
+        conn.execute("UPDATE partitions SET path = ? WHERE name = ?", (target, name))
+        kept.add(os.path.basename(path))
+    conn.commit()
+    conn.close()
+    return moves, kept
+
+
+def _release_wal(db_path):
+    """
+    Checkpoint the write-ahead log of db_path into the file and remove its -wal / -shm sidecars,
+    so a database renamed over it never meets a log written for the old one
+    """
+    if os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+
+def replay_history(start=None, end=None, workers=None, archive_dir=RAW_ARCHIVE_DIR,
+                   db_path="laptop_prices.db", table_name="laptops", partition_dir=PARTITION_DIR):
+    """
+    Rebuild the listing history from the archived raw snapshots between `start` and `end` (inclusive, YYYY-MM-DD):
+    - dates are validated and cleaned (steps 1-4) in parallel processes,
+    - then each date goes through the rest of the weekly run in date order: unchanged-listing skip, imputation,
+      grouping, update_merged_data, compact_history and partition_history, with one VACUUM at the end,
+    - everything is written to a fresh database and fresh partition files, and only once all of it is staged
+      are the month files and then the database renamed into place, the live write-ahead log checkpointed
+      and removed first.
+    Replaying every archived date gives the same history, rollups and partitions as the weekly runs did
+    (fair prices and other derived tables are rebuilt by their own stages afterwards).
+    For a partial range, stored rows before `start` seed the replay, rows after `end` are added back
+    as they were, and imputation statistics only cover the replayed dates.
+    """
+    archived = list_raw_snapshots(archive_dir)
+    dates = [d for d in archived if (start is None or d >= start) and (end is None or d <= end)]
+    if not dates:
+        print(f"⚠️ No archived snapshots between {start} and {end} in '{archive_dir}'.")
+        return None
+    earlier = [d for d in archived if d < dates[0]]
+    workers = workers or os.cpu_count() or 1
+
+    tmp_path = db_path + ".replay"
+    replay_dir = partition_dir + ".replay"
+    batch_path = tmp_path + ".csv"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    shutil.rmtree(replay_dir, ignore_errors=True)
+    conn = sqlite3.connect(tmp_path)
+    for init in (_init_watch_tables, _init_thumbnail_table, _init_model_group_tables, _init_rollup_tables,
+                 _init_fingerprint_tables, _init_event_tables):
+        init(conn)
+    stored = _seed_replay(conn, db_path, dates[0], table_name)
+    conn.close()
+    if not stored.empty:
+        before = stored[stored['scrape_date'] < dates[0]]
+        after = stored[stored['scrape_date'] > dates[-1]]
+        if not before.empty:
+            upsert_to_sqlite(before, db_path=tmp_path, table_name=table_name)
+            store_fingerprints(before, db_path=tmp_path)
+    else:
+        after = stored
+
+    seen = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if earlier:
+            # a listing's fingerprint is its last observation before the range, which may have been compacted away
+            fingerprints = pd.concat(pool.map(_replay_fingerprint_date, earlier, [archive_dir] * len(earlier)))
+            store_fingerprints(fingerprints, db_path=tmp_path)
+        # map yields in date order, so the stateful steps below run exactly as the weekly pipeline would
+        for scrape_date, cleaned, rejected, failures in pool.map(_replay_clean_date, dates, [archive_dir] * len(dates)):
+            record_validation(rejected, failures, db_path=tmp_path)
+            cleaned, unchanged = skip_unchanged(cleaned, load_fingerprints(db_path=tmp_path), db_path=tmp_path)
+            seen += unchanged
+            if not cleaned.empty:
+                cleaned = fill_missing(cleaned, db_path=tmp_path)
+                cleaned = cleaned.drop_duplicates(subset=["asin"], keep="first")
+                cleaned = assign_model_groups(cleaned, db_path=tmp_path)
+            cleaned.to_csv(batch_path)  # the same CSV round trip as cleaned_Data.csv
+            update_merged_data(batch_path, db_path=tmp_path, table_name=table_name)
+            # which rows sit in partitions decides which ones the next merge refreshes, so retention runs every date;
+            # the freed pages are only worth returning once, at the end
+            compact_history(db_path=tmp_path, table_name=table_name, vacuum=False)
+            partition_history(db_path=tmp_path, table_name=table_name, partition_dir=replay_dir, vacuum=False)
+    os.remove(batch_path)
+    if not after.empty:
+        upsert_to_sqlite(after, db_path=tmp_path, table_name=table_name)
+        bump_data_version(db_path=tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("VACUUM")
+    conn.close()
+
+    enable_wal(tmp_path)
+    moves, kept = _stage_partition_swap(tmp_path, replay_dir, partition_dir)
+    _release_wal(tmp_path)
+    _release_wal(db_path)
+    # everything is staged: the swap is only renames, the month files first, then the database naming them
+    os.makedirs(partition_dir, exist_ok=True)
+    for path, target in moves:
+        os.replace(path, target)
+    os.replace(tmp_path, db_path)
+    for name in os.listdir(partition_dir):
+        if name.endswith(".db") and name not in kept:
+            os.remove(os.path.join(partition_dir, name))
+    shutil.rmtree(replay_dir, ignore_errors=True)
+    history = fetch_merged_data_from_sqlite(db_path=db_path, table_name=table_name)
+    print(f"⏪ Replayed {len(dates)} snapshots ({dates[0]} to {dates[-1]}) with {workers} workers: "
+          f"{len(history)} rows stored, {seen} seen-again markers.")
+    return history
+
+
+'''price watches'''
+
+WATCH_KINDS = ['asin', 'brand', 'drop']
+
+
+def _init_watch_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS watches (
+            watch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            asin TEXT,
+            brand TEXT,
+            min_ram_gb REAL,
+            max_price REAL,
+            min_drop_percent REAL,
+            contact TEXT,
+            active INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_watches_kind ON watches(active, kind);
+        CREATE TABLE IF NOT EXISTS watch_outbox (
+            outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            watch_id INTEGER NOT NULL,
+            contact TEXT,
+            asin TEXT NOT NULL,
+            scrape_date TEXT NOT NULL,
+            price REAL,
+            reason TEXT,
+            created_at TEXT,
+            sent_at TEXT,
+            UNIQUE(watch_id, asin, scrape_date)
+        );
+        CREATE INDEX IF NOT EXISTS idx_watch_outbox_pending ON watch_outbox(sent_at, outbox_id);
+    """)
+
+
+def add_watch(kind, asin=None, brand=None, min_ram_gb=None, max_price=None, min_drop_percent=None,
+              contact=None, db_path="laptop_prices.db"):
+    """
+    Register a price watch and return its id:
+    - kind='asin': `asin` priced at or under `max_price`
+    - kind='brand': any `brand` laptop with at least `min_ram_gb` RAM at or under `max_price`
+    - kind='drop': a price drop of more than `min_drop_percent` (optionally limited to `brand`)
+    """
+    if kind not in WATCH_KINDS:
+        raise ValueError(f"Unknown watch kind '{kind}', expected one of {WATCH_KINDS}")
+    if kind == 'asin' and (asin is None or max_price is None):
+        raise ValueError("An 'asin' watch needs both asin and max_price")
+    if kind == 'brand' and (brand is None or max_price is None):
+        raise ValueError("A 'brand' watch needs both brand and max_price")
+    if kind == 'drop' and min_drop_percent is None:
+        raise ValueError("A 'drop' watch needs min_drop_percent")
+
+    conn = sqlite3.connect(db_path)
+    _init_watch_tables(conn)
+    cursor = conn.execute(
+        """INSERT INTO watches (kind, asin, brand, min_ram_gb, max_price, min_drop_percent, contact, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        (kind, asin, brand, min_ram_gb, max_price, min_drop_percent, contact, datetime.datetime.now().isoformat())
+    )
+    watch_id = cursor.lastrowid
+    conn.commit()
+    conn.close()
+    return watch_id
+
+
+def match_watches(changed_df, watches):
+    """
+    Match every watch against the changed rows in one batch, without looping over watches x rows:
+    ASIN and brand watches are hash joins, drop watches use a sorted-threshold search.
+    """
+    rows = changed_df.assign(
+        ram_gb=spec_to_gb(changed_df['ram']).fillna(0),
+        drop_percent=-changed_df['price_change_percent'].fillna(0),
+    )
+    row_cols = ['asin', 'brand', 'scrape_date', 'extracted_price', 'ram_gb', 'drop_percent']
+    rows = rows[row_cols]
+    watch_cols = ['watch_id', 'contact', 'min_ram_gb', 'max_price', 'min_drop_percent']
+    matches = []
+
+    # 1. specific ASIN under a target price
+    asin_watches = watches.loc[watches['kind'] == 'asin', watch_cols + ['asin']]
+    hit = rows.merge(asin_watches, on='asin')
+    hit = hit[hit['extracted_price'] <= hit['max_price']]
+    hit['reason'] = 'price $' + hit['extracted_price'].round(2).astype(str) + ' <= target $' + hit['max_price'].astype(str)
+    matches.append(hit)
+
+    # 2. any laptop of a brand with enough RAM under a price
+    brand_watches = watches.loc[watches['kind'] == 'brand', watch_cols + ['brand']]
+    hit = rows.merge(brand_watches, on='brand')
+    hit = hit[(hit['ram_gb'] >= hit['min_ram_gb'].fillna(0)) & (hit['extracted_price'] <= hit['max_price'])]
+    hit['reason'] = hit['brand'] + ' with ' + hit['ram_gb'].astype(int).astype(str) + ' GB RAM at $' + hit['extracted_price'].round(2).astype(str)
+    matches.append(hit)
+
+    # 3. drops larger than a threshold: a row matches every watch whose threshold sorts below its drop
+    drop_watches = watches.loc[watches['kind'] == 'drop', watch_cols + ['brand']].sort_values('min_drop_percent')
+    dropped = rows[rows['drop_percent'] > 0]
+    if len(drop_watches) and len(dropped):
+        counts = np.searchsorted(drop_watches['min_drop_percent'].to_numpy(), dropped['drop_percent'].to_numpy(), side='left')
+        row_idx = np.repeat(np.arange(len(dropped)), counts)
+        watch_idx = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        hit = pd.concat([
+            dropped.iloc[row_idx].reset_index(drop=True),
+            drop_watches.iloc[watch_idx].reset_index(drop=True).rename(columns={'brand': 'watch_brand'}),
+        ], axis=1)
+        hit = hit[hit['watch_brand'].isna() | (hit['watch_brand'] == hit['brand'])]
+        hit['reason'] = 'price dropped ' + hit['drop_percent'].round(1).astype(str) + '%'
+        matches.append(hit)
+
+    result = pd.concat(matches, ignore_index=True)
+    return result[['watch_id', 'contact', 'asin', 'scrape_date', 'extracted_price', 'reason']]
+
+
+def evaluate_watches(changed_df, db_path="laptop_prices.db"):
+    """
+    Evaluate all active watches against the rows changed by the last update_merged_data run
+    and queue the matches in the watch_outbox table. Returns the number of new matches.
+    """
+    conn = sqlite3.connect(db_path)
+    _init_watch_tables(conn)
+    watches = pd.read_sql_query("SELECT * FROM watches WHERE active = 1", conn)
+    if watches.empty or changed_df is None or changed_df.empty:
+        conn.close()
+        return 0
+
+    matched = match_watches(changed_df, watches)
+    matched['scrape_date'] = pd.to_datetime(matched['scrape_date']).dt.strftime('%Y-%m-%d')
+    matched['created_at'] = datetime.datetime.now().isoformat()
+
+    before = conn.total_changes
+    conn.executemany(
+        """INSERT OR IGNORE INTO watch_outbox (watch_id, contact, asin, scrape_date, price, reason, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        matched[['watch_id', 'contact', 'asin', 'scrape_date', 'extracted_price', 'reason', 'created_at']].values.tolist()
+    )
+    conn.commit()
+    queued = conn.total_changes - before
+    conn.close()
+    print(f"🔔 {queued} watch matches queued from {len(changed_df)} changed rows and {len(watches)} watches.")
+    return queued
+
+
+def drain_watch_outbox(limit=100, db_path="laptop_prices.db"):
+    """
+    Hand the oldest unsent matches to a notifier and mark them as sent
+    """
+    conn = sqlite3.connect(db_path)
+    _init_watch_tables(conn)
+    pending = pd.read_sql_query(
+        "SELECT * FROM watch_outbox WHERE sent_at IS NULL ORDER BY outbox_id LIMIT ?", conn, params=(limit,)
+    )
+    if not pending.empty:
+        conn.executemany(
+            "UPDATE watch_outbox SET sent_at = ? WHERE outbox_id = ?",
+            [(datetime.datetime.now().isoformat(), int(i)) for i in pending['outbox_id']]
+        )
+        conn.commit()
+    conn.close()
+    return pending
+
+
+'''price events'''
+
+EVENT_KINDS = ['new_listing', 'price_change', 'rating_change', 'delisted']
+EVENT_BATCH = 500
+RATING_EVENT_STEP = 0.1  # one displayed rating step
+
+
+def _init_event_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS price_events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            asin TEXT NOT NULL,
+            scrape_date TEXT NOT NULL,
+            old_value REAL,
+            new_value REAL,
+            change_percent REAL,
+            recorded_at TEXT,
+            UNIQUE(kind, asin, scrape_date)
+        );
+        CREATE TABLE IF NOT EXISTS event_cursors (
+            consumer TEXT PRIMARY KEY,
+            last_seq INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT
+        );
+    """)
+
+
+def _delisted_events(conn, table_name="laptops"):
+    """
+    ASINs present on the scrape before the newest one (as a row or a seen-again marker) and absent from the newest
+    """
+    dates = f"""SELECT substr(scrape_date, 1, 10) AS day FROM {table_name}_all
+                UNION SELECT substr(scrape_date, 1, 10) FROM listing_seen"""
+    newest = conn.execute(f"SELECT MAX(day) FROM ({dates})").fetchone()[0]
+    previous = None if newest is None else conn.execute(f"SELECT MAX(day) FROM ({dates}) WHERE day < ?", (newest,)).fetchone()[0]
+    if previous is None:
+        return pd.DataFrame(columns=['kind', 'asin', 'scrape_date', 'old_value', 'new_value', 'change_percent'])
+    return pd.read_sql_query(f"""
+        WITH present AS (
+            SELECT asin, substr(scrape_date, 1, 10) AS day FROM {table_name}_all WHERE substr(scrape_date, 1, 10) IN (?, ?)
+            UNION SELECT asin, substr(scrape_date, 1, 10) FROM listing_seen WHERE substr(scrape_date, 1, 10) IN (?, ?)
+        )
+        SELECT 'delisted' AS kind, p.asin, ? AS scrape_date,
+               (SELECT l.extracted_price FROM {table_name}_all l WHERE l.asin = p.asin
+                ORDER BY l.scrape_date DESC LIMIT 1) AS old_value,
+               NULL AS new_value, NULL AS change_percent
+        FROM present p
+        WHERE p.day = ? AND p.asin NOT IN (SELECT asin FROM present WHERE day = ?)
+    """, conn, params=(previous, newest, previous, newest, newest, previous, newest))
+
+
+def record_price_events(combined_df=None, batch_keys=None, db_path="laptop_prices.db", table_name="laptops"):
+    """
+    Append the events of the scrape just merged to the price_events log: new_listing, price_change and
+    rating_change for the rows in `batch_keys` (compared against each ASIN's previous row in `combined_df`;
+    rating_change only between two observed ratings, never imputed ones), and delisted for listings that were on the previous scrape but not on this one, seen-again markers included.
+    Events are unique per (kind, asin, scrape_date), so merging the same scrape again adds nothing.
+    """
+    columns = ['kind', 'asin', 'scrape_date', 'old_value', 'new_value', 'change_percent']
+    events = []
+    if combined_df is not None and batch_keys is not None and not batch_keys.empty:
+        # a rating filled in by fill_missing (or stored before imputed ones were flagged) is not an observation
+        flags = combined_df['rating_imputed'] if 'rating_imputed' in combined_df.columns else None
+        observed = combined_df['rating'].where(flags == 'No') if flags is not None else combined_df['rating'] * np.nan
+        df = combined_df.assign(observed_rating=observed, previous_rating=observed.groupby(combined_df['asin']).shift(1))
+        df = df.merge(batch_keys, on=['asin', 'scrape_date'], how='inner')
+        is_new = df['previous_scrape_date'] == df['scrape_date']
+        df['scrape_date'] = pd.to_datetime(df['scrape_date']).dt.strftime('%Y-%m-%d')
+        new = df[is_new]
+        new = new.assign(kind='new_listing', old_value=None, new_value=new['extracted_price'], change_percent=None)
+        moved = df[~is_new & (df['price_difference'] != 0)]
+        moved = moved.assign(kind='price_change', old_value=moved['previous_price'], new_value=moved['extracted_price'],
+                             change_percent=moved['price_change_percent'])
+        rated = df[~is_new & df['previous_rating'].notna() & df['observed_rating'].notna()
+                   & ((df['rating'] - df['previous_rating']).abs() >= RATING_EVENT_STEP - 1e-9)]
+        rated = rated.assign(kind='rating_change', old_value=rated['previous_rating'], new_value=rated['rating'],
+                             change_percent=(rated['rating'] - rated['previous_rating']) / rated['previous_rating'] * 100)
+        for part in [new, moved, rated]:
+            events += part[columns].astype(object).where(part[columns].notna(), None).values.tolist()
+
+    conn = connect_partitioned(db_path, table_name=table_name)
+    _init_event_tables(conn)
+    _init_fingerprint_tables(conn)
+    if conn.execute(f'PRAGMA main.table_info("{table_name}")').fetchall():
+        delisted = _delisted_events(conn, table_name)
+        events += delisted[columns].astype(object).where(delisted[columns].notna(), None).values.tolist()
+    if not events:
+        conn.close()
+        return 0
+
+    # staged first so only unseen events take a sequence number; a scrape's events go in kind order, then by ASIN
+    conn.execute("CREATE TEMP TABLE new_events (kind TEXT, asin TEXT, scrape_date TEXT, old_value REAL, new_value REAL, "
+                 "change_percent REAL, kind_order INTEGER)")
+    conn.executemany("INSERT INTO new_events VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     [event + [EVENT_KINDS.index(event[0])] for event in events])
+    last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM price_events").fetchone()[0]
+    conn.execute("""
+        INSERT INTO price_events (kind, asin, scrape_date, old_value, new_value, change_percent, recorded_at)
+        SELECT n.kind, n.asin, n.scrape_date, n.old_value, n.new_value, n.change_percent, ?
+        FROM new_events n
+        WHERE NOT EXISTS (SELECT 1 FROM price_events e
+                          WHERE e.kind = n.kind AND e.asin = n.asin AND e.scrape_date = n.scrape_date)
+        ORDER BY n.kind_order, n.asin
+    """, (datetime.datetime.now().isoformat(),))
+    conn.commit()
+    counts = dict(conn.execute("SELECT kind, COUNT(*) FROM price_events WHERE seq > ? GROUP BY kind", (last_seq,)).fetchall())
+    conn.close()
+    recorded = sum(counts.values())
+    print(f"📣 {recorded} price events recorded ({', '.join(f'{k}: {v}' for k, v in counts.items()) or 'all seen before'}).")
+    return recorded
+
+
+def read_events(after_seq=0, limit=EVENT_BATCH, kinds=None, db_path="laptop_prices.db"):
+    """
+    Events with seq > after_seq, oldest first: a range scan of the primary key, so polling for new events is cheap
+    """
+    conn = sqlite3.connect(db_path)
+    _init_event_tables(conn)
+    query = "SELECT * FROM price_events WHERE seq > ?"
+    params = [int(after_seq)]
+    if kinds:
+        query += f" AND kind IN ({', '.join(['?'] * len(kinds))})"
+        params += list(kinds)
+    df = pd.read_sql_query(query + " ORDER BY seq LIMIT ?", conn, params=params + [int(limit)])
+    conn.close()
+    return df
+
+
+def tail_events(consumer, limit=EVENT_BATCH, kinds=None, db_path="laptop_prices.db"):
+    """
+    The next events for `consumer` after its committed cursor; call commit_events once they are handled
+    """
+    conn = sqlite3.connect(db_path)
+    _init_event_tables(conn)
+    row = conn.execute("SELECT last_seq FROM event_cursors WHERE consumer = ?", (consumer,)).fetchone()
+    conn.close()
+    return read_events(after_seq=row[0] if row else 0, limit=limit, kinds=kinds, db_path=db_path)
+
+
+def commit_events(consumer, last_seq, db_path="laptop_prices.db"):
+    """
+    Move `consumer`'s cursor to last_seq; it never moves backwards, so a late commit can't replay events
+    """
+    conn = sqlite3.connect(db_path)
+    _init_event_tables(conn)
+    conn.execute("""
+        INSERT INTO event_cursors (consumer, last_seq, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(consumer) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq), updated_at = excluded.updated_at
+    """, (consumer, int(last_seq), datetime.datetime.now().isoformat()))
+    conn.commit()
+    conn.close()
+
+
+'''similar laptops'''
+
+SIMILARITY_INDEX_PATH = "similar_index.npz"
+SIMILAR_OS_CATEGORIES = ['Windows', 'Chrome', 'Mac', 'Linux']
+
+
+def build_spec_features(df):
+    """
+    Normalized spec feature matrix (float32, one row per listing):
+    z-scored log RAM, log storage, display size and rating, plus one-hot OS family and brand
+    """
+    numeric = pd.DataFrame({
+        'ram': np.log2(spec_to_gb(df['ram']).where(lambda gb: gb > 0)),
+        'disk': np.log2(spec_to_gb(df['disk_size']).where(lambda gb: gb > 0)),
+        'display': pd.to_numeric(df['display_size'].astype(str).str.extract(r'([\d.]+)')[0], errors='coerce'),
+        'rating': pd.to_numeric(df['rating'], errors='coerce'),
+    })
+    numeric = (numeric - numeric.mean()) / numeric.std().replace(0, 1)
+    numeric = numeric.fillna(0)  # unknown spec sits at the average
+
+    os_text = df['operating_system'].astype(str).str.lower()
+    os_onehot = pd.DataFrame({name: os_text.str.contains(name.lower(), regex=False) for name in SIMILAR_OS_CATEGORIES})
+    brand_onehot = pd.get_dummies(extract_brand(df['title']))
+    return np.hstack([numeric.to_numpy(), os_onehot.to_numpy(), brand_onehot.to_numpy()]).astype(np.float32)
+
+
+def build_similarity_index(db_path="laptop_prices.db", path=SIMILARITY_INDEX_PATH, force=False):
+    """
+    Precompute the feature matrix of the latest listings; rebuilt only when the data version changes.
+    A pipeline step: the app only loads the file, which is swapped in whole so a reader never sees it half written.
+    """
+    version = get_data_version(db_path=db_path)
+    if not force and os.path.exists(path):
+        with np.load(path, allow_pickle=False) as existing:
+            if str(existing['version']) == version:
+                return path
+
+    latest = fetch_latest_listings(db_path=db_path)
+    features = build_spec_features(latest)
+    with open(path + ".tmp", "wb") as f:
+        np.savez(
+            f,
+            features=features,
+            sq_norms=(features ** 2).sum(axis=1),
+            asins=latest['asin'].to_numpy(dtype=str),
+            prices=latest['extracted_price'].to_numpy(dtype=np.float64),
+            version=np.array(version),
+        )
+    os.replace(path + ".tmp", path)
+    print(f"🧭 Similarity index built for {len(latest)} laptops (version {version}).")
+    return path
+
+
+def load_similarity_index(path=SIMILARITY_INDEX_PATH, data_version=None):
+    """
+    The similarity index built by the pipeline; None when it was never built or does not match `data_version`
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        if data_version is not None and str(data['version']) != data_version:
+            return None
+        index = {key: data[key] for key in data.files}
+    index['position'] = pd.Series(np.arange(len(index['asins'])), index=index['asins'])
+    return index
+
+
+def similar_laptops(asin, index, k=5, cheaper_only=True):
+    """
+    Top-k nearest listings to `asin` by spec distance (optionally only cheaper ones)
+    """
+    if index is None or asin not in index['position'].index:
+        return pd.DataFrame(columns=['asin', 'distance', 'extracted_price'])
+    i = index['position'][asin]
+    features = index['features']
+    distance = index['sq_norms'] + index['sq_norms'][i] - 2 * features @ features[i]
+    distance[i] = np.inf
+    if cheaper_only:
+        distance[index['prices'] >= index['prices'][i]] = np.inf
+
+    k = min(k, int(np.isfinite(distance).sum()))
+    if k == 0:
+        return pd.DataFrame(columns=['asin', 'distance', 'extracted_price'])
+    nearest = np.argpartition(distance, k - 1)[:k]
+    nearest = nearest[np.argsort(distance[nearest])]
+    return pd.DataFrame({
+        'asin': index['asins'][nearest],
+        'distance': np.sqrt(np.maximum(distance[nearest], 0)),
+        'extracted_price': index['prices'][nearest],
+    })
+
+
+def build_cheaper_alternatives(k=3, block_size=1024, db_path="laptop_prices.db", path=SIMILARITY_INDEX_PATH):
+    """
+    Batch mode: fill the cheaper_alternatives table with the k most similar cheaper laptops of every product,
+    computing distances one block of rows at a time
+    """
+    index = load_similarity_index(build_similarity_index(db_path=db_path, path=path))
+    features, sq_norms, prices, asins = index['features'], index['sq_norms'], index['prices'], index['asins']
+    k = min(k, len(asins) - 1)
+    rows = []
+    for start in range(0, len(asins), block_size):
+        stop = min(start + block_size, len(asins))
+        distance = sq_norms[start:stop, None] + sq_norms[None, :] - 2 * features[start:stop] @ features.T
+        distance[prices[None, :] >= prices[start:stop, None]] = np.inf  # also drops the product itself
+        nearest = np.argpartition(distance, k - 1, axis=1)[:, :k] if k > 0 else np.empty((stop - start, 0), dtype=int)
+        nearest_distance = np.take_along_axis(distance, nearest, axis=1)
+        order = np.argsort(nearest_distance, axis=1)
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        nearest_distance = np.take_along_axis(nearest_distance, order, axis=1)
+        for rank in range(k):
+            found = np.isfinite(nearest_distance[:, rank])
+            source = np.arange(start, stop)[found]
+            target = nearest[found, rank]
+            rows.append(pd.DataFrame({
+                'asin': asins[source],
+                'rank': rank + 1,
+                'alt_asin': asins[target],
+                'distance': np.sqrt(np.maximum(nearest_distance[found, rank], 0)),
+                'price_saving': prices[source] - prices[target],
+            }))
+
+    alternatives = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(
+        columns=['asin', 'rank', 'alt_asin', 'distance', 'price_saving'])
+    conn = sqlite3.connect(db_path)
+    alternatives.to_sql("cheaper_alternatives", conn, if_exists="replace", index=False)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_cheaper_alternatives_asin ON cheaper_alternatives(asin, rank)")
+    conn.commit()
+    conn.close()
+    print(f"💸 Stored {len(alternatives)} cheaper alternatives.")
+    return alternatives
+
+
+'''fair-value price model'''
+
+MODEL_DIR = "models"
+MODEL_KEEP = 3  # trained versions kept on disk, the latest included
+VALUE_LABEL_PERCENT = 15  # |value_score| beyond this is under- / over-priced
+
+
+def _fair_price_features(df):
+    os_text = df['operating_system'].astype(str).str.lower()
+    return pd.DataFrame({
+        'ram_gb': spec_to_gb(df['ram']),
+        'disk_gb': spec_to_gb(df['disk_size']),
+        'display_in': pd.to_numeric(df['display_size'].astype(str).str.extract(r'([\d.]+)')[0], errors='coerce'),
+        'rating': pd.to_numeric(df['rating'], errors='coerce'),
+        'log_reviews': np.log1p(pd.to_numeric(df['reviews'], errors='coerce').clip(lower=0)),
+        'brand': extract_brand(df['title']),
+        'os_family': np.select(
+            [os_text.str.contains(name.lower(), regex=False) for name in SIMILAR_OS_CATEGORIES],
+            SIMILAR_OS_CATEGORIES, default='Other'
+        ),
+    }, index=df.index)
+
+
+def train_fair_price_model(db_path="laptop_prices.db", model_dir=MODEL_DIR):
+    """
+    Fit a regression of log price on normalized specs and brand over the latest listing of every ASIN,
+    and save it as a versioned artifact (models/fair_price_<data version>.joblib), keeping the MODEL_KEEP newest
+    """
+    import joblib
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+    from sklearn.impute import SimpleImputer
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.model_selection import cross_val_score
+
+    version = get_data_version(db_path=db_path)
+    latest = fetch_latest_listings(db_path=db_path)
+    latest = latest[pd.to_numeric(latest['extracted_price'], errors='coerce') > 0]
+    X = _fair_price_features(latest)
+    y = np.log(latest['extracted_price'].astype(float))
+
+    numeric = ['ram_gb', 'disk_gb', 'display_in', 'rating', 'log_reviews']
+    categorical = ['brand', 'os_family']
+    model = Pipeline([
+        ('features', ColumnTransformer([
+            ('numeric', Pipeline([('impute', SimpleImputer(strategy='median')), ('scale', StandardScaler())]), numeric),
+            ('categorical', OneHotEncoder(handle_unknown='ignore'), categorical),
+        ])),
+        ('regressor', GradientBoostingRegressor(n_estimators=200, max_depth=3, learning_rate=0.05, random_state=0)),
+    ])
+    folds = min(5, len(latest))
+    cv_mae = -cross_val_score(model, X, y, cv=folds, scoring='neg_mean_absolute_error').mean() if folds >= 2 else None
+    model.fit(X, y)
+
+    os.makedirs(model_dir, exist_ok=True)
+    artifact_path = os.path.join(model_dir, f"fair_price_{version}.joblib")
+    joblib.dump(model, artifact_path)
+    meta = {
+        'artifact': artifact_path,
+        'data_version': version,
+        'trained_at': datetime.datetime.now().isoformat(),
+        'rows': int(len(latest)),
+        'cv_mae_log_price': cv_mae,
+    }
+    with open(os.path.join(model_dir, "fair_price_latest.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    older = sorted(name for name in os.listdir(model_dir)
+                   if re.fullmatch(r"fair_price_\d+\.joblib", name) and name != os.path.basename(artifact_path))
+    for old in older[:max(len(older) - (MODEL_KEEP - 1), 0)]:
+        os.remove(os.path.join(model_dir, old))
+    print(f"📐 Fair-price model trained on {len(latest)} laptops -> {artifact_path}")
+    return artifact_path
+
+
+def score_fair_prices(db_path="laptop_prices.db", table_name="laptops", model_dir=MODEL_DIR):
+    """
+    Batch-score every row with the latest fair-price model and store
+    fair_price, value_score (% below fair value, positive = under-priced) and value_label
+    """
+    import joblib
+
+    with open(os.path.join(model_dir, "fair_price_latest.json")) as f:
+        meta = json.load(f)
+    model = joblib.load(meta['artifact'])
+
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(
+        f"SELECT asin, scrape_date, extracted_price, rating, reviews, title, ram, disk_size, display_size, operating_system FROM {table_name}",
+        conn
+    )
+    fair_price = np.exp(model.predict(_fair_price_features(df)))
+    price = pd.to_numeric(df['extracted_price'], errors='coerce').to_numpy()
+    value_score = (fair_price - price) / fair_price * 100
+    value_label = np.select(
+        [value_score >= VALUE_LABEL_PERCENT, value_score <= -VALUE_LABEL_PERCENT],
+        ['Under-priced', 'Over-priced'], default='Fair'
+    )
+
+    existing_cols = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    for col, col_type in [('fair_price', 'REAL'), ('value_score', 'REAL'), ('value_label', 'TEXT'), ('fair_price_model', 'TEXT')]:
+        if col not in existing_cols:
+            conn.execute(f'ALTER TABLE {table_name} ADD COLUMN "{col}" {col_type}')
+    conn.executemany(
+        f"UPDATE {table_name} SET fair_price = ?, value_score = ?, value_label = ?, fair_price_model = ? WHERE asin = ? AND scrape_date = ?",
+        zip(fair_price.round(2).tolist(), value_score.round(2).tolist(), value_label.tolist(),
+            [meta['data_version']] * len(df), df['asin'], df['scrape_date'])
+    )
+    conn.commit()
+    conn.close()
+    print(f"🏷️ Scored {len(df)} rows: {(value_label == 'Under-priced').sum()} under-priced, {(value_label == 'Over-priced').sum()} over-priced.")
+    return df.assign(fair_price=fair_price, value_score=value_score, value_label=value_label)
+
+
+'''thumbnail cache'''
+
+THUMB_CACHE_DIR = "thumb_cache"
+THUMB_SIZE = (160, 120)  # cards show 80x60, keep 2x for high-DPI screens
+THUMB_FETCH_WORKERS = 8
+
+
+def fetch_image(url, timeout=10):
+    """
+    Default thumbnail fetcher; anything taking a URL and returning image bytes can replace it
+    """
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+def _init_thumbnail_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS thumbnails (
+            url TEXT PRIMARY KEY,
+            content_hash TEXT,
+            path TEXT,
+            fetched_at TEXT
+        )
+    """)
+
+
+def _resize_thumbnail(raw, size):
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(raw)).convert('RGB')
+    image.thumbnail(size)
+    out = io.BytesIO()
+    image.save(out, format='JPEG', quality=80, optimize=True)
+    return out.getvalue()
+
+
+def cache_thumbnails(db_path="laptop_prices.db", table_name="laptops", cache_dir=THUMB_CACHE_DIR,
+                     fetcher=fetch_image, size=THUMB_SIZE, workers=THUMB_FETCH_WORKERS, write_lock=None):
+    """
+    Fetch every thumbnail URL not cached yet, resize it and store it under its content hash
+    (thumb_cache/ab/abcdef....jpg), so identical images shared by several listings are kept once.
+    `write_lock` is held only while the database is written, so the fetches run alongside other writers.
+    """
+    conn = connect_reader(db_path)
+    cached = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'thumbnails'").fetchone()
+    urls = [row[0] for row in conn.execute(f"""
+        SELECT DISTINCT l.thumbnail FROM {table_name} l
+        WHERE l.thumbnail LIKE 'http%' {"AND l.thumbnail NOT IN (SELECT url FROM thumbnails)" if cached else ""}
+    """)]
+    conn.close()
+
+    def fetch(url):
+        try:
+            return url, _resize_thumbnail(fetcher(url), size)
+        except Exception as e:
+            print(f"⚠️ Thumbnail fetch failed for {url}: {e}")
+            return url, None
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for url, data in pool.map(fetch, urls):
+            if data is None:
+                continue  # retried on the next run
+            content_hash = hashlib.sha256(data).hexdigest()
+            path = os.path.join(cache_dir, content_hash[:2], f"{content_hash}.jpg")
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+            rows.append((url, content_hash, path, datetime.datetime.now().isoformat()))
+
+    with write_lock or contextlib.nullcontext():
+        conn = sqlite3.connect(db_path)
+        _init_thumbnail_table(conn)
+        conn.executemany("INSERT OR REPLACE INTO thumbnails (url, content_hash, path, fetched_at) VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+    print(f"🖼️ Cached {len(rows)} of {len(urls)} new thumbnails in '{cache_dir}'.")
+    return len(rows)
+
+
+def load_thumbnail_uris(db_path="laptop_prices.db"):
+    """
+    Map of original thumbnail URL -> inline data URI of the cached copy
+    """
+    try:
+        conn = connect_reader(db_path)
+        rows = conn.execute("SELECT url, path FROM thumbnails").fetchall()
+        conn.close()
+    except sqlite3.OperationalError:
+        rows = []  # no thumbnail stage has run on this database
+    uris = {}
+    for url, path in rows:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                uris[url] = "data:image/jpeg;base64," + base64.b64encode(f.read()).decode()
+    return uris
+
+
+'''export'''
+
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+EXPORT_LISTING_COLUMNS = ['title', 'brand', 'link_clean', 'thumbnail', 'display_size', 'ram', 'disk_size', 'operating_system']
+EXPORT_HISTORY_COLUMNS = ['granularity', 'min_price', 'max_price', 'last_price', 'observations']
+
+
+def iter_frame_chunks(df, chunksize=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def iter_price_history(asins, chunksize=EXPORT_CHUNK_ROWS, db_path="laptop_prices.db", table_name="laptops",
+                       start_date=None, end_date=None):
+    """
+    Price history of the given ASINs (raw rows plus compacted rollups), read from SQLite in chunks
+    """
+    asins = list(dict.fromkeys(asins))
+    conn = connect_partitioned(db_path, start_date, end_date, table_name, readonly=True)
+    try:
+        # stay under SQLite's bound-parameter limit; the filter is repeated once per history level
+        for start in range(0, len(asins), 300):
+            batch = asins[start:start + 300]
+            query = price_history_query(conn, f"WHERE asin IN ({', '.join(['?'] * len(batch))})", f"{table_name}_all")
+            params = batch * query.count("WHERE asin IN")
+            for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunksize):
+                yield chunk
+    finally:
+        conn.close()
+
+
+def write_chunks(chunks, fileobj, fmt='csv'):
+    """
+    Write an iterable of DataFrame chunks as csv, csv.gz or parquet without building the whole file in memory
+    """
+    if fmt == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+        writer = None
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                # all-null columns in the first chunk would otherwise pin the whole file to the null type
+                schema = pa.schema([
+                    field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ])
+                writer = pq.ParquetWriter(fileobj, schema, compression='zstd')
+            writer.write_table(table.cast(schema))
+        if writer is not None:
+            writer.close()
+        return
+
+    stream = gzip.GzipFile(fileobj=fileobj, mode='wb') if fmt == 'csv.gz' else fileobj
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(text, index=False, header=(i == 0))
+    text.flush()
+    text.detach()
+    if stream is not fileobj:
+        stream.close()
+
+
+def iter_listings_with_history(df, chunksize=EXPORT_CHUNK_ROWS, db_path="laptop_prices.db", table_name="laptops"):
+    """
+    The listing rows followed by the price history of their ASINs, in one set of columns:
+    listing rows have granularity 'listing', history rows repeat their listing's EXPORT_LISTING_COLUMNS
+    and leave the per-scrape derived columns empty
+    """
+    columns = list(df.columns) + [col for col in EXPORT_HISTORY_COLUMNS if col not in df.columns]
+    listings = df.assign(granularity='listing', **{col: np.nan for col in EXPORT_HISTORY_COLUMNS[1:]})
+    for chunk in iter_frame_chunks(listings.reindex(columns=columns), chunksize):
+        yield chunk
+    descriptive = df[['asin'] + [col for col in EXPORT_LISTING_COLUMNS if col in df.columns]].drop_duplicates('asin')
+    for chunk in iter_price_history(df['asin'].tolist(), chunksize=chunksize, db_path=db_path, table_name=table_name):
+        chunk = chunk.merge(descriptive, on='asin', how='left').reindex(columns=columns)
+        for col in df.columns:
+            # history rows take the listing's dtypes, so csv and parquet chunks share one schema
+            if chunk[col].dtype != df[col].dtype:
+                try:
+                    chunk[col] = chunk[col].astype(df[col].dtype)
+                except (TypeError, ValueError):
+                    chunk[col] = chunk[col].astype(object)
+        yield chunk
+
+
+def export_listings(df, fmt='csv', include_history=False, db_path="laptop_prices.db", table_name="laptops"):
+    """
+    Export listings, optionally followed by the full price history of their ASINs, written chunk by chunk.
+    Returns the file as bytes, which is what st.download_button accepts from a deferred callable.
+    """
+    if include_history:
+        chunks = iter_listings_with_history(df, db_path=db_path, table_name=table_name)
+    else:
+        chunks = iter_frame_chunks(df)
+    out = io.BytesIO()
+    write_chunks(chunks, out, fmt=fmt)
+    return out.getvalue()
+
+
+'''columnar analytics'''
+
+ANALYTICS_DIR = "analytics"
+OBSERVATION_COLUMNS = ['asin', 'scrape_date', 'title', 'brand', 'extracted_price', 'rating', 'reviews',
+                       'price_change_percent', 'buy_now', 'is_deal']
+OBSERVATION_NUMBERS = ['extracted_price', 'rating', 'reviews', 'price_change_percent']
+
+
+def _duckdb():
+    """duckdb when installed; the analytics queries fall back to pandas without it"""
+    try:
+        import duckdb
+    except ImportError:
+        return None
+    return duckdb
+
+
+def _observation_select(conn, columns, table_name):
+    available = {row[1] for row in conn.execute(f'PRAGMA main.table_info("{table_name}")')}
+    return available, ", ".join(f'"{col}"' if col in available else f'NULL AS "{col}"' for col in columns)
+
+
+def _observation_types(df):
+    if 'scrape_date' in df.columns:
+        df['scrape_date'] = pd.to_datetime(df['scrape_date'], format='ISO8601')
+    for col in OBSERVATION_NUMBERS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def export_observations(db_path="laptop_prices.db", table_name="laptops", analytics_dir=ANALYTICS_DIR):
+    """
+    Write every raw observation (current table and partitions) as one zstd Parquet file per month
+    under analytics/observations-<data version>/, reading a month at a time, then point analytics/manifest.json at it.
+    Compacted rollups are not exported.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("The analytics export needs pyarrow: pip install pyarrow")
+    version = get_data_version(db_path=db_path)
+    name = f"observations-{version}"
+    target = os.path.join(analytics_dir, name)
+    shutil.rmtree(target, ignore_errors=True)
+    os.makedirs(target)
+
+    conn = connect_partitioned(db_path, table_name=table_name, readonly=True)
+    available, select_list = _observation_select(conn, OBSERVATION_COLUMNS, table_name)
+    months = [row[0] for row in conn.execute(
+        f"SELECT DISTINCT substr(scrape_date, 1, 7) FROM {table_name}_all ORDER BY 1"
+    )] if available else []
+    rows = 0
+    for month in months:
+        df = pd.read_sql_query(
+            f"SELECT {select_list} FROM {table_name}_all WHERE substr(scrape_date, 1, 7) = ?", conn, params=(month,)
+        )
+        df = _observation_types(df)
+        for col in ['asin', 'title', 'brand', 'buy_now', 'is_deal']:
+            df[col] = df[col].astype('string')  # all-null text columns would otherwise be written as null type
+        df.to_parquet(os.path.join(target, f"{month}.parquet"), index=False, compression='zstd')
+        rows += len(df)
+    conn.close()
+
+    manifest = os.path.join(analytics_dir, "manifest.json")
+    with open(manifest + ".tmp", "w") as f:
+        json.dump({'data_version': version, 'path': name, 'months': len(months), 'rows': rows}, f)
+    os.replace(manifest + ".tmp", manifest)
+    for old in os.listdir(analytics_dir):
+        if old.startswith("observations-") and old != name:
+            shutil.rmtree(os.path.join(analytics_dir, old), ignore_errors=True)
+    print(f"🧊 Exported {rows} observations over {len(months)} months to '{target}'.")
+    return target
+
+
+def observations_path(db_path="laptop_prices.db", analytics_dir=ANALYTICS_DIR):
+    """
+    Directory of the Parquet export matching the database's data version, or None when it is missing or stale
+    """
+    try:
+        with open(os.path.join(analytics_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    path = os.path.join(analytics_dir, manifest['path'])
+    if manifest['data_version'] != get_data_version(db_path=db_path) or not os.path.isdir(path):
+        return None
+    return path
+
+
+def run_analytics(sql, fallback, columns, db_path="laptop_prices.db", table_name="laptops", analytics_dir=ANALYTICS_DIR):
+    """
+    Run `sql` with DuckDB over the Parquet export, which it sees as the view `observations`:
+    the aggregation is vectorized over all cores and only the columns the query names are read.
+    Without DuckDB or an up-to-date export, `fallback(df)` builds the same frame in pandas
+    from just `columns`, read from the export or else from SQLite.
+    """
+    path = observations_path(db_path=db_path, analytics_dir=analytics_dir)
+    duckdb = _duckdb()
+    if path is not None and duckdb is not None:
+        con = duckdb.connect()
+        try:
+            pattern = os.path.join(path, "*.parquet").replace("'", "''")
+            con.execute(f"CREATE VIEW observations AS SELECT * FROM read_parquet('{pattern}')")
+            return con.execute(sql).df()
+        finally:
+            con.close()
+
+    if path is not None:
+        return fallback(pd.read_parquet(path, columns=columns))
+    conn = connect_partitioned(db_path, table_name=table_name, readonly=True)
+    available, select_list = _observation_select(conn, columns, table_name)
+    if available:
+        df = pd.read_sql_query(f"SELECT {select_list} FROM {table_name}_all", conn)
+    else:
+        df = pd.DataFrame(columns=columns)
+    conn.close()
+    return fallback(_observation_types(df))
+
+
+def brand_price_trends(freq='month', db_path="laptop_prices.db", analytics_dir=ANALYTICS_DIR):
+    """
+    Mean and median price and number of listings per brand and week or month
+    """
+    if freq not in ('week', 'month'):
+        raise ValueError(f"freq must be 'week' or 'month', got {freq!r}")
+    sql = f"""
+        SELECT brand, CAST(date_trunc('{freq}', scrape_date) AS DATE) AS period,
+               AVG(extracted_price) AS mean_price, MEDIAN(extracted_price) AS median_price,
+               COUNT(DISTINCT asin) AS listings
+        FROM observations
+        WHERE brand IS NOT NULL AND extracted_price IS NOT NULL
+        GROUP BY brand, period
+        ORDER BY period, brand
+    """
+
+    def fallback(df):
+        df = df.dropna(subset=['brand', 'extracted_price'])
+        df = df.assign(period=pd.to_datetime(_period_start(df['scrape_date'], freq)).dt.date)
+        out = df.groupby(['brand', 'period']).agg(
+            mean_price=('extracted_price', 'mean'), median_price=('extracted_price', 'median'),
+            listings=('asin', 'nunique')
+        ).reset_index()
+        return out.sort_values(['period', 'brand']).reset_index(drop=True)
+
+    return run_analytics(sql, fallback, ['asin', 'scrape_date', 'brand', 'extracted_price'],
+                         db_path=db_path, analytics_dir=analytics_dir)
+
+
+def volatility_ranking(limit=10, min_observations=3, db_path="laptop_prices.db", analytics_dir=ANALYTICS_DIR):
+    """
+    Listings whose price moved the most: price std dev over their stored observations and coefficient of variation,
+    for ASINs observed at least `min_observations` times. Unlike the merge's price_stability, the weeks a listing
+    was only seen unchanged are not counted
+    """
+    sql = f"""
+        SELECT asin, arg_max(title, scrape_date) AS title, arg_max(brand, scrape_date) AS brand,
+               COUNT(extracted_price) AS observations, AVG(extracted_price) AS mean_price,
+               MIN(extracted_price) AS min_price, MAX(extracted_price) AS max_price,
+               STDDEV_SAMP(extracted_price) AS price_std,
+               STDDEV_SAMP(extracted_price) / AVG(extracted_price) * 100 AS variation_percent
+        FROM observations
+        GROUP BY asin
+        HAVING COUNT(extracted_price) >= {int(min_observations)}
+        ORDER BY variation_percent DESC, asin
+        LIMIT {int(limit)}
+    """
+
+    def fallback(df):
+        df = df.sort_values(['asin', 'scrape_date'], kind='mergesort')
+        out = df.groupby('asin').agg(
+            title=('title', 'last'), brand=('brand', 'last'), observations=('extracted_price', 'count'),
+            mean_price=('extracted_price', 'mean'), min_price=('extracted_price', 'min'),
+            max_price=('extracted_price', 'max'), price_std=('extracted_price', 'std')
+        ).reset_index()
+        out['variation_percent'] = out['price_std'] / out['mean_price'] * 100
+        out = out[out['observations'] >= min_observations]
+        out = out.sort_values(['variation_percent', 'asin'], ascending=[False, True])
+        return out.head(limit).reset_index(drop=True)
+
+    return run_analytics(sql, fallback, ['asin', 'scrape_date', 'title', 'brand', 'extracted_price'],
+                         db_path=db_path, analytics_dir=analytics_dir)
+
+
+def deal_frequency(by='brand', db_path="laptop_prices.db", analytics_dir=ANALYTICS_DIR):
+    """
+    Share of observations flagged as a deal (any signal) and as buy_now, and the mean price drop, per brand or ASIN
+    """
+    if by not in ('brand', 'asin'):
+        raise ValueError(f"by must be 'brand' or 'asin', got {by!r}")
+    sql = f"""
+        SELECT {by}, COUNT(*) AS observations,
+               AVG(CASE WHEN is_deal = 'Yes' THEN 100.0 ELSE 0 END) AS deal_percent,
+               AVG(CASE WHEN buy_now = 'Yes' THEN 100.0 ELSE 0 END) AS buy_now_percent,
+               AVG(CASE WHEN price_change_percent < 0 THEN price_change_percent END) AS mean_drop_percent
+        FROM observations
+        WHERE {by} IS NOT NULL
+        GROUP BY {by}
+        ORDER BY deal_percent DESC, {by}
+    """
+
+    def fallback(df):
+        df = df.dropna(subset=[by])
+        df = df.assign(
+            deal=np.where(df['is_deal'] == 'Yes', 100.0, 0.0),
+            buy=np.where(df['buy_now'] == 'Yes', 100.0, 0.0),
+            drop=df['price_change_percent'].where(df['price_change_percent'] < 0)
+        )
+        out = df.groupby(by).agg(
+            observations=('deal', 'size'), deal_percent=('deal', 'mean'),
+            buy_now_percent=('buy', 'mean'), mean_drop_percent=('drop', 'mean')
+        ).reset_index()
+        return out.sort_values(['deal_percent', by], ascending=[False, True]).reset_index(drop=True)
+
+    return run_analytics(sql, fallback, [by, 'is_deal', 'buy_now', 'price_change_percent'],
+                         db_path=db_path, analytics_dir=analytics_dir)
+
+
+'''dense price matrix'''
+
+PRICE_MATRIX_DIR = "price_matrix"
+PRICE_MATRIX_KEEP = 2          # built versions kept on disk for processes still mapping an older one
+MATRIX_FIELDS = {'prices': 'extracted_price', 'ratings': 'rating', 'reviews': 'reviews'}
+MATRIX_CHUNK_ROWS = 50000
+SPARKLINE_POINTS = 12
+
+
+def _forward_fill(values):
+    """
+    Each NaN replaced by the last observed value to its left in the same row; NaN before a row's first observation
+    """
+    observed = ~np.isnan(values)
+    last = np.where(observed, np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(last, axis=1, out=last)
+    return values[np.arange(values.shape[0])[:, None], last]
+
+
+def _current_matrix_dir(matrix_dir=PRICE_MATRIX_DIR):
+    try:
+        with open(os.path.join(matrix_dir, "CURRENT")) as f:
+            path = os.path.join(matrix_dir, f.read().strip())
+    except FileNotFoundError:
+        return None
+    return path if os.path.isdir(path) else None
+
+
+def build_price_matrix(db_path="laptop_prices.db", table_name="laptops", matrix_dir=PRICE_MATRIX_DIR, force=False):
+    """
+    Dense ASIN × scrape_date float32 arrays of price, rating and reviews, one .npy file each under
+    price_matrix/<data version>/ with index.json naming the rows (ASINs) and columns (dates), then pointed at by
+    price_matrix/CURRENT. Raw rows of the current table and partitions are scattered in chunks; scrapes where
+    a listing was only seen unchanged (listing_seen) carry its last values forward, other missing cells stay NaN.
+    Rebuilt only when the data version changes.
+    """
+    version = get_data_version(db_path=db_path)
+    current = _current_matrix_dir(matrix_dir)
+    if not force and current is not None and os.path.basename(current) == version:
+        return current
+
+    conn = connect_partitioned(db_path, table_name=table_name, readonly=True)
+    if not conn.execute(f'PRAGMA main.table_info("{table_name}")').fetchall():
+        conn.close()
+        return None
+    asins = pd.Index([row[0] for row in conn.execute(f"SELECT DISTINCT asin FROM {table_name}_all ORDER BY 1")])
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    seen = pd.read_sql_query("SELECT asin, scrape_date FROM listing_seen", conn) if 'listing_seen' in tables \
+        else pd.DataFrame(columns=['asin', 'scrape_date'])
+    seen = seen[seen['asin'].isin(asins)]
+    dates = sorted({row[0] for row in conn.execute(f"SELECT DISTINCT substr(scrape_date, 1, 10) FROM {table_name}_all")}
+                   | set(seen['scrape_date'].str[:10]))
+    dates = pd.Index(dates)
+
+    os.makedirs(matrix_dir, exist_ok=True)
+    target = os.path.join(matrix_dir, version)
+    staging = target + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    arrays = {}
+    for name in MATRIX_FIELDS:
+        arrays[name] = np.lib.format.open_memmap(os.path.join(staging, f"{name}.npy"), mode='w+',
+                                                 dtype=np.float32, shape=(len(asins), len(dates)))
+        arrays[name][:] = np.nan
+
+    columns = ", ".join(MATRIX_FIELDS.values())
+    for chunk in pd.read_sql_query(f"SELECT asin, substr(scrape_date, 1, 10) AS day, {columns} FROM {table_name}_all",
+                                   conn, chunksize=MATRIX_CHUNK_ROWS):
+        rows = asins.get_indexer(chunk['asin'])
+        cols = dates.get_indexer(chunk['day'])
+        for name, col in MATRIX_FIELDS.items():
+            arrays[name][rows, cols] = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float32)
+    conn.close()
+
+    seen_cells = np.zeros((len(asins), len(dates)), dtype=bool)
+    seen_cells[asins.get_indexer(seen['asin']), dates.get_indexer(seen['scrape_date'].str[:10])] = True
+    for name, values in arrays.items():
+        carry = seen_cells & np.isnan(values)
+        values[carry] = _forward_fill(values)[carry]
+        values.flush()
+    del arrays
+
+    with open(os.path.join(staging, "index.json"), "w") as f:
+        json.dump({'data_version': version, 'asins': asins.tolist(), 'dates': dates.tolist(),
+                   'fields': list(MATRIX_FIELDS)}, f)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+    pointer = os.path.join(matrix_dir, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    built = sorted(d for d in os.listdir(matrix_dir) if os.path.isdir(os.path.join(matrix_dir, d)) and d != version
+                   and not d.endswith(".tmp"))
+    for old in built[:max(len(built) - (PRICE_MATRIX_KEEP - 1), 0)]:
+        shutil.rmtree(os.path.join(matrix_dir, old), ignore_errors=True)
+    print(f"🧮 Price matrix built: {len(asins)} listings × {len(dates)} scrapes (version {version}).")
+    return target
+
+
+def load_price_matrix(matrix_dir=PRICE_MATRIX_DIR, data_version=None):
+    """
+    The current price matrix as read-only memory maps, so processes loading it share the OS page cache
+    instead of copies; None when it was never built or does not match `data_version`
+    """
+    path = _current_matrix_dir(matrix_dir)
+    if path is None:
+        return None
+    with open(os.path.join(path, "index.json")) as f:
+        index = json.load(f)
+    if data_version is not None and index['data_version'] != data_version:
+        return None
+    matrix = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in index['fields']}
+    matrix['asins'] = np.array(index['asins'], dtype=str)
+    matrix['dates'] = pd.to_datetime(index['dates'])
+    matrix['data_version'] = index['data_version']
+    matrix['position'] = pd.Series(np.arange(len(matrix['asins'])), index=matrix['asins'])
+    return matrix
+
+
+def price_series(rows, dates=(), seen=None, rollups=None):
+    """
+    In-memory counterpart of the price matrix for the rows being merged: a dense ASIN × scrape date float64
+    array of `rows`' prices, with every date in `dates` laid out as a column too, so a listing's windows
+    don't depend on which other listings were loaded with it.
+    - `rollups`: the listings' compacted weekly / monthly rollups, each placed as its last_price on its last_date;
+      their min_price / max_price are kept as 'low' / 'high', the price range seen before the raw rows
+    - `seen`: (asin, scrape_date) markers of scrapes where a listing was seen unchanged, which carry its last price
+      forward as build_price_matrix does, so the array is the weekly series the listing was observed at
+    'observed' marks the cells of stored rows and rollups. A weekly rollup holds one weekly scrape, so the series
+    is exact for the two years they are kept; a monthly rollup only contributes its last price and range.
+    """
+    if seen is None:
+        seen = pd.DataFrame(columns=['asin', 'scrape_date'])
+    if rollups is None:
+        rollups = pd.DataFrame(columns=['asin', 'last_date', 'last_price', 'min_price', 'max_price'])
+    asins = pd.Index(sorted(rows['asin'].unique()))
+    seen = seen[seen['asin'].isin(asins)]
+    rollups = rollups[rollups['asin'].isin(asins)]
+    days = pd.to_datetime(rows['scrape_date'], format='ISO8601').dt.normalize()
+    seen_days = pd.to_datetime(seen['scrape_date'], format='ISO8601').dt.normalize()
+    rollup_days = pd.to_datetime(rollups['last_date'], format='ISO8601').dt.normalize()
+    dates = pd.DatetimeIndex(sorted(set(days) | set(seen_days) | set(rollup_days)
+                                    | set(pd.to_datetime(list(dates), format='ISO8601'))))
+    prices = np.full((len(asins), len(dates)), np.nan)
+    prices[asins.get_indexer(rollups['asin']), dates.get_indexer(rollup_days)] = pd.to_numeric(rollups['last_price'])
+    prices[asins.get_indexer(rows['asin']), dates.get_indexer(days)] = pd.to_numeric(rows['extracted_price'], errors='coerce')
+    observed = ~np.isnan(prices)
+
+    seen_cells = np.zeros(prices.shape, dtype=bool)
+    seen_cells[asins.get_indexer(seen['asin']), dates.get_indexer(seen_days)] = True
+    carry = seen_cells & ~observed
+    prices[carry] = _forward_fill(prices)[carry]
+
+    ranges = rollups.groupby('asin').agg(low=('min_price', 'min'), high=('max_price', 'max')).reindex(asins)
+    return {'prices': prices, 'observed': observed, 'asins': asins, 'dates': dates,
+            'low': ranges['low'].to_numpy(dtype=float), 'high': ranges['high'].to_numpy(dtype=float)}
+
+
+def _series_cells(series, rows):
+    """(row, column) of each of `rows` in a price_series"""
+    days = pd.to_datetime(rows['scrape_date'], format='ISO8601').dt.normalize()
+    return series['asins'].get_indexer(rows['asin']), series['dates'].get_indexer(days)
+
+
+def fetch_price_series(rows, db_path="laptop_prices.db", table_name="laptops"):
+    """
+    price_series of `rows` laid out on every scrape date of the database (stored rows, seen-again markers and
+    rollups alike), with the seen-again markers and compacted rollups of `rows`' listings filled in
+    """
+    conn = connect_partitioned(db_path, table_name=table_name)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    dates = set()
+    if table_name in tables:
+        dates |= {row[0] for row in conn.execute(f"SELECT DISTINCT substr(scrape_date, 1, 10) FROM {table_name}_all")}
+    conn.execute("CREATE TEMP TABLE series_asins (asin TEXT PRIMARY KEY)")
+    conn.executemany("INSERT OR IGNORE INTO series_asins VALUES (?)", ((a,) for a in rows['asin'].unique()))
+    seen = None
+    if 'listing_seen' in tables:
+        dates |= {row[0] for row in conn.execute("SELECT DISTINCT substr(scrape_date, 1, 10) FROM listing_seen")}
+        seen = pd.read_sql_query("SELECT s.asin, s.scrape_date FROM listing_seen s JOIN series_asins w ON w.asin = s.asin", conn)
+    rollups = []
+    for table in ROLLUP_TABLES.values():
+        if table in tables:
+            dates |= {row[0] for row in conn.execute(f"SELECT DISTINCT last_date FROM {table}")}
+            rollups.append(pd.read_sql_query(f"""SELECT r.asin, r.last_date, r.last_price, r.min_price, r.max_price
+                                                 FROM {table} r JOIN series_asins w ON w.asin = r.asin""", conn))
+    conn.close()
+    rollups = [df for df in rollups if len(df)]
+    return price_series(rows, dates, seen, pd.concat(rollups, ignore_index=True) if rollups else None)
+
+
+def matrix_rolling_stats(values, window=DEAL_WINDOW_WEEKS, min_periods=2):
+    """
+    Rolling mean and std dev over the last `window` scrape columns (current one included), skipping NaN cells,
+    for every listing at once with one pass per lag; NaN where the window is empty (mean) or holds fewer
+    than `min_periods` values (std). Deviations are taken from the window's minimum, so a flat window
+    has exactly its price as mean and 0 as std.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    width = values.shape[1]
+    lags = range(min(window, width))
+    n = np.zeros(values.shape)
+    low = np.full(values.shape, np.nan)
+    for lag in lags:
+        n[:, lag:] += ~np.isnan(values[:, :width - lag])
+        np.fmin(low[:, lag:], values[:, :width - lag], out=low[:, lag:])
+    total = np.zeros(values.shape)
+    for lag in lags:
+        total[:, lag:] += np.nan_to_num(values[:, :width - lag] - low[:, lag:])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = low + total / n
+    squares = np.zeros(values.shape)
+    for lag in lags:
+        squares[:, lag:] += np.nan_to_num((values[:, :width - lag] - mean[:, lag:]) ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(squares / (n - 1))
+    mean[n < 1] = np.nan
+    std[n < min_periods] = np.nan
+    return mean, std
+
+
+def matrix_price_stability(values):
+    """
+    Std dev of every listing's prices across all its scrape columns (the price_stability column), skipping NaN;
+    NaN with fewer than two values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not values.size:
+        return np.full(values.shape[0], np.nan)
+    n = (~np.isnan(values)).sum(axis=1)
+    low = np.fmin.reduce(values, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = low + np.nansum(values - low[:, None], axis=1) / n
+        std = np.sqrt(np.nansum((values - mean[:, None]) ** 2, axis=1) / (n - 1))
+    std[n < 2] = np.nan
+    return std
+
+
+def matrix_price_drops(values, min_drop_percent=5):
+    """
+    Previous observed price of every cell (NaN before a listing's first observation), the percent change
+    against it, and the cells that dropped by more than `min_drop_percent`
+    """
+    values = np.asarray(values, dtype=np.float64)
+    previous = np.full(values.shape, np.nan)
+    previous[:, 1:] = _forward_fill(values)[:, :-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = (values - previous) / previous * 100
+    return previous, change, change < -min_drop_percent
+
+
+def matrix_sparklines(matrix, asins, points=SPARKLINE_POINTS, field='prices'):
+    """
+    Last `points` scrape columns of `field` for the given ASINs, one row each in the same order;
+    only those rows of the memory map are read, and unknown ASINs get all-NaN rows
+    """
+    rows = matrix['position'].reindex(list(asins))
+    found = rows.notna().to_numpy()
+    out = np.full((len(rows), points), np.nan, dtype=np.float32)
+    block = np.asarray(matrix[field][rows[found].astype(int).to_numpy(), -points:])
+    if block.size:
+        out[found, points - block.shape[1]:] = block
+    return out
+
+
+def run_all():
+    """
+    Runs the full weekly pipeline: scrape, clean, merge, then price watches, similar laptops, fair prices and
+    thumbnails, retention, the analytics export and price matrix, and publishing.
+    The stages, their order and what runs concurrently are defined once, in pipeline.py.
+    """
+    import pipeline  # pipeline.py imports this module, so it is only imported when run
+
+    return pipeline.run_pipeline()
@@ -0,0 +1,365 @@
+'''
+Read-only JSON API over laptop_prices.db
+
+    python api.py --port 8000 --db laptop_prices.db
+
+GET /listings      latest row per ASIN; filters brand, q, min_price, max_price, min_rating, deal;
+                   sort=price|rating|reviews|price_difference (prefix "-" for descending); limit, offset
+GET /history/ASIN  price history of one ASIN, oldest first (weekly / monthly rollups where compacted)
+GET /deals         top rated rows flagged by a deal signal (signal=is_deal, limit)
+GET /aggregates    totals and per-brand price / rating summary of the latest listings
+GET /events        price events (new_listing, price_change, rating_change, delisted) with seq > after, oldest first;
+                   kind, limit; pass the returned next_after back to tail the feed
+
+When snapshots/CURRENT exists the API reads the published snapshot it names, switching to a newer one
+as soon as the pipeline publishes it, so requests never wait on pipeline writes.
+
+Responses carry an ETag built from the data version, so unchanged data answers 304 to If-None-Match
+and repeated queries are served from an in-memory LRU cache without touching SQLite.
+Errors answer {"error": ...}: 400 for a bad parameter, 500 when the database lacks a column or table a query needs.
+'''
+import argparse
+import hashlib
+import json
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from Functions import DEAL_SIGNAL_COLS, EVENT_KINDS, SNAPSHOT_DIR, price_history_query, connect_readonly, current_snapshot
+from Functions import attach_partitions, latest_rows_join
+
+LISTING_COLUMNS = ['asin', 'title', 'brand', 'extracted_price', 'rating', 'reviews', 'scrape_date', 'price_difference',
+                   'price_change_percent', 'buy_now', 'is_deal', 'stability_label', 'fair_price', 'value_label',
+                   'model_group_id', 'display_size', 'ram', 'disk_size', 'operating_system', 'link_clean', 'thumbnail']
+# written by later pipeline stages, so databases from before them lack these; read as NULL there
+OPTIONAL_COLUMNS = {'is_deal', 'stability_label', 'fair_price', 'value_label', 'model_group_id'}
+SORT_COLUMNS = {'price': 'extracted_price', 'rating': 'rating', 'reviews': 'reviews', 'price_difference': 'price_difference'}
+MAX_PAGE_SIZE = 200
+POOL_SIZE = 8
+CACHE_ENTRIES = 512
+
+
+class ReadOnlyPool:
+    """
+    Fixed set of read-only SQLite connections shared by the request threads.
+    On the live database (not immutable) retention moves rows into new or rewritten month files between requests,
+    so a connection re-attaches the partitions whenever the data version moved since it last attached them.
+    """
+    def __init__(self, db_path, size=POOL_SIZE, immutable=False):
+        self.db_path = db_path
+        self.immutable = immutable
+        self._idle = queue.Queue()
+        self._attached_at = {}  # connection -> data version its partitions were attached at
+        for _ in range(size):
+            conn = connect_readonly(db_path, immutable=immutable)
+            conn.row_factory = sqlite3.Row
+            attach_partitions(conn, immutable=immutable)  # history reads laptops_all; listings read the current table
+            self._attached_at[conn] = data_version(conn)
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            if not self.immutable:
+                version = data_version(conn)
+                if version != self._attached_at[conn]:
+                    attach_partitions(conn)
+                    self._attached_at[conn] = version
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        """Close every connection; only call once no request holds one"""
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class SnapshotPool:
+    """
+    Read-only pool over the currently published snapshot, replaced by a fresh pool when CURRENT moves.
+    Requests already holding a connection finish on the snapshot they started with,
+    and the replaced pool is closed when the last of them returns its connection.
+    """
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR, fallback="laptop_prices.db", size=POOL_SIZE):
+        self.snapshot_dir = snapshot_dir
+        self.fallback = fallback
+        self.size = size
+        self._path = None
+        self._pool = None
+        self._borrowers = {}  # pool -> requests currently using it
+        self._lock = threading.Lock()
+
+    def _release(self, pool):
+        with self._lock:
+            self._borrowers[pool] -= 1
+            retired = pool is not self._pool and not self._borrowers[pool]
+            if retired:
+                del self._borrowers[pool]
+        if retired:
+            pool.close()
+
+    @contextmanager
+    def connection(self):
+        path = current_snapshot(self.snapshot_dir, fallback=self.fallback)
+        with self._lock:
+            if path != self._path:
+                previous = self._pool
+                self._pool = ReadOnlyPool(path, self.size, immutable=path != self.fallback)
+                self._path = path
+                self._borrowers[self._pool] = 0
+                if previous is not None and not self._borrowers[previous]:
+                    del self._borrowers[previous]
+                    previous.close()
+            pool = self._pool
+            self._borrowers[pool] += 1
+        try:
+            with pool.connection() as conn:
+                yield conn
+        finally:
+            self._release(pool)
+
+    def close(self):
+        with self._lock:
+            pools, self._borrowers, self._pool, self._path = list(self._borrowers), {}, None, None
+        for pool in pools:
+            pool.close()
+
+
+class ResponseCache:
+    """
+    LRU of encoded response bodies keyed on (data version, request)
+    """
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def data_version(conn):
+    try:
+        row = conn.execute("SELECT value FROM data_meta WHERE key = 'data_version'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    return row[0] if row else "0"
+
+
+def _table_columns(conn, table_name="laptops"):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+
+
+def _select_list(conn, wanted, alias=None):
+    existing = set(_table_columns(conn))
+    unknown = [col for col in wanted if col not in existing and col not in OPTIONAL_COLUMNS]
+    if unknown:
+        raise KeyError(f"laptops has no column(s) {unknown}")
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(f'{prefix}"{col}"' if col in existing else f'NULL AS "{col}"' for col in wanted)
+
+
+def _number(params, name, default=None, cast=float):
+    value = params.get(name, [None])[0]
+    if value in (None, ""):
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be a number")
+
+
+LATEST_JOIN = latest_rows_join()
+
+
+def query_listings(conn, params):
+    where, args = [], []
+    if 'brand' in params:
+        where.append("l.brand = ?")
+        args.append(params['brand'][0])
+    if 'q' in params:
+        where.append("l.title LIKE ?")
+        args.append(f"%{params['q'][0]}%")
+    for name, clause in [('min_price', "l.extracted_price >= ?"), ('max_price', "l.extracted_price <= ?"),
+                         ('min_rating', "l.rating >= ?")]:
+        value = _number(params, name)
+        if value is not None:
+            where.append(clause)
+            args.append(value)
+    if 'deal' in params:
+        signal = params['deal'][0]
+        if signal not in DEAL_SIGNAL_COLS or signal not in _table_columns(conn):
+            raise BadRequest(f"deal must be one of {DEAL_SIGNAL_COLS}")
+        where.append(f'l."{signal}" = \'Yes\'')
+
+    sort = params.get('sort', ['-rating'])[0]
+    descending = sort.startswith('-')
+    if sort.lstrip('-') not in SORT_COLUMNS:
+        raise BadRequest(f"sort must be one of {sorted(SORT_COLUMNS)}")
+    order = f'l."{SORT_COLUMNS[sort.lstrip("-")]}" {"DESC" if descending else "ASC"}, l.asin'
+
+    limit = min(max(_number(params, 'limit', 50, int), 1), MAX_PAGE_SIZE)
+    offset = max(_number(params, 'offset', 0, int), 0)
+    rows = conn.execute(
+        f"""SELECT {_select_list(conn, LISTING_COLUMNS, 'l')}, COUNT(*) OVER () AS _total {LATEST_JOIN}
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY {order} LIMIT ? OFFSET ?""",
+        args + [limit, offset]
+    ).fetchall()
+    items = [{k: row[k] for k in row.keys() if k != '_total'} for row in rows]
+    return {'total': rows[0]['_total'] if rows else 0, 'limit': limit, 'offset': offset, 'items': items}
+
+
+def query_history(conn, asin):
+    # raw rows plus the weekly / monthly rollups of compacted history
+    query = price_history_query(conn, "WHERE asin = ?", "laptops_all")
+    rows = conn.execute(query, [asin] * query.count("WHERE asin = ?")).fetchall()
+    if not rows:
+        return None
+    return {'asin': asin, 'history': [dict(row) for row in rows]}
+
+
+def query_deals(conn, params):
+    signal = params.get('signal', ['is_deal'])[0]
+    if signal not in DEAL_SIGNAL_COLS:
+        raise BadRequest(f"signal must be one of {DEAL_SIGNAL_COLS}")
+    if signal not in _table_columns(conn):
+        signal = 'buy_now'  # database written before the deal-signal stage existed
+    limit = min(max(_number(params, 'limit', 10, int), 1), MAX_PAGE_SIZE)
+    rows = conn.execute(
+        f"""SELECT {_select_list(conn, LISTING_COLUMNS, 'l')} {LATEST_JOIN}
+            WHERE l."{signal}" = 'Yes' ORDER BY l.rating DESC LIMIT ?""",
+        (limit,)
+    ).fetchall()
+    return {'signal': signal, 'items': [dict(row) for row in rows]}
+
+
+def query_aggregates(conn):
+    summary = """COUNT(*) AS laptops, AVG(l.extracted_price) AS avg_price, MIN(l.extracted_price) AS min_price,
+                 MAX(l.extracted_price) AS max_price, AVG(l.rating) AS avg_rating"""
+    totals = conn.execute(f"SELECT {summary} {LATEST_JOIN}").fetchone()
+    brands = conn.execute(f"SELECT l.brand AS brand, {summary} {LATEST_JOIN} GROUP BY l.brand ORDER BY laptops DESC").fetchall()
+    return {'totals': dict(totals), 'brands': [dict(row) for row in brands]}
+
+
+def query_events(conn, params):
+    after = max(_number(params, 'after', 0, int), 0)
+    kinds = params.get('kind', [])
+    if any(kind not in EVENT_KINDS for kind in kinds):
+        raise BadRequest(f"kind must be one of {EVENT_KINDS}")
+    limit = min(max(_number(params, 'limit', 100, int), 1), MAX_PAGE_SIZE)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'price_events'").fetchone():
+        return {'after': after, 'next_after': after, 'items': []}  # database written before the event log existed
+    kind_filter = f"AND kind IN ({', '.join(['?'] * len(kinds))})" if kinds else ""
+    rows = conn.execute(
+        f"SELECT * FROM price_events WHERE seq > ? {kind_filter} ORDER BY seq LIMIT ?", [after] + kinds + [limit]
+    ).fetchall()
+    return {'after': after, 'next_after': rows[-1]['seq'] if rows else after, 'items': [dict(row) for row in rows]}
+
+
+def route(conn, path, params):
+    parts = [p for p in path.split('/') if p]
+    if parts == ['listings']:
+        return query_listings(conn, params)
+    if len(parts) == 2 and parts[0] == 'history':
+        return query_history(conn, parts[1])
+    if parts == ['deals']:
+        return query_deals(conn, params)
+    if parts == ['aggregates']:
+        return query_aggregates(conn)
+    if parts == ['events']:
+        return query_events(conn, params)
+    return None
+
+
+def make_handler(pool, cache):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+            with pool.connection() as conn:
+                version = data_version(conn)
+                request_key = f"{url.path}?{'&'.join(sorted(url.query.split('&')))}"
+                etag = '"' + hashlib.sha1(f"{version}|{request_key}".encode()).hexdigest()[:20] + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self._send(304, None, etag)
+                    return
+                body = cache.get((version, request_key))
+                if body is None:
+                    try:
+                        result = route(conn, url.path, params)
+                    except BadRequest as e:
+                        self._send(400, json.dumps({'error': str(e)}).encode())
+                        return
+                    except (KeyError, sqlite3.Error) as e:
+                        # the database lacks a column or table the query needs: the server's fault, not the request's
+                        self._send(500, json.dumps({'error': str(e.args[0]) if e.args else repr(e)}).encode())
+                        return
+                    if result is None:
+                        self._send(404, json.dumps({'error': 'not found'}).encode())
+                        return
+                    body = json.dumps({'data_version': version, **result}).encode()
+                    cache.put((version, request_key), body)
+            self._send(200, body, etag)
+
+        def _send(self, status, body, etag=None):
+            self.send_response(status)
+            if etag:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            if body is not None:
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if body is not None:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=8000, db_path="laptop_prices.db", pool_size=POOL_SIZE, snapshot_dir=SNAPSHOT_DIR):
+    pool = SnapshotPool(snapshot_dir, fallback=db_path, size=pool_size)
+    server = ThreadingHTTPServer((host, port), make_handler(pool, ResponseCache()))
+    print(f"🌐 Serving {current_snapshot(snapshot_dir, fallback=db_path)} on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the laptop price database")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", default="laptop_prices.db")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE)
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR, help="published snapshots, read in place of --db when present")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.db, args.pool_size, args.snapshot_dir)
@@ -0,0 +1,291 @@
+import streamlit as st
+import pandas as pd
+from Functions import fetch_top_deals, load_similarity_index
+from Functions import load_thumbnail_uris, extract_brand
+from Functions import current_snapshot, connect_readonly, get_data_version, load_price_matrix
+from app_pages.perf import timed, tracked_cache
+
+LIVE_DB = "laptop_prices.db"
+
+VIEW_CACHE_ENTRIES = 32  # filtered / sorted views kept per session
+
+# Custom CSS for beautiful design
+CSS = """
+<style>
+    .main > div {
+        padding-top: 2rem;
+        
+    }
+    .main, .block-container {
+        background-color: white !important;
+        min-height: 100vh;
+        overflow:scroll;
+    }
+    .sidebar .sidebar-content {
+        background-color: white !important;
+    }
+    body {
+        background-color: #ffffff !important;
+    }
+    .css-xxxxxx, .stText, .stMarkdown {
+        color: black !important;
+    }
+    .stMetric {
+        background: linear-gradient(90deg, #f8fafc 0%, #f1f5f9 100%);
+        border: 1px solid #e2e8f0;
+        border-radius: 12px;
+        padding: 1rem;
+        box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1);
+    }
+    .laptop-card:hover {
+        box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+        transform: translateY(-5px);
+    }
+    .price-tag {
+        background: linear-gradient(135deg, #3b82f6, #1d4ed8);
+        color: white;
+        padding: 0.5rem 1rem;
+        border-radius: 20px;
+        font-weight: bold;
+        display: inline-block;
+        margin: 0.5rem 0;
+    }
+    .buy-now-yes {
+        background: linear-gradient(135deg, #10b981, #047857);
+        color: white;
+        padding: 0.3rem 0.8rem;
+        border-radius: 15px;
+        font-size: 0.8rem;
+        font-weight: bold;
+    }
+    .buy-now-no {
+        background: linear-gradient(135deg, #f59e0b, #d97706);
+        color: white;
+        padding: 0.3rem 0.8rem;
+        border-radius: 15px;
+        font-size: 0.8rem;
+        font-weight: bold;
+    }
+    .stable-tag {
+        background: linear-gradient(135deg, #10b981, #047857);
+        color: white;
+        padding: 0.3rem 0.8rem;
+        border-radius: 15px;
+        font-size: 0.8rem;
+        font-weight: bold;
+    }
+    .unstable-tag {
+        background: linear-gradient(135deg, #ef4444, #dc2626);
+        color: white;
+        padding: 0.3rem 0.8rem;
+        border-radius: 15px;
+        font-size: 0.8rem;
+        font-weight: bold;
+    }
+    .sidebar .sidebar-content {
+        background-color: #f8fafc;
+    }
+    h1 {
+        color: black !important;
+    }
+    h2, h3 {
+        color: black !important;
+    }
+    [data-testid="stSidebar"] {
+        background-color: #f8fafc !important;
+    }
+    .sidebar .sidebar-content {
+        background-color: #f8fafc !important;
+    }
+    .stMetric label[data-testid="stMetricLabel"] {
+        color: black !important;
+    }
+    .stMetric div[data-testid="stMetricValue"] {
+        color: black !important;
+        font-weight: 500;
+    }
+    .stMetric div[data-testid="stMetricDelta"] {
+        color: #16a34a !important;
+        font-weight: 600;
+    }
+    .streamlit-expanderHeader, .stMarkdown, .css-1d391kg {
+        color: black !important;
+        size: 1rem;
+    }
+    section[data-testid="stSidebar"] label {
+        color: black !important;
+        font-weight: 600;
+        font-size: 1.1rem;
+    }
+    .laptop-card {
+        border-radius: 12px;
+        background: white;
+        padding: 16px;
+        margin-bottom: 20px;
+        box-shadow: 0 4px 12px rgba(0,0,0,0.05);
+        border: 1px solid #e5e7eb;
+    }
+    .laptop-card img {
+        border-radius: 8px;
+        height: 200px;
+        width: 250px;
+        margin: 3px;
+    }
+    .compare-card {
+        transition: all 0.3s ease;
+        text-align: center;
+    }
+    .compare-card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 6px 18px rgba(0,0,0,0.08);
+    }
+    .compare-card__image-wrap {
+        text-align: center;
+        margin-bottom: 1rem;
+    }
+    .compare-card__image-wrap img {
+        border-radius: 12px;
+        height: 160px;
+        width: auto;
+        max-width: 90%;
+        object-fit: cover;
+    }
+    .compare-card__title {
+        font-size: 1rem;
+        font-weight: 600;
+        color: #1e293b;
+        line-height: 1.3;
+        margin-bottom: 1rem;
+        min-height: 48px;
+    }
+    .price-tag {
+        font-size: 1.1rem;
+        font-weight: bold;
+        padding: 0.4rem 1rem;
+        border-radius: 20px;
+        background: linear-gradient(135deg, #3b82f6, #1d4ed8);
+        color: white;
+        display: inline-block;
+        margin-bottom: 1rem;
+    }
+    .spec-grid {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 6px;
+        text-align: left;
+        margin-bottom: 1rem;
+    }
+    .spec-item {
+        background: #f8fafc;
+        padding: 6px 10px;
+        border-radius: 8px;
+        font-size: 1rem;
+        color: #475569;
+    }
+    .compare-card__button-wrap {
+        margin-top: 1rem;
+    }
+    .view-btn {
+        background: linear-gradient(135deg, #3b82f6, #1d4ed8);
+        color: white !important;
+        padding: 8px 14px;
+        border-radius: 8px;
+        font-size: 0.85rem;
+        text-decoration: none;
+        font-weight: bold;
+        display: inline-block;
+        transition: background 0.3s ease;
+    }
+    .view-btn:hover {
+        background: linear-gradient(135deg, #2563eb, #1e40af);
+    }
+    section[data-testid="stSidebar"] hr {
+        border-top: 2px solid #cacccf; 
+        margin: 10px 0;              
+    }
+    hr.custom-divider {
+        border: none;
+        border-top: 2px solid #cacccf;
+        margin: 10px 0;
+    }
+    div[data-testid="stSlider"] > label,
+    div[data-testid="stSelectbox"] > label {
+        color: black !important;
+        font-weight: 600;
+    }
+    div[data-testid="stTextInput"] > label {
+        color: black !important;
+        font-weight: 600;
+    }
+</style>
+"""
+
+def pin_snapshot():
+    """
+    Pin this rerun to the currently published snapshot, so every query of the rerun reads the same version
+    while the pipeline keeps writing to the live database
+    """
+    snapshot = current_snapshot(fallback=LIVE_DB)
+    st.session_state['snapshot'] = snapshot
+    st.session_state['data_version'] = get_data_version(db_path=snapshot)
+    return snapshot
+
+# Database connection function
+@tracked_cache(st.cache_data)
+def load_data(data_version, db_path=LIVE_DB):
+    """Load data from SQLite database, once per data version; every listing's latest row is in the current table, so partitions are not read"""
+    with timed("load_data: query") as section:
+        conn = connect_readonly(db_path, immutable=db_path != LIVE_DB)
+        df = pd.read_sql_query('SELECT * FROM laptops', conn)
+        conn.close()
+        section['rows'] = len(df)
+    
+    # Clean and process data
+    df['extracted_price'] = pd.to_numeric(df['extracted_price'], errors='coerce')
+    df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
+    df['reviews'] = pd.to_numeric(df['reviews'], errors='coerce')
+    df['price_change_percent'] = pd.to_numeric(df['price_change_percent'], errors='coerce')
+    with timed("load_data: brand extraction", rows=len(df)):
+        df['brand'] = extract_brand(df['title'])
+    
+    return df
+
+@tracked_cache(st.cache_data)
+def load_top_deals(data_version, limit=3, db_path=LIVE_DB):
+    """Top rated deals straight from the indexed deal-signal columns"""
+    return fetch_top_deals(limit=limit, db_path=db_path)
+
+@tracked_cache(st.cache_resource)
+def load_similar_index(data_version):
+    """Nearest-neighbour index over the latest specs of this data version, or None until the pipeline built it"""
+    return load_similarity_index(data_version=data_version)
+
+@tracked_cache(st.cache_data)
+def load_thumbnails(data_version, db_path=LIVE_DB):
+    """Locally cached thumbnails as inline data URIs, keyed by their Amazon URL"""
+    return load_thumbnail_uris(db_path=db_path)
+
+@tracked_cache(st.cache_resource)
+def load_matrix(data_version):
+    """Memory-mapped price matrix of this data version shared by every session, or None until the pipeline built it"""
+    return load_price_matrix(data_version=data_version)
+
+def thumbnail_src():
+    """Lookup from a thumbnail URL to its cached copy, falling back to the remote URL"""
+    thumbnails = load_thumbnails(st.session_state.get('data_version'), st.session_state.get('snapshot', LIVE_DB))
+    return lambda url: thumbnails.get(url, url)
+
+def memoized_view(df, name, key, compute):
+    """
+    Rows of compute(df), memoized in session state by view name, data version and the widget values in `key`.
+    Only the resulting index is stored, so a repeated filter or sort is a single .loc lookup.
+    """
+    cache = st.session_state.setdefault('_view_cache', {})
+    cache_key = (name, st.session_state.get('data_version'), key)
+    if cache_key not in cache:
+        if len(cache) >= VIEW_CACHE_ENTRIES:
+            cache.pop(next(iter(cache)))
+        with timed(f"{name} view: compute", rows=len(df)):
+            cache[cache_key] = compute(df).index
+    with timed(f"{name} view: lookup", rows=len(cache[cache_key])):
+        return df.loc[cache[cache_key]]
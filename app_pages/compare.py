@@ -0,0 +1,174 @@
+import streamlit as st
+from Functions import similar_laptops
+from app_pages.common import load_similar_index, thumbnail_src
+from app_pages.perf import timed
+
+
+# Compare Laptops Page
+def render(df):
+    st.title("⚖️ Compare Laptops")
+    st.markdown("Select two laptops to compare their specifications and pricing side by side.")
+    
+    # Create a simplified display name for selection
+    df['display_name'] = df['title'].str[:60] + " - $" + df['extracted_price'].astype(str)
+    
+    compare_selectors(df)
+
+
+# Picking another laptop reruns only the comparison
+@st.fragment
+def compare_selectors(df):
+    display_names = df['display_name'].tolist()
+    thumb_src = thumbnail_src()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🥇 First Laptop")
+        laptop1_idx = st.selectbox(
+            "Select first laptop:",
+            range(len(df)),
+            format_func=display_names.__getitem__,
+            key="laptop1"
+        )
+    
+    with col2:
+        st.subheader("🥈 Second Laptop")
+        laptop2_idx = st.selectbox(
+            "Select second laptop:",
+            range(len(df)),
+            format_func=display_names.__getitem__,
+            key="laptop2"
+        )
+    
+    if laptop1_idx != laptop2_idx:
+        laptop1 = df.iloc[laptop1_idx]
+        laptop2 = df.iloc[laptop2_idx]
+        
+        st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
+        
+        # Comparison cards
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            buy_now_class1 = "buy-now-yes" if laptop1['buy_now'] == 'Yes' else "buy-now-no"
+            stability_class1 = "stable-tag" if laptop1['stability_label'] == 'Stable' else "unstable-tag"
+
+            card_html = f"""
+            <div class="laptop-card">
+                <div style="display: flex; justify-content: space-between; align-items: start;">
+                    <img src="{thumb_src(laptop1['thumbnail'])}" width="80" height="60" style="object-fit: cover;">
+                    <div style="text-align: right;">
+                        <span class="{buy_now_class1}">{laptop1['buy_now']}</span><br><br>
+                        <span class="{stability_class1}">{laptop1['stability_label']}</span>
+                    </div>
+                </div>
+                <h4>{laptop1['title'][:100]}{"..." if len(laptop1['title']) > 100 else ""}</h4>
+                <div class="price-tag">${laptop1['extracted_price']:.2f}</div>
+                <div class="spec-grid">
+                    <div class="spec-item"><strong>Rating:</strong> {laptop1['rating']:.1f} ⭐</div>
+                    <div class="spec-item"><strong>Reviews:</strong> {laptop1['reviews']:,}</div>
+                    <div class="spec-item"><strong>Display:</strong> {laptop1['display_size']}</div>
+                    <div class="spec-item"><strong>RAM:</strong> {laptop1['ram']}</div>
+                    <div class="spec-item"><strong>OS:</strong> {laptop1['operating_system']}</div>
+                </div>
+                <br>
+                <a class="view-btn" href="{laptop1['link_clean']}" target="_blank">View on Amazon →</a>
+            </div>
+            """
+            col1.markdown(card_html, unsafe_allow_html=True)
+
+
+        with col2:
+            buy_now_class2 = "buy-now-yes" if laptop2['buy_now'] == 'Yes' else "buy-now-no"
+            stability_class2 = "stable-tag" if laptop2['stability_label'] == 'Stable' else "unstable-tag"
+
+            card_html = f"""
+            <div class="laptop-card">
+                <div style="display: flex; justify-content: space-between; align-items: start;">
+                    <img src="{thumb_src(laptop2['thumbnail'])}" width="80" height="60" style="object-fit: cover;">
+                    <div style="text-align: right;">
+                        <span class="{buy_now_class2}">{laptop2['buy_now']}</span><br><br>
+                        <span class="{stability_class2}">{laptop2['stability_label']}</span>
+                    </div>
+                </div>
+                <h4>{laptop2['title'][:100]}{"..." if len(laptop2['title']) > 100 else ""}</h4>
+                <div class="price-tag">${laptop2['extracted_price']:.2f}</div>
+                <div class="spec-grid">
+                    <div class="spec-item"><strong>Rating:</strong> {laptop2['rating']:.1f} ⭐</div>
+                    <div class="spec-item"><strong>Reviews:</strong> {laptop2['reviews']:,}</div>
+                    <div class="spec-item"><strong>Display:</strong> {laptop2['display_size']}</div>
+                    <div class="spec-item"><strong>RAM:</strong> {laptop2['ram']}</div>
+                    <div class="spec-item"><strong>OS:</strong> {laptop2['operating_system']}</div>
+                </div>
+                <br>
+                <a class="view-btn" href="{laptop2['link_clean']}" target="_blank">View on Amazon →</a>
+            </div>
+            """
+            col2.markdown(card_html, unsafe_allow_html=True)
+
+        
+        # Comparison summary
+        st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
+        st.subheader("📊 Quick Comparison")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            price_diff = laptop2['extracted_price'] - laptop1['extracted_price']
+            if price_diff > 0:
+                st.metric("Price Difference", f"${abs(price_diff):.2f}", f"Laptop 2 is more expensive")
+            elif price_diff < 0:
+                st.metric("Price Difference", f"${abs(price_diff):.2f}", f"Laptop 1 is more expensive")
+            else:
+                st.metric("Price Difference", "$0.00", "Same price")
+        
+        with col2:
+            rating_diff = laptop2['rating'] - laptop1['rating']
+            if rating_diff > 0:
+                st.metric("Rating Difference", f"{abs(rating_diff):.1f}", f"Laptop 2 rated higher")
+            elif rating_diff < 0:
+                st.metric("Rating Difference", f"{abs(rating_diff):.1f}", f"Laptop 1 rated higher")
+            else:
+                st.metric("Rating Difference", "0.0", "Same rating")
+        
+        with col3:
+            review_diff = laptop2['reviews'] - laptop1['reviews']
+            if review_diff > 0:
+                st.metric("Review Count Diff", f"{abs(review_diff):,.0f}", f"Laptop 2 has more reviews")
+            elif review_diff < 0:
+                st.metric("Review Count Diff", f"{abs(review_diff):,.0f}", f"Laptop 1 has more reviews")
+            else:
+                st.metric("Review Count Diff", "0", "Same review count")
+
+        # Similar but cheaper
+        st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
+        st.subheader("💸 Similar but Cheaper than the First Laptop")
+        similar_index = load_similar_index(st.session_state.get('data_version'))
+        with timed("compare: similar laptops"):
+            similar = similar_laptops(laptop1['asin'], similar_index, k=3)
+        if len(similar) > 0:
+            latest_titles = df.sort_values('scrape_date').drop_duplicates('asin', keep='last').set_index('asin')['title']
+            sim_cols = st.columns(len(similar))
+            for col, (_, alt) in zip(sim_cols, similar.iterrows()):
+                with col:
+                    st.metric(
+                        f"{latest_titles.get(alt['asin'], alt['asin'])[:40]}...",
+                        f"${alt['extracted_price']:.2f}",
+                        f"${laptop1['extracted_price'] - alt['extracted_price']:.2f} cheaper"
+                    )
+        else:
+            st.info("No cheaper laptop with similar specs right now.")
+    
+    else:
+        st.markdown("""
+<div style="
+    background-color: #fde68a; 
+    color: #78350f; 
+    padding: 12px; 
+    border-radius: 6px; 
+    border-left: 6px solid #f59e0b;
+    font-weight: 600;">
+    ⚠️ Please select two different laptops to compare.
+</div>
+""", unsafe_allow_html=True)
@@ -0,0 +1,189 @@
+import streamlit as st
+from datetime import datetime
+from Functions import export_listings, EXPORT_FORMATS
+from app_pages.common import load_top_deals, memoized_view
+from app_pages.perf import timed
+
+
+# Dashboard Page
+def render(df):
+    st.title("🏠 Laptop Scout Dashboard")
+    st.markdown("### Welcome to your comprehensive laptop price tracking dashboard!")
+    
+    # Top Deals Section
+    st.subheader("🔥 Today's Top Deals")
+    top_deals = load_top_deals(st.session_state['data_version'], 3, st.session_state['snapshot'])
+    
+    if len(top_deals) > 0:
+        deal_cols = st.columns(min(3, len(top_deals)))
+        for i, (_, deal) in enumerate(top_deals.iterrows()):
+            if i < len(deal_cols):
+                with deal_cols[i]:
+                    
+         
+         
+                    st.markdown(f"""
+                    <div style="background: linear-gradient(to right, #4776E6 0%, #8E54E9  100%); color: white; padding: 1rem; border-radius: 12px; text-align: center; margin-bottom: 1rem;">
+                        <h5 style="color: white; margin: 0;">{deal['title'][:40]}...</h5>
+                        <div style="font-size: 1.5rem; font-weight: bold; margin: 0.5rem 0;">${deal['extracted_price']:.0f}</div>
+                        <div>⭐ {deal['rating']:.1f} ({deal['reviews']:,.0f} reviews)</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+    else:
+        st.info("No hot deals available at the moment. Check back later!")
+    
+    st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
+    
+    # Key Metrics Row
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        total_laptops = len(df)
+        st.metric("💻 Total Laptops", total_laptops)
+    
+    with col2:
+        buy_now_deals = len(df[df['buy_now'] == 'Yes'])
+        st.metric("🔥 Buy Now Deals", buy_now_deals)
+    
+    with col3:
+        stable_laptops = len(df[df['stability_label'] == 'Stable'])
+        st.metric("📈 Stable Prices", stable_laptops)
+    
+    with col4:
+        high_rated = len(df[df['rating'] > 4.0])
+        st.metric("⭐ Rating > 4.0", high_rated)
+    
+    st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
+    
+    listing_explorer(df)
+
+
+# Filters, quick stats and table rerun on their own when a filter changes
+@st.fragment
+def listing_explorer(df):
+    # Enhanced Filters Section
+    st.subheader("🔍 Advanced Filter Options")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        price_range = st.slider(
+            "Price Range ($)",
+            min_value=int(df['extracted_price'].min()),
+            max_value=int(df['extracted_price'].max()),
+            value=(int(df['extracted_price'].min()), int(df['extracted_price'].max()))
+        )
+    
+    with col2:
+        rating_filter = st.slider(
+            "Minimum Rating",
+            min_value=0.0,
+            max_value=5.0,
+            value=0.0,
+            step=0.1
+        )
+    
+    with col3:
+        buy_now_filter = st.selectbox(
+            "Buy Now Deal",
+            options=["All", "Yes", "No"]
+        )
+    
+    with col4:
+        brand_filter = st.selectbox(
+            "Brand",
+            options=["All"] + sorted(df['brand'].unique().tolist())
+        )
+    
+    # Search functionality
+    search_term = st.text_input("🔍 Search laptops by name:", placeholder="e.g., MacBook, Gaming, Intel...")
+    
+    # Apply filters
+    def apply_filters(filtered_df):
+        filtered_df = filtered_df[
+            (filtered_df['extracted_price'] >= price_range[0]) & 
+            (filtered_df['extracted_price'] <= price_range[1]) &
+            (filtered_df['rating'] >= rating_filter)
+        ]
+        
+        if buy_now_filter != "All":
+            filtered_df = filtered_df[filtered_df['buy_now'] == buy_now_filter]
+        
+        if brand_filter != "All":
+            filtered_df = filtered_df[filtered_df['brand'] == brand_filter]
+        
+        if search_term:
+            filtered_df = filtered_df[filtered_df['title'].str.contains(search_term, case=False, na=False)]
+        return filtered_df
+    
+    filtered_df = memoized_view(
+        df, 'dashboard', (price_range, rating_filter, buy_now_filter, brand_filter, search_term), apply_filters
+    )
+    
+    st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
+    
+    # Quick Stats for filtered data
+    if len(filtered_df) != len(df):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Filtered Results", len(filtered_df))
+        with col2:
+            if len(filtered_df) > 0:
+                st.metric("Avg Price", f"${filtered_df['extracted_price'].mean():.2f}")
+            else:
+                st.metric("Avg Price", "N/A")
+        with col3:
+            if len(filtered_df) > 0:
+                st.metric("Avg Rating", f"{filtered_df['rating'].mean():.1f}⭐")
+            else:
+                st.metric("Avg Rating", "N/A")
+        st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
+    
+    listing_table(filtered_df)
+
+
+# Export options only rerun the table
+@st.fragment
+def listing_table(filtered_df):
+    # Data Table with Export Option
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.subheader(f"📊 Laptop Data Table ({len(filtered_df)} laptops)")
+    with col2:
+        if len(filtered_df) > 0:
+            export_format = st.selectbox("Export format", list(EXPORT_FORMATS))
+            include_history = st.checkbox("Include price history")
+            extension, mime = EXPORT_FORMATS[export_format]
+            snapshot = st.session_state['snapshot']
+            # the file is only built when the button is clicked
+            st.download_button(
+                label="📥 Export",
+                data=lambda: export_listings(filtered_df, fmt=extension, include_history=include_history,
+                                             db_path=snapshot),
+                file_name=f"laptop_data_{datetime.now().strftime('%Y%m%d')}.{extension}",
+                mime=mime
+            )
+    
+    if len(filtered_df) > 0:
+        # Display table with custom formatting
+        display_df = filtered_df[['title', 'brand', 'extracted_price', 'rating', 'reviews', 'buy_now', 'stability_label', 'display_size', 'ram', 'operating_system']].copy()
+        display_df.columns = ['Title', 'Brand', 'Price ($)', 'Rating', 'Reviews', 'Buy Now', 'Price Stability', 'Display', 'RAM', 'OS']
+        if 'value_label' in filtered_df.columns:
+            # Scores are computed by the pipeline; the app only reads them
+            display_df.insert(3, 'Fair Price ($)', filtered_df['fair_price'].values)
+            display_df.insert(4, 'Value', filtered_df['value_label'].values)
+        
+        with timed("dashboard: table", rows=len(display_df)):
+            st.dataframe(
+                display_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Price ($)": st.column_config.NumberColumn(format="$%.2f"),
+                    "Fair Price ($)": st.column_config.NumberColumn(format="$%.2f"),
+                    "Rating": st.column_config.NumberColumn(format="%.1f ⭐"),
+                    "Reviews": st.column_config.NumberColumn(format="%d"),
+                }
+            )
+    else:
+        st.warning("No laptops found matching your criteria. Try adjusting the filters.")
@@ -0,0 +1,233 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from Functions import matrix_sparklines
+from app_pages.common import thumbnail_src, memoized_view, load_matrix
+from app_pages.perf import Stopwatch
+
+CARDS_PER_PAGE = 20
+
+
+def sparkline_svg(values, width=120, height=28):
+    """
+    Inline SVG polyline of the recent prices of one card, from its first observed scrape to the latest one;
+    scrapes where the listing was missing are skipped
+    """
+    x = np.flatnonzero(~np.isnan(values))
+    if len(x) < 2:
+        return ""
+    y = values[x]
+    span = float(y.max() - y.min()) or 1.0
+    points = " ".join(
+        f"{px:.1f},{py:.1f}" for px, py in zip((x - x[0]) * width / (len(values) - 1 - x[0]), height - 2 - (y - y.min()) * (height - 4) / span)
+    )
+    color = '#10b981' if y[-1] <= y[0] else '#ef4444'
+    return (f'<svg width="{width}" height="{height}"><title>Last {len(x)} scrapes: &#36;{y.min():.0f} - &#36;{y.max():.0f}</title>'
+            f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="2"/></svg>')
+
+
+# Laptop Details Page
+def render(df):
+    st.title("💻 Laptop Details")
+    st.markdown("Browse laptops in beautiful card format with advanced filtering options.")
+    
+    details_explorer(df)
+
+
+# Filters, sorting and highlights rerun on their own when a widget changes
+@st.fragment
+def details_explorer(df):
+    # Enhanced Filters
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        rating_filter = st.slider("Minimum Rating", 0.0, 5.0, 0.0, 0.1)
+    
+    with col2:
+        price_filter = st.slider(
+            "Price Range ($)",
+            int(df['extracted_price'].min()),
+            int(df['extracted_price'].max()),
+            (int(df['extracted_price'].min()), int(df['extracted_price'].max()))
+        )
+    
+    with col3:
+        stability_filter = st.selectbox("Price Stability", ["All", "Stable", "Unstable"])
+    
+    with col4:
+        brand_filter_details = st.selectbox("Brand", ["All"] + sorted(df['brand'].unique().tolist()))
+    
+    # Search functionality
+    search_details = st.text_input("🔍 Search laptops:", placeholder="Search by name, specs, or features...")
+    
+    # Sorting options
+    sort_by = st.selectbox("Sort by:", ["Rating (High to Low)", "Price (Low to High)", "Price (High to Low)", "Reviews (Most)"])
+    
+    # Apply filters
+    filters = (rating_filter, price_filter, stability_filter, brand_filter_details, search_details)
+    
+    def apply_filters(filtered_df):
+        filtered_df = filtered_df[
+            (filtered_df['rating'] >= rating_filter) &
+            (filtered_df['extracted_price'] >= price_filter[0]) &
+            (filtered_df['extracted_price'] <= price_filter[1])
+        ]
+        
+        if stability_filter != "All":
+            filtered_df = filtered_df[filtered_df['stability_label'] == stability_filter]
+        
+        if brand_filter_details != "All":
+            filtered_df = filtered_df[filtered_df['brand'] == brand_filter_details]
+        
+        if search_details:
+            filtered_df = filtered_df[filtered_df['title'].str.contains(search_details, case=False, na=False)]
+        return filtered_df
+    
+    # Apply sorting
+    def apply_sort(filtered_df):
+        if sort_by == "Rating (High to Low)":
+            return filtered_df.sort_values('rating', ascending=False)
+        elif sort_by == "Price (Low to High)":
+            return filtered_df.sort_values('extracted_price', ascending=True)
+        elif sort_by == "Price (High to Low)":
+            return filtered_df.sort_values('extracted_price', ascending=False)
+        elif sort_by == "Reviews (Most)":
+            return filtered_df.sort_values('reviews', ascending=False)
+        return filtered_df
+    
+    # A sort change reuses the memoized filter result
+    filtered_df = memoized_view(df, 'details_filter', filters, apply_filters)
+    filtered_df = memoized_view(filtered_df, 'details_sort', filters + (sort_by,), apply_sort)
+    
+    st.markdown(f"**Showing {len(filtered_df)} laptops** | Sorted by {sort_by}")
+    
+    # Performance insights
+    if len(filtered_df) > 0:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            best_deal = filtered_df[filtered_df['buy_now'] == 'Yes'].nlargest(1, 'rating')
+            if len(best_deal) > 0:
+                st.markdown(f"""
+                <div style="
+                    background-color: #10b981;  /* green background */
+                    color: white;               /* white text */
+                    padding: 10px;
+                    border-radius: 8px;
+                    font-weight: bold;
+                    margin: 10px;
+                    ">
+                    🏆 Best Deal: {best_deal.iloc[0]['title'][:30]}... - ${best_deal.iloc[0]['extracted_price']:.0f}
+                </div>
+                """, unsafe_allow_html=True)
+            else:
+                st.markdown("""
+                <div style="
+                    background-color: #3b82f6; /* blue background */
+                    color: white;
+                    padding: 10px;
+                    border-radius: 8px;
+                    font-weight: bold;
+                    margin: 10px;
+                    ">
+                    No hot deals in current selection
+                </div>
+                """, unsafe_allow_html=True)
+        
+        with col2:
+            highest_rated = filtered_df.nlargest(1, 'rating')
+            st.markdown(f"""
+            <div style="
+                background-color: #2563eb;  /* blue */
+                color: white;
+                padding: 10px;
+                border-radius: 8px;
+                font-weight: bold;
+                margin: 10px;">
+                ⭐ Highest Rated: {highest_rated.iloc[0]['rating']:.1f}/5.0
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col3:
+            price_range_display = f"💰 Price Range: ${filtered_df['extracted_price'].min():.0f} - ${filtered_df['extracted_price'].max():.0f}"
+            st.markdown(f"""
+    <div style="
+        background-color: #f59e0b;  
+        color: black;
+        padding: 10px;
+        border-radius: 8px;
+        font-weight: bold;
+        margin: 10px;">
+        💰 Price Range: ${filtered_df['extracted_price'].min():.0f} - ${filtered_df['extracted_price'].max():.0f}
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
+    
+    card_grid(filtered_df, filters + (sort_by,))
+
+
+# Paging only rebuilds the cards of the chosen page
+@st.fragment
+def card_grid(filtered_df, view_key):
+    # Display laptops in cards (2 per row)
+    if len(filtered_df) > 0:
+        thumb_src = thumbnail_src()
+        n_pages = (len(filtered_df) - 1) // CARDS_PER_PAGE + 1
+        page_number = 1
+        if n_pages > 1:
+            # keyed on the view so a new filter or sort starts again at page 1
+            page_number = st.number_input(
+                f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1,
+                key=f"details_page_{hash(view_key)}"
+            )
+        page_df = filtered_df.iloc[(page_number - 1) * CARDS_PER_PAGE:page_number * CARDS_PER_PAGE]
+        watch = Stopwatch()
+        # recent prices of the whole page in one read of the memory-mapped matrix
+        matrix = load_matrix(st.session_state.get('data_version'))
+        sparklines = matrix_sparklines(matrix, page_df['asin']) if matrix is not None else None
+        watch.lap("details: sparklines", rows=len(page_df))
+        
+        for i in range(0, len(page_df), 2):
+            cols = st.columns(2)
+            
+            for j, col in enumerate(cols):
+                if i + j < len(page_df):
+                    laptop = page_df.iloc[i + j]
+                    
+                    buy_now_class = "buy-now-yes" if laptop['buy_now'] == 'Yes' else "buy-now-no"
+                    stability_class = "stable-tag" if laptop['stability_label'] == 'Stable' else "unstable-tag"
+                    fair_value_html = ""
+                    if pd.notna(laptop.get('fair_price')):
+                        fair_value_html = f"<div class=\"spec-item\"><strong>Fair Price:</strong> ${laptop['fair_price']:.2f} ({laptop['value_label']})</div>"
+                    
+                    sparkline_html = sparkline_svg(sparklines[i + j]) if sparklines is not None else ""
+                    
+                    card_html = f"""
+                    <div class="laptop-card">
+                        <div style="display: flex; justify-content: space-between; align-items: start;">
+                            <img src="{thumb_src(laptop['thumbnail'])}" width="80" height="60" style="object-fit: cover;">
+                            <div style="text-align: right;">
+                                <span class="{buy_now_class}">{laptop['buy_now']}</span><br><br>
+                                <span class="{stability_class}">{laptop['stability_label']}</span>
+                            </div>
+                        </div>
+                        <h4>{laptop['title'][:100]}{"..." if len(laptop['title']) > 100 else ""}</h4>
+                        <div class="price-tag">${laptop['extracted_price']:.2f}</div> {sparkline_html}
+                        <div class="spec-grid">
+                            <div class="spec-item"><strong>Rating:</strong> {laptop['rating']:.1f} ⭐</div>
+                            <div class="spec-item"><strong>Reviews:</strong> {laptop['reviews']:,}</div>
+                            <div class="spec-item"><strong>Display:</strong> {laptop['display_size']}</div>
+                            <div class="spec-item"><strong>RAM:</strong> {laptop['ram']}</div>
+                            <div class="spec-item"><strong>OS:</strong> {laptop['operating_system']}</div>
+                            <div class="spec-item"><strong>Brand:</strong> {laptop['brand']}</div>
+                            {fair_value_html}
+                        </div>
+                        <br>
+                        <a class="view-btn" href="{laptop['link_clean']}" target="_blank">View on Amazon →</a>
+                    </div>
+                    """
+                    col.markdown(card_html, unsafe_allow_html=True)
+        watch.lap("details: card HTML", rows=len(page_df))
+    else:
+        st.warning("No laptops found matching your criteria. Try adjusting the filters.")
+        st.info("💡 Tip: Try reducing the minimum rating or expanding the price range.")
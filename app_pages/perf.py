@@ -0,0 +1,144 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+import streamlit as st
+
+PERF_LOG_PATH = os.path.join("logs", "perf.jsonl")
+PERF_LOG_BYTES = 1_000_000  # roll over to perf.jsonl.1 .. .3 past this size
+PERF_LOG_BACKUPS = 3
+
+_cache_call = threading.local()
+
+
+def _perf_logger():
+    """One JSON line per rerun in a size-capped rolling file"""
+    logger = logging.getLogger("laptop_scout.perf")
+    if not any(isinstance(handler, RotatingFileHandler) for handler in logger.handlers):  # others may be attached
+        os.makedirs(os.path.dirname(PERF_LOG_PATH), exist_ok=True)
+        handler = RotatingFileHandler(PERF_LOG_PATH, maxBytes=PERF_LOG_BYTES, backupCount=PERF_LOG_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def _write_log(record):
+    try:
+        _perf_logger().info(json.dumps(record, default=str))
+    except OSError:
+        pass  # read-only filesystem: the panel still works
+
+
+def start_rerun():
+    """Reset the per-rerun timings; called first thing in main.py"""
+    st.session_state['_perf'] = {
+        'page': None,
+        'started': time.perf_counter(),
+        'sections': [],
+        'cache': {},
+        'finished': False,
+    }
+
+
+@contextmanager
+def timed(section, rows=None):
+    """
+    Time a block of the script. Sections timed during a fragment rerun, after the full run has finished,
+    go straight to the log since no panel is redrawn for them.
+    """
+    perf = st.session_state.get('_perf')
+    entry = {'section': section, 'ms': None, 'rows': rows}
+    if perf is not None and not perf['finished']:
+        perf['sections'].append(entry)  # appended on entry so nested sections follow their parent
+    start = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        entry['ms'] = round((time.perf_counter() - start) * 1000, 2)
+        if perf is not None and perf['finished']:
+            _write_log({'ts': datetime.now().isoformat(timespec='seconds'), 'page': perf['page'],
+                        'fragment': True, **entry})
+
+
+class Stopwatch:
+    """
+    Lap timer for long pages: each lap() records the time since the previous one,
+    so a chart can be timed without wrapping it in a with-block
+    """
+    def __init__(self):
+        self._last = time.perf_counter()
+
+    def lap(self, section, rows=None):
+        now = time.perf_counter()
+        perf = st.session_state.get('_perf')
+        if perf is not None and not perf['finished']:
+            perf['sections'].append({'section': section, 'ms': round((now - self._last) * 1000, 2), 'rows': rows})
+        self._last = now
+
+
+def tracked_cache(cache):
+    """
+    Wrap st.cache_data / st.cache_resource so every call is timed and counted as a hit or a miss:
+    the function body only runs on a miss
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            _cache_call.missed = True
+            return func(*args, **kwargs)
+
+        cached = cache(compute)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            _cache_call.missed = False
+            with timed(f"{func.__name__}()"):
+                result = cached(*args, **kwargs)
+            perf = st.session_state.get('_perf')
+            if perf is not None:
+                counts = perf['cache'].setdefault(func.__name__, {'hits': 0, 'misses': 0})
+                counts['misses' if _cache_call.missed else 'hits'] += 1
+            return result
+
+        call.clear = cached.clear
+        return call
+    return decorate
+
+
+def finish_rerun(df, page):
+    """Log this rerun and, when enabled in the sidebar, show where its time went"""
+    perf = st.session_state.get('_perf')
+    if perf is None:
+        return
+    perf['page'] = page
+    show_panel = st.sidebar.checkbox("⏱️ Performance debug", key='perf_debug')
+    perf['finished'] = True
+    total_ms = round((time.perf_counter() - perf['started']) * 1000, 2)
+    record = {'ts': datetime.now().isoformat(timespec='seconds'), 'page': perf['page'], 'total_ms': total_ms,
+              'rows': len(df), 'sections': perf['sections'], 'cache': perf['cache']}
+    if show_panel:
+        record['df_memory_mb'] = round(df.memory_usage(deep=True).sum() / 1e6, 2)
+    _write_log(record)
+
+    if not show_panel:
+        return
+    with st.sidebar.expander("⏱️ This rerun", expanded=True):
+        st.metric("Total rerun", f"{total_ms:.0f} ms")
+        st.caption(f"DataFrame: {len(df):,} rows, {record['df_memory_mb']:.1f} MB")
+        st.markdown("**Sections**")
+        for entry in perf['sections']:
+            rows = f" · {entry['rows']:,} rows" if entry['rows'] is not None else ""
+            st.caption(f"{entry['section']}: {entry['ms'] or 0:.1f} ms{rows}")
+        if perf['cache']:
+            st.markdown("**Cache**")
+            for name, counts in perf['cache'].items():
+                st.caption(f"{name}: {counts['hits']} hit / {counts['misses']} miss")
+        st.caption(f"Logged to {PERF_LOG_PATH}")
@@ -0,0 +1,476 @@
+import streamlit as st
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from Functions import brand_price_trends, volatility_ranking, deal_frequency
+from app_pages.perf import Stopwatch, tracked_cache
+
+WEBGL_CHART_ROWS = 2000     # scatter plots use WebGL traces and box plots precomputed stats above this
+BINNED_CHART_ROWS = 20000   # scatter plots and histograms are binned server-side above this
+DENSITY_BINS = 60           # per axis of a binned scatter plot
+CHART_CACHE_ENTRIES = 40    # figures kept across data versions
+
+
+def histogram_chart(df, x, nbins, title, color):
+    """px.histogram, or bars of counts binned here once the rows would make the figure too heavy"""
+    if len(df) <= BINNED_CHART_ROWS:
+        return px.histogram(df, x=x, nbins=nbins, title=title, color_discrete_sequence=[color])
+    counts, edges = np.histogram(df[x].dropna(), bins=nbins)
+    fig = px.bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, title=title, color_discrete_sequence=[color])
+    fig.update_layout(bargap=0)
+    return fig
+
+
+def density_chart(df, x, y, title):
+    """Heatmap of a 2D histogram computed here: the browser gets DENSITY_BINS² cells whatever the row count"""
+    data = df[[x, y]].dropna()
+    counts, x_edges, y_edges = np.histogram2d(data[x], data[y], bins=DENSITY_BINS)
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=np.where(counts.T > 0, counts.T, np.nan),
+        colorscale='Blues',
+        colorbar=dict(title='Laptops'),
+        hovertemplate=f'{x}: %{{x:.2f}}<br>{y}: %{{y:.2f}}<br>laptops: %{{z}}<extra></extra>'
+    ))
+    fig.update_layout(title=title)
+    return fig
+
+
+def scatter_chart(df, x, y, title, **kwargs):
+    """px.scatter with WebGL traces above WEBGL_CHART_ROWS, and a binned density heatmap above BINNED_CHART_ROWS"""
+    if len(df) > BINNED_CHART_ROWS:
+        return density_chart(df, x, y, title)
+    return px.scatter(df, x=x, y=y, title=title, render_mode='webgl' if len(df) > WEBGL_CHART_ROWS else 'auto', **kwargs)
+
+
+def box_chart(df, x, y, title, color_discrete_map):
+    """px.box, or boxes drawn from quartiles and whiskers computed here instead of shipping every point"""
+    if len(df) <= WEBGL_CHART_ROWS:
+        return px.box(df, x=x, y=y, title=title, color=x, color_discrete_map=color_discrete_map)
+    fig = go.Figure()
+    for group, values in df.groupby(x)[y]:
+        values = values.dropna()
+        if values.empty:
+            continue
+        q1, median, q3 = values.quantile([0.25, 0.5, 0.75])
+        within = values[values.between(q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))]
+        fig.add_trace(go.Box(
+            x=[group], q1=[q1], median=[median], q3=[q3], mean=[values.mean()],
+            lowerfence=[within.min()], upperfence=[within.max()],
+            name=str(group), marker_color=color_discrete_map.get(group)
+        ))
+    fig.update_layout(title=title)
+    return fig
+
+
+def price_histogram(df):
+    """Price Distribution"""
+    fig_price = histogram_chart(df, 'extracted_price', 30, '📊 Price Distribution', '#3b82f6')
+    fig_price.update_layout(
+        title=dict(text='📊 Price Distribution', font=dict(color='#1e293b', size=20, family='Arial')),
+        xaxis_title=dict(text='Price ($)', font=dict(color='black', size=14)),
+        yaxis_title=dict(text='Number of Laptops', font=dict(color='black', size=14)),
+        xaxis=dict(tickfont=dict(color='grey')),
+        yaxis=dict(tickfont=dict(color='grey')),
+        showlegend=False,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_price
+
+
+def rating_histogram(df):
+    """Rating Distribution"""
+    fig_rating = histogram_chart(df, 'rating', 20, '⭐ Rating Distribution', '#10b981')
+    fig_rating.update_layout(
+        title=dict(text='⭐ Rating Distribution', font=dict(color='black', size=20, family='Arial')),
+        xaxis_title=dict(text='Rating', font=dict(color='black', size=14)),
+        yaxis_title=dict(text='Number of Laptops', font=dict(color='black', size=14)),
+        xaxis=dict(tickfont=dict(color='grey')),
+        yaxis=dict(tickfont=dict(color='grey')),
+        showlegend=False,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig_rating
+
+
+def price_vs_rating(df):
+    """Price vs Rating Scatter"""
+    fig_scatter = scatter_chart(
+        df, 
+        x='rating', 
+        y='extracted_price',
+        size='reviews',
+        color='buy_now',
+        title='💰 Price vs Rating Analysis',
+        color_discrete_map={'Yes': '#10b981', 'No': '#f59e0b'},
+        hover_data=['title', 'brand']
+    )
+    fig_scatter.update_layout(
+        title=dict(text='💰 Price vs Rating Analysis', font=dict(color='black', size=20, family='Arial')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis_title=dict(text='Rating', font=dict(color='black')),
+        yaxis_title=dict(text='Price ($)', font=dict(color='black')),
+        xaxis=dict(tickfont=dict(color='grey')),
+        yaxis=dict(tickfont=dict(color='grey')),
+        legend_title=dict(text='Buy Now Deal', font=dict(color='black')),
+        legend_font_color="#000000",
+        legend_font_size=12
+    )
+    return fig_scatter
+
+
+def os_share(df):
+    """Operating System Distribution"""
+    os_counts = df['operating_system'].value_counts().head(8)
+    fig_os = px.pie(
+        values=os_counts.values, 
+        names=os_counts.index,
+        title='💻 Operating System Distribution'
+    )
+    fig_os.update_layout(
+        title=dict(text='💻 Operating System Distribution', font=dict(color='black', size=20, family='Arial')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend_title=dict(text='Operating System', font=dict(color='black')),
+        legend_font_color="#000000",
+        legend_font_size=12
+    )
+    return fig_os
+
+
+def price_by_deal(df):
+    """Buy Now vs Price Analysis"""
+    fig_buy_now = box_chart(df, 'buy_now', 'extracted_price', '🔥 Price Distribution by Deal Status',
+                            {'Yes': '#10b981', 'No': '#f59e0b'})
+    fig_buy_now.update_layout(
+        title=dict(text='🔥 Price Distribution by Deal Status', font=dict(color='black', size=20, family='Arial')),
+        showlegend=False,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis_title=dict(text='Buy Now Deal', font=dict(color='black')),
+        yaxis_title=dict(text='Price ($)', font=dict(color='black')),
+        xaxis=dict(tickfont=dict(color='grey')),
+        yaxis=dict(tickfont=dict(color='grey'))
+    )
+    return fig_buy_now
+
+
+def price_by_stability(df):
+    """Price Stability Analysis"""
+    fig_stability = box_chart(df, 'stability_label', 'extracted_price', '📈 Price Distribution by Stability',
+                              {'Stable': '#10b981', 'Unstable': '#ef4444'})
+    fig_stability.update_layout(
+        title=dict(text='📈 Price Distribution by Stability', font=dict(color='black', size=20, family='Arial')),
+        showlegend=False,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis_title=dict(text='Price Stability', font=dict(color='black')),
+        yaxis_title=dict(text='Price ($)', font=dict(color='black')),
+        xaxis=dict(tickfont=dict(color='grey')),
+        yaxis=dict(tickfont=dict(color='grey'))
+    )
+    return fig_stability
+
+
+def brand_price(df):
+    """Average price by brand"""
+    brand_price = df.groupby('brand')['extracted_price'].mean().sort_values(ascending=False)
+
+    # Create a Plotly bar chart
+    fig_brand_price = px.bar(
+        x=brand_price.index,
+        y=brand_price.values,
+        color=brand_price.values,
+        color_continuous_scale='Purples',
+        labels={'x': 'Brand', 'y': 'Average Price ($)'},
+        title='💰 Average Price by Brand'
+    )
+
+    # Update layout
+    fig_brand_price.update_layout(
+        title=dict(text='💰 Average Price by Brand', font=dict(color='black', size=20, family='Arial')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis_title=dict(text='Brand', font=dict(color='black')),
+        yaxis_title=dict(text='Average Price ($)', font=dict(color='black')),
+        xaxis=dict(tickfont=dict(color='grey')),
+        yaxis=dict(tickfont=dict(color='grey')),
+
+    )
+    fig_brand_price.update_coloraxes(colorbar=dict(
+        title='Avg Price ($)',
+        tickfont=dict(color='black'),
+        title_font=dict(color='black', size=14, family='Arial')
+    ))
+    return fig_brand_price
+
+
+def brand_share(df):
+    """Brand market share"""
+    brand_counts = df['brand'].value_counts()
+    fig_brand_share = px.pie(
+        values=brand_counts.values,
+        names=brand_counts.index,
+        title='📊 Brand Market Share'
+    )
+    fig_brand_share.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        title=dict(text='📊 Brand Market Share', font=dict(color='black', size=20, family='Arial')),
+        legend_font_color='#1e293b',
+        legend_font_size=12,
+        legend_title=dict(text='Brand', font=dict(color='black'))
+    )
+    return fig_brand_share
+
+
+def ram_vs_price(df):
+    """RAM vs Price Analysis"""
+    ram_clean = df['ram'].str.extract('(\d+)').astype(float)
+    df_ram = df.copy()
+    df_ram['ram_gb'] = ram_clean[0]
+    df_ram = df_ram.dropna(subset=['ram_gb'])
+
+    if len(df_ram) == 0:
+        return None
+
+    fig_ram = scatter_chart(
+        df_ram, 
+        x='ram_gb', 
+        y='extracted_price',
+        title='💾 RAM vs Price Relationship',
+        color='brand',
+        size='rating'
+    )
+    fig_ram.update_layout(
+        title=dict(text='💾 RAM vs Price Relationship', font=dict(color='black', size=20, family='Arial')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis_title=dict(text='RAM (GB)', font=dict(color='black')),
+        yaxis_title=dict(text='Price ($)', font=dict(color='black')),
+        xaxis=dict(tickfont=dict(color='grey')),
+        yaxis=dict(tickfont=dict(color='grey')),
+        legend_title=dict(text='Brand', font=dict(color='black')),
+        legend_font_color='#1e293b',
+        legend_font_size=12
+    )
+    return fig_ram
+
+
+def rating_vs_reviews(df):
+    """Rating vs Reviews correlation"""
+    fig_reviews = scatter_chart(
+        df, 
+        x='reviews', 
+        y='rating',
+        title='⭐ Rating vs Review Count',
+        color='buy_now',
+        size='extracted_price',
+        color_discrete_map={'Yes': '#10b981', 'No': '#f59e0b'}
+    )
+    fig_reviews.update_layout(
+        title=dict(text='⭐ Rating vs Review Count', font=dict(color='black', size=20, family='Arial')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis_title=dict(text='Number of Reviews', font=dict(color='black')),
+        yaxis_title=dict(text='Rating', font=dict(color='black')),
+        xaxis=dict(tickfont=dict(color='grey')),
+        yaxis=dict(tickfont=dict(color='grey')),
+        legend_title=dict(text='Buy Now Deal', font=dict(color='black')),   
+        legend_font_color='#1e293b',
+        legend_font_size=12
+    )
+    return fig_reviews
+
+
+CHARTS = {builder.__name__: builder for builder in [
+    price_histogram, rating_histogram, price_vs_rating, os_share, price_by_deal,
+    price_by_stability, brand_price, brand_share, ram_vs_price, rating_vs_reviews,
+]}
+
+
+@tracked_cache(st.cache_data(max_entries=CHART_CACHE_ENTRIES))
+def cached_figure(data_version, chart, _df):
+    """Figure of one chart, built once per data version; reruns reuse it without touching plotly.express"""
+    return CHARTS[chart](_df)
+
+
+@tracked_cache(st.cache_data(max_entries=CHART_CACHE_ENTRIES))
+def load_history_analytics(data_version, db_path):
+    """Brand trends, volatility and deal frequency over the whole price history, once per data version"""
+    return brand_price_trends(db_path=db_path), volatility_ranking(db_path=db_path), deal_frequency(db_path=db_path)
+
+
+def show_history_analytics(watch):
+    trends, volatile, deals = load_history_analytics(st.session_state.get('data_version'),
+                                                     st.session_state.get('snapshot', 'laptop_prices.db'))
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fig_trends = px.line(trends, x='period', y='mean_price', color='brand', markers=True,
+                             title='📈 Average Price by Brand Over Time')
+        fig_trends.update_layout(
+            title=dict(text='📈 Average Price by Brand Over Time', font=dict(color='black', size=20, family='Arial')),
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            xaxis_title=dict(text='Month', font=dict(color='black')),
+            yaxis_title=dict(text='Average Price ($)', font=dict(color='black')),
+            xaxis=dict(tickfont=dict(color='grey')),
+            yaxis=dict(tickfont=dict(color='grey')),
+            legend_title=dict(text='Brand', font=dict(color='black')),
+            legend_font_color='#1e293b',
+            legend_font_size=12
+        )
+        st.plotly_chart(fig_trends, use_container_width=True)
+
+    with col2:
+        fig_deals = px.bar(deals, x='brand', y='deal_percent', color='deal_percent', color_continuous_scale='Greens',
+                           title='🔥 How Often Each Brand Is on Deal')
+        fig_deals.update_layout(
+            title=dict(text='🔥 How Often Each Brand Is on Deal', font=dict(color='black', size=20, family='Arial')),
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            xaxis_title=dict(text='Brand', font=dict(color='black')),
+            yaxis_title=dict(text='Scrapes Flagged as a Deal (%)', font=dict(color='black')),
+            xaxis=dict(tickfont=dict(color='grey')),
+            yaxis=dict(tickfont=dict(color='grey')),
+            coloraxis_showscale=False
+        )
+        st.plotly_chart(fig_deals, use_container_width=True)
+
+    st.markdown("**🎢 Most Volatile Listings**")
+    st.dataframe(
+        volatile[['title', 'brand', 'observations', 'min_price', 'max_price', 'price_std', 'variation_percent']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'title': 'Laptop',
+            'brand': 'Brand',
+            'observations': 'Scrapes',
+            'min_price': st.column_config.NumberColumn('Lowest', format="$%.2f"),
+            'max_price': st.column_config.NumberColumn('Highest', format="$%.2f"),
+            'price_std': st.column_config.NumberColumn('Std Dev', format="$%.2f"),
+            'variation_percent': st.column_config.NumberColumn('Variation', format="%.1f%%"),
+        }
+    )
+    watch.lap("insights: history analytics", rows=len(trends))
+
+
+def show_chart(df, chart, watch):
+    fig = cached_figure(st.session_state.get('data_version'), chart, df)
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
+    watch.lap(f"insights: {chart}", rows=len(df))
+
+
+# Price Insights Page
+def render(df):
+    st.title("📊 Price Insights & Analytics")
+    st.markdown("Deep dive into laptop pricing trends and market insights.")
+    watch = Stopwatch()
+    
+    # Market Overview Cards
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        avg_price = df['extracted_price'].mean()
+        st.metric("💰 Average Price", f"${avg_price:.0f}")
+    
+    with col2:
+        median_price = df['extracted_price'].median()
+        st.metric("📊 Median Price", f"${median_price:.0f}")
+    
+    with col3:
+        total_deals = len(df[df['buy_now'] == 'Yes'])
+        deal_percentage = (total_deals / len(df)) * 100
+        st.metric("🔥 Deal Rate", f"{deal_percentage:.1f}%")
+    
+    with col4:
+        avg_rating = df['rating'].mean()
+        st.metric("⭐ Avg Rating", f"{avg_rating:.1f}/5.0")
+    
+    st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
+    
+    # Create visualizations
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        show_chart(df, 'price_histogram', watch)
+    
+    with col2:
+        show_chart(df, 'rating_histogram', watch)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        show_chart(df, 'price_vs_rating', watch)
+    
+    with col2:
+        show_chart(df, 'os_share', watch)
+    
+    # Full width charts
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        show_chart(df, 'price_by_deal', watch)
+    
+    with col2:
+        show_chart(df, 'price_by_stability', watch)
+    
+    # Brand Analysis Section
+    st.subheader("🏢 Brand Analysis & Market Intelligence")
+    
+    col1, col2 = st.columns(2)
+    
+
+    with col1:
+        show_chart(df, 'brand_price', watch)
+
+    with col2:
+        show_chart(df, 'brand_share', watch)
+    
+    # Additional Analytics
+    st.subheader("📊 Advanced Market Analytics")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        show_chart(df, 'ram_vs_price', watch)
+    
+    with col2:
+        show_chart(df, 'rating_vs_reviews', watch)
+    
+    # Cross-history analytics
+    st.subheader("🕰️ Price History Analytics")
+    show_history_analytics(watch)
+    
+    # Market Insights Summary
+    st.subheader("🎯 Key Market Insights")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        **💡 Price Intelligence:**
+        - Most laptops are priced between $200-$800
+        - Premium brands (Apple) command 2-3x price premium
+        - Buy Now deals average 15-20% lower prices
+        - Stable pricing indicates established market positioning
+        """)
+    
+    with col2:
+        # Calculate some insights
+        expensive_deals = df[(df['buy_now'] == 'Yes') & (df['extracted_price'] > df['extracted_price'].median())]
+        high_rated_cheap = df[(df['rating'] > 4.0) & (df['extracted_price'] < df['extracted_price'].median())]
+        
+        st.markdown(f"""
+        **📈 Smart Shopping Tips:**
+        - {len(high_rated_cheap)} high-rated laptops under ${df['extracted_price'].median():.0f}
+        - {len(expensive_deals)} premium deals available now
+        - Best value brands: {df[df['extracted_price'] < df['extracted_price'].mean()]['brand'].mode().iloc[0] if len(df) > 0 else 'N/A'}
+        - Average deal savings: ~{((df[df['buy_now'] == 'No']['extracted_price'].mean() - df[df['buy_now'] == 'Yes']['extracted_price'].mean()) / df[df['buy_now'] == 'No']['extracted_price'].mean() * 100):.1f}%
+        """)
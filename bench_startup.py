@@ -0,0 +1,75 @@
+'''
+Startup benchmark for the Streamlit app
+
+    python bench_startup.py --reruns 5
+
+For every page a fresh interpreter loads main.py (cold start: Streamlit, Functions and the page module
+imported from scratch) and then reruns the script several times like a widget interaction would.
+Run it from the folder holding laptop_prices.db.
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+PAGES = ["🏠 Dashboard", "💻 Laptop Details", "📊 Price Insights", "⚖️ Compare Laptops"]
+
+
+def measure_page(page, reruns):
+    """
+    Runs inside the child process: time the first render of `page` and its reruns
+    """
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.run()
+    if page != PAGES[0]:
+        at.sidebar.selectbox[0].select(page).run()
+    cold = time.perf_counter() - start
+
+    rerun_times = []
+    for _ in range(reruns):
+        t = time.perf_counter()
+        at.run()
+        rerun_times.append(time.perf_counter() - t)
+    return {
+        'page': page,
+        'cold_start_s': round(cold, 3),
+        'rerun_median_s': round(statistics.median(rerun_times), 3) if rerun_times else None,
+        'plotly_express_imported': 'plotly.express' in sys.modules,
+        'page_modules': sorted(name for name in sys.modules if name.startswith('app_pages.')),
+        'errors': [str(e.value) for e in at.exception],
+    }
+
+
+def run_benchmark(reruns=5):
+    results = []
+    for page in PAGES:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", page, "--reruns", str(reruns)],
+            capture_output=True, text=True, check=True
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'Page':<22}{'Cold start (s)':>16}{'Rerun (s)':>12}{'plotly.express':>16}")
+    for r in results:
+        print(f"{r['page']:<22}{r['cold_start_s']:>16.3f}{r['rerun_median_s']:>12.3f}{str(r['plotly_express_imported']):>16}")
+        for error in r['errors']:
+            print(f"⚠️ {r['page']}: {error}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold-start and rerun time of each app page")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(measure_page(args.child, args.reruns)))
+    else:
+        run_benchmark(args.reruns)
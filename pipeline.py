@@ -0,0 +1,264 @@
+'''
+Incremental runner for the weekly pipeline
+
+    python pipeline.py                      # the whole graph
+    python pipeline.py merge                # only the merge stage
+    python pipeline.py clean --downstream   # clean and everything that depends on it
+    python pipeline.py publish --upstream   # publish and everything it depends on
+    python pipeline.py --list               # stages, their dependencies and when they last ran
+
+Every stage declares the files it reads and writes. A stage is skipped when the hash of its inputs
+(file contents, the database's data version and the stage's own source code) matches the last
+successful run recorded in .pipeline_state.json and its outputs still exist, so iterating on one stage
+only reruns that stage. Stages whose dependencies are done run concurrently, but the stages that write
+the database (marked writes_db) take turns on one lock: SQLite has a single writer, and concurrent writers
+would otherwise fail with "database is locked" once the busy timeout runs out. The thumbnail stage is
+network bound and takes that lock only around its final write, so its fetches overlap the other writers.
+'''
+import argparse
+import datetime
+import hashlib
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import Functions as F
+
+STATE_PATH = ".pipeline_state.json"
+DATA_VERSION = "db:data_version"  # input token: the data version stamped by every database write
+WORKERS = 4
+DB_WRITE_LOCK = threading.Lock()  # held by a writes_db stage for its whole run, by thumbnails only around its write
+
+
+class Stage:
+    def __init__(self, name, run, functions, after=(), inputs=(), outputs=(), writes_db=False):
+        self.name = name
+        self.run = run              # called with the results of the stages that ran before it
+        self.functions = functions  # hashed with the inputs, so editing a stage reruns it
+        self.after = list(after)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.writes_db = writes_db  # run alone among the database writers
+
+
+def _scrape(results):
+    F.web_scraping()
+    F.archive_raw_snapshot()
+
+
+def _watches(results):
+    # without a merge in this run, the rows changed by the last one are read back
+    changed = results['merge'] if 'merge' in results else F.fetch_changed_rows()
+    return F.evaluate_watches(changed)
+
+
+def _thumbnails(results):
+    # network bound: the fetches overlap the other writers, only the final insert takes the lock
+    return F.cache_thumbnails(write_lock=DB_WRITE_LOCK)
+
+
+def _fair_price(results):
+    F.train_fair_price_model()
+    return F.score_fair_prices()
+
+
+def _publish(results):
+    # the app only loads the similarity index; retention may have moved the data version past the one 'similar' built
+    F.build_similarity_index()
+    return F.publish_snapshot()
+
+
+def _retention(results):
+    F.compact_history()
+    return F.partition_history()
+
+
+STAGES = [
+    Stage('scrape', _scrape, [F.web_scraping, F.archive_raw_snapshot],
+          outputs=["amazon_scrape_data.csv"]),
+    Stage('clean', lambda results: F.data_cleaning(), [F.data_cleaning, F.clean_chunk, F.validate_batch],
+          after=['scrape'], inputs=["amazon_scrape_data.csv"], outputs=["cleaned_Data.csv"], writes_db=True),
+    Stage('merge', lambda results: F.update_merged_data(), [F.update_merged_data, F.compute_price_features],
+          after=['clean'], inputs=["cleaned_Data.csv"], outputs=["laptop_prices.db"], writes_db=True),
+    Stage('watches', _watches, [F.evaluate_watches, F.match_watches],
+          after=['merge'], inputs=[DATA_VERSION], writes_db=True),
+    Stage('similar', lambda results: F.build_cheaper_alternatives(), [F.build_cheaper_alternatives, F.build_spec_features],
+          after=['merge'], inputs=[DATA_VERSION], outputs=[F.SIMILARITY_INDEX_PATH], writes_db=True),
+    Stage('fair_price', _fair_price, [F.train_fair_price_model, F.score_fair_prices],
+          after=['merge'], inputs=[DATA_VERSION], outputs=[os.path.join(F.MODEL_DIR, "fair_price_latest.json")],
+          writes_db=True),
+    Stage('thumbnails', _thumbnails, [F.cache_thumbnails, F._resize_thumbnail],
+          after=['merge'], inputs=[DATA_VERSION], outputs=[F.THUMB_CACHE_DIR]),
+    Stage('retention', _retention, [F.compact_history, F.partition_history],
+          after=['watches', 'similar', 'fair_price', 'thumbnails'], inputs=[DATA_VERSION], writes_db=True),
+    Stage('analytics', lambda results: F.export_observations(), [F.export_observations, F._observation_types],
+          after=['retention'], inputs=[DATA_VERSION], outputs=[os.path.join(F.ANALYTICS_DIR, "manifest.json")]),
+    Stage('price_matrix', lambda results: F.build_price_matrix(), [F.build_price_matrix, F._forward_fill],
+          after=['retention'], inputs=[DATA_VERSION], outputs=[os.path.join(F.PRICE_MATRIX_DIR, "CURRENT")]),
+    Stage('publish', _publish, [F.publish_snapshot, F._freeze_partitions, F.build_similarity_index],
+          after=['retention'], inputs=[DATA_VERSION], outputs=[os.path.join(F.SNAPSHOT_DIR, "CURRENT")]),
+]
+STAGE_BY_NAME = {stage.name: stage for stage in STAGES}
+
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state, path=STATE_PATH):
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def input_hash(stage):
+    """
+    Hash of everything the stage reads, or None when it has no declared inputs and so always runs
+    """
+    if not stage.inputs:
+        return None
+    digest = hashlib.sha256()
+    for func in stage.functions:
+        digest.update(inspect.getsource(func).encode())
+    for name in stage.inputs:
+        if name == DATA_VERSION:
+            value = F.get_data_version()
+        elif os.path.isfile(name):
+            value = _file_digest(name)
+        else:
+            value = "missing"
+        digest.update(f"{name}={value}\n".encode())
+    return digest.hexdigest()
+
+
+def select_stages(targets=None, upstream=False, downstream=False):
+    """
+    Names of the stages to run, in declaration (topological) order
+    """
+    if not targets:
+        return [stage.name for stage in STAGES]
+    unknown = [t for t in targets if t not in STAGE_BY_NAME]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s) {unknown}; choose from {list(STAGE_BY_NAME)}")
+    selected = set(targets)
+    changed = True
+    while changed:
+        changed = False
+        for stage in STAGES:
+            if stage.name in selected:
+                continue
+            if (upstream and any(stage.name in STAGE_BY_NAME[s].after for s in selected)) or \
+                    (downstream and any(dep in selected for dep in stage.after)):
+                selected.add(stage.name)
+                changed = True
+    return [stage.name for stage in STAGES if stage.name in selected]
+
+
+def run_pipeline(targets=None, upstream=False, downstream=False, force=False, workers=WORKERS, state_path=STATE_PATH):
+    """
+    Run the selected stages, each as soon as the selected stages it depends on are done.
+    Dependencies outside the selection are taken as already satisfied.
+    """
+    names = select_stages(targets, upstream, downstream)
+    state = load_state(state_path)
+    results, done, failed = {}, set(), set()
+    pending = list(names)
+    F.enable_wal()
+    started = time.perf_counter()
+
+    def execute(stage):
+        key = input_hash(stage)
+        entry = state.get(stage.name, {})
+        outputs_exist = all(os.path.exists(path) for path in stage.outputs)
+        if not force and key is not None and entry.get('input_hash') == key and outputs_exist:
+            return stage.name, None, None, True
+        t = time.perf_counter()
+        if stage.writes_db:
+            with DB_WRITE_LOCK:
+                value = stage.run(results)
+        else:
+            value = stage.run(results)
+        # inputs are hashed again after the run: an input the stage writes itself is then up to date
+        return stage.name, value, (input_hash(stage), time.perf_counter() - t), False
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        while pending or running:
+            for name in list(pending):
+                deps = [dep for dep in STAGE_BY_NAME[name].after if dep in names]
+                if any(dep in failed for dep in deps):
+                    pending.remove(name)
+                    failed.add(name)
+                    print(f"⏭️ {name}: not run, a dependency failed")
+                elif all(dep in done for dep in deps):
+                    pending.remove(name)
+                    print(f"▶️ {name}")
+                    running[pool.submit(execute, STAGE_BY_NAME[name])] = name
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    _, value, record, skipped = future.result()
+                except Exception:
+                    failed.add(name)
+                    print(f"❌ {name} failed:")
+                    traceback.print_exc()
+                    continue
+                done.add(name)
+                if skipped:
+                    print(f"✅ {name}: up to date, skipped")
+                    continue
+                results[name] = value
+                key, seconds = record
+                state[name] = {'input_hash': key, 'seconds': round(seconds, 2),
+                               'finished_at': datetime.datetime.now().isoformat(timespec='seconds')}
+                save_state(state, state_path)
+                print(f"✅ {name} finished in {seconds:.1f}s")
+
+    print(f"🏁 Pipeline finished in {time.perf_counter() - started:.1f}s: "
+          f"{len(results)} ran, {len(done) - len(results)} skipped, {len(failed)} failed.")
+    return not failed
+
+
+def list_stages(state_path=STATE_PATH):
+    state = load_state(state_path)
+    print(f"{'Stage':<12}{'After':<40}{'Last run':>22}{'Seconds':>9}")
+    for stage in STAGES:
+        entry = state.get(stage.name, {})
+        print(f"{stage.name:<12}{', '.join(stage.after) or '-':<40}{entry.get('finished_at', 'never'):>22}"
+              f"{entry.get('seconds', ''):>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the laptop price pipeline, skipping stages whose inputs are unchanged")
+    parser.add_argument("stages", nargs="*", help=f"stages to run (default all): {', '.join(STAGE_BY_NAME)}")
+    parser.add_argument("--upstream", action="store_true", help="also run the stages the given ones depend on")
+    parser.add_argument("--downstream", action="store_true", help="also run the stages depending on the given ones")
+    parser.add_argument("--force", action="store_true", help="run even when the inputs are unchanged")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="stages run at the same time")
+    parser.add_argument("--list", action="store_true", help="show the stages and their last run")
+    args = parser.parse_args()
+    if args.list:
+        list_stages()
+    else:
+        ok = run_pipeline(args.stages, args.upstream, args.downstream, args.force, args.workers)
+        sys.exit(0 if ok else 1)
@@ -0,0 +1,40 @@
+'''
+Rebuild laptop_prices.db from the archived raw snapshots
+
+    python replay.py --start 2025-01-01 --end 2025-12-31 --workers 4
+
+Use it after a change to the cleaning or deal logic: every archived scrape in the range is cleaned again
+and merged, compacted and partitioned date by date as the weekly runs did, in a fresh database and fresh
+partition files that replace the live ones only once all of them are written. Without --start / --end the result equals what the weekly runs stored.
+The similar-laptops table and fair prices are then rebuilt unless --skip-derived is given,
+the observations are exported for the analytics queries
+and the result is published as a new snapshot for the app and the API.
+'''
+import argparse
+import time
+
+from Functions import (RAW_ARCHIVE_DIR, replay_history, build_cheaper_alternatives,
+                       train_fair_price_model, score_fair_prices, export_observations,
+                       publish_snapshot)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay archived raw snapshots into a fresh price database")
+    parser.add_argument("--start", help="first scrape date to replay (YYYY-MM-DD), default the oldest archived")
+    parser.add_argument("--end", help="last scrape date to replay (YYYY-MM-DD), default the newest archived")
+    parser.add_argument("--workers", type=int, default=None, help="cleaning processes, default one per CPU")
+    parser.add_argument("--archive-dir", default=RAW_ARCHIVE_DIR)
+    parser.add_argument("--db", default="laptop_prices.db")
+    parser.add_argument("--skip-derived", action="store_true", help="don't rebuild similar laptops and fair prices")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    replayed = replay_history(args.start, args.end, workers=args.workers, archive_dir=args.archive_dir, db_path=args.db)
+    if replayed is not None and not args.skip_derived:
+        build_cheaper_alternatives(db_path=args.db)
+        train_fair_price_model(db_path=args.db)
+        score_fair_prices(db_path=args.db)
+    if replayed is not None:
+        export_observations(db_path=args.db)
+        publish_snapshot(db_path=args.db)
+    print(f"⏱️ Replay finished in {time.perf_counter() - started:.1f}s")
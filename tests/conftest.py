@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import Functions as F  # noqa: E402
+
+SAMPLE_SCRAPE = os.path.join(ROOT, "amazon_scrape_data.csv")
+
+
+def weekly_scrapes(start, weeks, seed=0):
+    """
+    `weeks` weekly copies of the sample scrape starting at `start`, with some prices and ratings moving each week
+    """
+    rng = np.random.default_rng(seed)
+    raw = pd.read_csv(SAMPLE_SCRAPE)
+    for week in range(weeks):
+        raw = raw.copy()
+        raw['scrape_date'] = (pd.Timestamp(start) + pd.Timedelta(weeks=week)).strftime('%Y-%m-%d')
+        if week:
+            moved = rng.random(len(raw)) < 0.2
+            raw.loc[moved, 'extracted_price'] = (raw.loc[moved, 'extracted_price'] * 0.9).round(2)
+            rated = rng.random(len(raw)) < 0.05
+            raw.loc[rated, 'rating'] = (pd.to_numeric(raw.loc[rated, 'rating'], errors='coerce') - 0.1).round(1)
+        yield raw
+
+
+def run_week(raw):
+    """Clean and merge one scrape the way the weekly pipeline does"""
+    raw.to_csv("amazon_scrape_data.csv", index=False)
+    F.data_cleaning("amazon_scrape_data.csv")
+    return F.update_merged_data()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def two_weeks(workdir):
+    for raw in weekly_scrapes("2026-03-02", 2):
+        run_week(raw)
+    return workdir
+
+
+@pytest.fixture
+def partitioned(workdir):
+    """Ten weekly scrapes over three months, with the retention stage run after each like the pipeline does"""
+    for raw in weekly_scrapes("2026-01-05", 10, seed=3):
+        run_week(raw)
+        F.compact_history()
+        F.partition_history()
+    return workdir
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+import Functions as F
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("duckdb")
+
+QUERIES = {
+    'brand_week': lambda: F.brand_price_trends('week'),
+    'brand_month': lambda: F.brand_price_trends('month'),
+    'volatility': lambda: F.volatility_ranking(limit=25),
+    'deals_brand': lambda: F.deal_frequency('brand'),
+    'deals_asin': lambda: F.deal_frequency('asin'),
+}
+
+
+def normalized(df):
+    df = df.reset_index(drop=True)
+    if 'period' in df.columns:
+        df['period'] = pd.to_datetime(df['period']).astype('datetime64[ns]')
+    for col in ['observations', 'listings']:
+        if col in df.columns:
+            df[col] = df[col].astype('int64')
+    for col in df.select_dtypes(['object', 'string']).columns:
+        df[col] = df[col].astype(object).where(df[col].notna(), None)
+    return df.astype({col: 'float64' for col in df.select_dtypes('number').columns if col not in ('observations', 'listings')})
+
+
+@pytest.mark.parametrize("query", list(QUERIES))
+def test_duckdb_and_pandas_paths_agree(partitioned, monkeypatch, query):
+    F.export_observations()
+    assert F.observations_path() is not None
+    duckdb = normalized(QUERIES[query]())
+    assert len(duckdb)
+
+    monkeypatch.setattr(F, "_duckdb", lambda: None)
+    parquet = normalized(QUERIES[query]())
+    F.bump_data_version()  # the export is now stale, so the fallback reads SQLite
+    assert F.observations_path() is None
+    sqlite = normalized(QUERIES[query]())
+
+    for other in (parquet, sqlite):
+        pd.testing.assert_frame_equal(duckdb, other, check_exact=False, rtol=1e-9)
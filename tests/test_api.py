@@ -0,0 +1,100 @@
+import json
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import Functions as F
+import api
+from conftest import run_week, weekly_scrapes
+
+
+def test_listing_columns_exist(two_weeks):
+    conn = sqlite3.connect("laptop_prices.db")
+    columns = set(api._table_columns(conn))
+    conn.close()
+    assert set(api.LISTING_COLUMNS) - api.OPTIONAL_COLUMNS <= columns
+    assert 'price_change_percent' in api.LISTING_COLUMNS
+
+
+def test_select_list_rejects_unknown_columns(two_weeks):
+    conn = sqlite3.connect("laptop_prices.db")
+    with pytest.raises(KeyError):
+        api._select_list(conn, ['asin', 'no_such_column'])
+    assert api._select_list(conn, ['asin', 'fair_price']) in ('"asin", "fair_price"', '"asin", NULL AS "fair_price"')
+    conn.close()
+
+
+def test_listings_route_returns_change_percent(two_weeks):
+    F.publish_snapshot()
+    pool = api.SnapshotPool()
+    with pool.connection() as conn:
+        result = api.route(conn, "/listings", {'limit': ['5']})
+    pool.close()
+    assert len(result['items']) == 5
+    assert all('price_change_percent' in item for item in result['items'])
+
+
+def test_snapshot_pool_closes_replaced_pool(two_weeks):
+    F.publish_snapshot()
+    pool = api.SnapshotPool(size=2)
+    with pool.connection() as conn:
+        first = pool._pool
+        connections = [conn] + list(first._idle.queue)
+        F.bump_data_version()
+        F.publish_snapshot()
+        with pool.connection():
+            assert pool._pool is not first
+        conn.execute("SELECT 1")  # the request that started on the old snapshot still finishes on it
+    assert first not in pool._borrowers
+    for closed in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            closed.execute("SELECT 1")
+    pool.close()
+
+
+def test_live_pool_reattaches_moved_partitions(partitioned):
+    pool = api.ReadOnlyPool("laptop_prices.db", size=1)
+    with pool.connection() as conn:
+        before = conn.execute("SELECT COUNT(*) FROM laptops_all").fetchone()[0]
+    assert before == len(F.fetch_merged_data_from_sqlite())
+
+    # four more weeks close March, which retention moves into a month file the pool has never attached
+    for raw in list(weekly_scrapes("2026-01-05", 14, seed=3))[10:]:
+        run_week(raw)
+        F.compact_history()
+        F.partition_history()
+    with pool.connection() as conn:
+        attached = {alias for _, alias, _ in conn.execute("PRAGMA database_list")}
+        after = conn.execute("SELECT COUNT(*) FROM laptops_all").fetchone()[0]
+    pool.close()
+    assert "part_laptops_2026_03" in attached
+    assert after == len(F.fetch_merged_data_from_sqlite()) > before
+
+
+def test_server_answers_lookup_errors_with_json(two_weeks, monkeypatch):
+    pool = api.SnapshotPool()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), api.make_handler(pool, api.ResponseCache()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        monkeypatch.setattr(api, "LISTING_COLUMNS", api.LISTING_COLUMNS + ['no_such_column'])
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}/listings")
+        assert error.value.code == 500
+        assert "no_such_column" in json.loads(error.value.read())['error']
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}/listings?sort=colour")
+        assert error.value.code == 400
+
+        monkeypatch.undo()
+        with urllib.request.urlopen(f"{url}/listings?limit=3") as response:  # the server is still up
+            assert len(json.loads(response.read())['items']) == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+        pool.close()
@@ -0,0 +1,26 @@
+import pytest
+
+import Functions as F
+
+pytest.importorskip("streamlit")
+pytest.importorskip("plotly")
+import bench_startup  # noqa: E402
+
+
+def test_pages_render_and_load_plotting_lazily(two_weeks):
+    F.publish_snapshot()
+    results = {r['page']: r for r in bench_startup.run_benchmark(reruns=1)}
+
+    assert list(results) == bench_startup.PAGES
+    for page, result in results.items():
+        assert result['errors'] == [], page
+        # every page runs in a fresh interpreter, so only the page that plots imports plotly
+        assert result['plotly_express_imported'] == (page == "📊 Price Insights"), page
+    # the app opens on the Dashboard; no other page module is imported until its page is selected
+    modules = {page: set(result['page_modules']) - {'app_pages.common', 'app_pages.perf'} for page, result in results.items()}
+    assert modules == {
+        "🏠 Dashboard": {'app_pages.dashboard'},
+        "💻 Laptop Details": {'app_pages.dashboard', 'app_pages.laptop_details'},
+        "📊 Price Insights": {'app_pages.dashboard', 'app_pages.price_insights'},
+        "⚖️ Compare Laptops": {'app_pages.dashboard', 'app_pages.compare'},
+    }
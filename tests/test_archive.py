@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+import pytest
+
+import Functions as F
+from conftest import SAMPLE_SCRAPE
+
+pytest.importorskip("pyarrow")
+
+
+def as_stored(df):
+    # the CSV reads a missing value as NaN, Parquet as None
+    return df.astype(object).where(df.notna(), None).reset_index(drop=True)
+
+
+def test_raw_snapshot_round_trip(workdir):
+    raw = pd.read_csv(SAMPLE_SCRAPE)
+    raw['scrape_date'] = ['2026-04-13'] * 100 + ['2026-04-20'] * (len(raw) - 100)
+    raw.to_csv("amazon_scrape_data.csv", index=False)
+
+    written = F.archive_raw_snapshot()
+    assert sorted(os.path.basename(path) for path in written) == ["2026-04-13.parquet", "2026-04-20.parquet"]
+    assert F.list_raw_snapshots() == ["2026-04-13", "2026-04-20"]
+    assert sum(os.path.getsize(path) for path in written) < os.path.getsize("amazon_scrape_data.csv") / 3
+
+    url_columns = [col for col in raw.columns if raw[col].astype(str).str.startswith('https://').any()]
+    assert {'link', 'link_clean', 'thumbnail', 'serpapi_link'} <= set(url_columns)
+    first = F.read_raw_snapshot("2026-04-13")
+    assert list(first.columns) == list(raw.columns)
+    pd.testing.assert_frame_equal(as_stored(first), as_stored(raw.iloc[:100]))
+
+    # a column subset decodes only what it asks for, URLs included
+    subset = F.read_raw_snapshot("2026-04-20", columns=['asin', 'link_clean', 'extracted_price'])
+    pd.testing.assert_frame_equal(as_stored(subset), as_stored(raw.iloc[100:][['asin', 'link_clean', 'extracted_price']]))
+
+    # the prefix dictionary only grows, so a later archive with new prefixes leaves older snapshots readable
+    prefixes = F._load_url_prefixes(F.RAW_ARCHIVE_DIR)
+    later = raw.iloc[:20].assign(scrape_date='2026-04-27',
+                                 thumbnail=[f"https://images.example.org/laptops/{i}.jpg" for i in range(20)])
+    later.to_csv("amazon_scrape_data.csv", index=False)
+    F.archive_raw_snapshot()
+    grown = F._load_url_prefixes(F.RAW_ARCHIVE_DIR)
+    assert grown[:len(prefixes)] == prefixes and "https://images.example.org/laptops/" in grown
+    pd.testing.assert_frame_equal(as_stored(F.read_raw_snapshot("2026-04-13")), as_stored(raw.iloc[:100]))
+    pd.testing.assert_frame_equal(as_stored(F.read_raw_snapshot("2026-04-27")), as_stored(later))
@@ -0,0 +1,45 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+import Functions as F
+from conftest import weekly_scrapes
+
+
+def clean_weeks(directory, scrapes, clean):
+    """Clean and merge each scrape in its own directory; returns the cleaned frames and the quarantine"""
+    os.makedirs(directory)
+    os.chdir(directory)
+    frames = []
+    for week, raw in enumerate(scrapes):
+        path = f"raw_{week}.csv"
+        raw.to_csv(path, index=False)
+        frames.append(clean(path).sort_values('asin').reset_index(drop=True))
+        F.update_merged_data()
+    conn = sqlite3.connect("laptop_prices.db")
+    quarantined = pd.read_sql_query("SELECT asin, scrape_date, reasons FROM quarantine ORDER BY asin, scrape_date", conn)
+    conn.close()
+    return frames, quarantined
+
+
+def test_chunked_cleaning_matches_data_cleaning(workdir):
+    scrapes = list(weekly_scrapes("2026-03-02", 2, seed=5))
+    # a listing whose first copy is rejected and second is valid, and one the other way round
+    copies = scrapes[0].index[scrapes[0]['asin'].duplicated(keep=False)]
+    rescued, broken = scrapes[0].loc[copies, 'asin'].unique()[:2]
+    for raw in scrapes:
+        raw.loc[raw.index[raw['asin'] == rescued][0], 'extracted_price'] = -1
+        raw.loc[raw.index[raw['asin'] == broken][-1], 'extracted_price'] = -1
+
+    single, single_quarantine = clean_weeks(workdir / "single", scrapes, F.data_cleaning)
+    # small chunks, so the copies of a listing land in different chunks
+    chunked, chunked_quarantine = clean_weeks(
+        workdir / "chunked", scrapes, lambda path: F.data_cleaning_chunked(path, chunksize=37, workers=2))
+
+    assert {rescued, broken} <= set(single[0]['asin'])
+    assert {rescued, broken} <= set(single_quarantine['asin'])
+    assert 0 < len(single[1]) < len(single[0])  # the second week only carries the changed listings
+    for single_week, chunked_week in zip(single, chunked):
+        pd.testing.assert_frame_equal(single_week, chunked_week, check_dtype=False)
+    pd.testing.assert_frame_equal(single_quarantine, chunked_quarantine)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+import Functions as F
+from conftest import SAMPLE_SCRAPE, run_week, weekly_scrapes
+
+
+def flat_then_drop(weeks=8, drop=0.7):
+    """`weeks` identical weekly scrapes except one listing whose price drops by 30% on the last"""
+    raw = pd.read_csv(SAMPLE_SCRAPE)
+    asin = raw['asin'].dropna().iloc[0]
+    for week in range(weeks):
+        raw = raw.copy()
+        raw['scrape_date'] = (pd.Timestamp("2026-03-02") + pd.Timedelta(weeks=week)).strftime('%Y-%m-%d')
+        if week == weeks - 1:
+            raw.loc[raw['asin'] == asin, 'extracted_price'] = (raw.loc[raw['asin'] == asin, 'extracted_price'] * drop).round(2)
+        yield asin, raw
+
+
+def test_signals_see_weeks_skipped_as_unchanged(workdir):
+    for asin, raw in flat_then_drop():
+        run_week(raw)
+    stored = F.fetch_listing_history([asin]).sort_values('scrape_date')
+    assert len(stored) == 2  # the first week and the drop; the six flat weeks are seen-again markers
+
+    flat, dropped = stored['extracted_price'].tolist()
+    last = stored.iloc[-1]
+    assert last['rolling_mean'] == flat and last['rolling_std'] == 0
+    assert last['below_rolling_mean'] == 'Yes' and last['all_time_low'] == 'Yes' and last['is_deal'] == 'Yes'
+    assert last['previous_price'] == flat and last['previous_scrape_date'] == "2026-03-02"
+    weekly = [flat] * 7 + [dropped]
+    assert np.isclose(last['price_stability'], np.std(weekly, ddof=1))
+    assert stored['price_stability'].nunique() == 1  # older rows of the listing get the refreshed stability
+
+
+def history(prices, brand='Acme', start="2026-03-02"):
+    """One row per weekly scrape for each ASIN in `prices` ({asin: [price, ...]})"""
+    rows = []
+    for asin, series in prices.items():
+        for week, price in enumerate(series):
+            rows.append({'asin': asin, 'brand': brand, 'extracted_price': float(price), 'buy_now': 'No',
+                         'scrape_date': pd.Timestamp(start) + pd.Timedelta(weeks=week)})
+    df = pd.DataFrame(rows)
+    previous = df.groupby('asin')['extracted_price'].shift(1)
+    df['price_change_percent'] = ((df['extracted_price'] - previous) / previous * 100).fillna(0)
+    return df
+
+
+def test_all_time_low():
+    out = F.add_deal_signals(history({'A': [100, 120, 90, 95, 90], 'B': [100, 90]}))
+    assert out[out['asin'] == 'A']['all_time_low'].tolist() == ['No', 'No', 'Yes', 'No', 'Yes']
+    assert out[out['asin'] == 'B']['all_time_low'].tolist() == ['No', 'Yes']
+
+
+def test_window_covers_the_scrapes_before_the_current_one():
+    out = F.add_deal_signals(history({'A': [10, 100, 100, 100, 100, 90]}), window_weeks=4)
+    assert np.isnan(out['rolling_mean'].iloc[0])
+    assert out['rolling_mean'].iloc[1] == 10  # only the scrape before it
+    last = out.iloc[-1]
+    assert last['rolling_mean'] == 100 and last['rolling_std'] == 0  # the 10 is five scrapes back, the 90 is excluded
+    assert last['below_rolling_mean'] == 'Yes' and last['is_deal'] == 'Yes'
+    assert (out['below_rolling_mean'].iloc[:-1] == 'No').all()
+
+
+def test_brand_top_drop():
+    df = pd.concat([history({'A': [100, 90], 'B': [100, 80], 'C': [100, 100]}, brand='Acme'),
+                    history({'D': [100, 95]}, brand='Other')], ignore_index=True)
+    out = F.add_deal_signals(df).set_index(['asin', 'scrape_date'])
+    second = pd.Timestamp("2026-03-09")
+    assert {asin: out.loc[(asin, second), 'brand_top_drop'] for asin in 'ABCD'} == {'A': 'No', 'B': 'Yes', 'C': 'No', 'D': 'Yes'}
+    assert (out.xs(pd.Timestamp("2026-03-02"), level='scrape_date')['brand_top_drop'] == 'No').all()
+
+
+def test_only_changed_asins_are_recomputed():
+    df = history({'A': [100, 100, 100, 100, 50], 'B': [100, 100, 100, 100, 50]})
+    full = F.add_deal_signals(df)
+    stale = full.assign(rolling_mean=-1.0, below_rolling_mean='No')
+    out = F.add_deal_signals(stale, changed_asins=['A'])
+    pd.testing.assert_frame_equal(out[out['asin'] == 'A'], full[full['asin'] == 'A'])
+    kept = out[out['asin'] == 'B']
+    assert (kept['rolling_mean'] == -1).all() and (kept['below_rolling_mean'] == 'No').all()
+    assert kept['all_time_low'].tolist() == full[full['asin'] == 'B']['all_time_low'].tolist()
+    assert kept['is_deal'].iloc[-1] == 'Yes'  # is_deal follows the other signals, which it always re-reads
+
+
+def test_top_deals_are_latest_rows(workdir):
+    for raw in weekly_scrapes("2026-03-02", 4, seed=6):
+        run_week(raw)
+    deals = F.fetch_top_deals(limit=50)
+    assert len(deals) and not deals['asin'].duplicated().any()
+    latest = F.fetch_latest_listings().set_index('asin')['scrape_date']
+    assert (deals['scrape_date'] == deals['asin'].map(latest)).all()
+    assert (deals['is_deal'] == 'Yes').all()
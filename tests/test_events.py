@@ -0,0 +1,43 @@
+import pandas as pd
+
+import Functions as F
+from conftest import run_week, weekly_scrapes
+
+
+def test_events_of_weekly_scrapes(workdir):
+    scrapes = list(weekly_scrapes("2026-03-02", 4, seed=1))
+    asins = scrapes[0]['asin'].dropna().unique()
+    imputed, gone = asins[0], asins[1:4]
+    for week, raw in enumerate(scrapes):
+        raw = raw.copy()
+        if week == 1:
+            raw.loc[raw['asin'] == imputed, 'rating'] = None  # filled in by fill_missing
+        if week in (1, 2, 3):
+            raw.loc[raw['asin'] == imputed, 'extracted_price'] += week  # stored every week
+        if week >= 2:
+            raw.loc[raw['asin'] == imputed, 'rating'] = 4.0 if week == 2 else 3.5
+        if week == 3:
+            raw = raw[~raw['asin'].isin(gone)]
+        run_week(raw)
+    run_week(scrapes[-1][~scrapes[-1]['asin'].isin(gone)])  # merging the same scrape again adds nothing
+
+    events = F.read_events(limit=100000)
+    assert events['seq'].is_monotonic_increasing
+    assert events['seq'].tolist() == list(range(1, len(events) + 1))
+    assert not events.duplicated(['kind', 'asin', 'scrape_date']).any()
+    assert (events[events['kind'] == 'new_listing']['scrape_date'] == '2026-03-02').all()
+    assert sorted(events[events['kind'] == 'delisted']['asin']) == sorted(gone)
+
+    ratings = events[(events['kind'] == 'rating_change') & (events['asin'] == imputed)]
+    # week 1 was imputed, so neither week 1 nor week 2 compares against it
+    assert ratings[['scrape_date', 'old_value', 'new_value']].values.tolist() == [['2026-03-23', 4.0, 3.5]]
+
+    stored = F.fetch_listing_history([imputed]).sort_values('scrape_date')
+    assert stored['rating_imputed'].tolist() == ['No', 'Yes', 'No', 'No']
+
+
+def test_event_cursor_never_moves_back(two_weeks):
+    first = F.tail_events('mailer', limit=3)
+    F.commit_events('mailer', first['seq'].max())
+    F.commit_events('mailer', 1)
+    assert F.tail_events('mailer', limit=1)['seq'].tolist() == [first['seq'].max() + 1]
@@ -0,0 +1,68 @@
+import io
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Functions as F
+
+
+def listings():
+    conn = sqlite3.connect("laptop_prices.db")
+    df = pd.read_sql_query("SELECT * FROM laptops", conn)
+    conn.close()
+    df['scrape_date'] = pd.to_datetime(df['scrape_date'])
+    return df.drop_duplicates('asin', keep='last').head(40)
+
+
+@pytest.mark.parametrize("fmt", list(F.EXPORT_FORMATS.values()))
+@pytest.mark.parametrize("include_history", [False, True])
+def test_export_returns_bytes_streamlit_accepts(two_weeks, fmt, include_history):
+    download_data_util = pytest.importorskip("streamlit.runtime.download_data_util")
+    extension, mime = fmt
+    data = F.export_listings(listings(), fmt=extension, include_history=include_history)
+    assert isinstance(data, bytes) and data
+    converted, _ = download_data_util.convert_data_to_bytes_and_infer_mime(data, unsupported_error=TypeError())
+    assert converted == data
+
+
+@pytest.mark.parametrize("extension", ["csv", "parquet"])
+def test_history_export_keeps_listings(two_weeks, extension):
+    df = listings()
+    data = F.export_listings(df, fmt=extension, include_history=True)
+    out = pd.read_parquet(io.BytesIO(data)) if extension == "parquet" else pd.read_csv(io.BytesIO(data))
+    listed = out[out['granularity'] == 'listing']
+    assert sorted(listed['asin']) == sorted(df['asin'])
+    history = out[out['granularity'] != 'listing']
+    assert set(history['asin']) == set(df['asin'])
+    assert history['title'].notna().all()
+
+
+@pytest.mark.parametrize("extension", ["csv", "csv.gz", "parquet"])
+def test_chunked_writes_equal_one_frame(two_weeks, extension):
+    if extension == "parquet":
+        pytest.importorskip("pyarrow")
+    df = listings()
+    df['fair_price'] = np.nan  # all-null in the first chunk, filled later on
+    df.loc[df.index[-3:], 'fair_price'] = 999.0
+    df['note'] = None
+    df.loc[df.index[-1], 'note'] = 'late value'
+
+    def read(data):
+        if extension == "parquet":
+            return pd.read_parquet(io.BytesIO(data))
+        return pd.read_csv(io.BytesIO(data), compression='gzip' if extension == "csv.gz" else None)
+
+    whole, chunked = io.BytesIO(), io.BytesIO()
+    F.write_chunks([df], whole, fmt=extension)
+    F.write_chunks(F.iter_frame_chunks(df, chunksize=7), chunked, fmt=extension)
+    assert len(list(F.iter_frame_chunks(df, chunksize=7))) == 6
+    pd.testing.assert_frame_equal(read(chunked.getvalue()), read(whole.getvalue()))
+    assert read(chunked.getvalue())['note'].iloc[-1] == 'late value'
+
+    # the history export gives the same rows whatever its chunk size
+    small = pd.concat(F.iter_listings_with_history(df, chunksize=5), ignore_index=True)
+    large = pd.concat(F.iter_listings_with_history(df, chunksize=10000), ignore_index=True)
+    pd.testing.assert_frame_equal(small, large)
+    assert len(small) == len(df) + len(F.fetch_listing_history(df['asin']))
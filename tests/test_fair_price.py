@@ -0,0 +1,17 @@
+import os
+
+import pytest
+
+import Functions as F
+
+pytest.importorskip("sklearn")
+
+
+def test_old_model_artifacts_are_pruned(two_weeks):
+    artifacts = []
+    for _ in range(F.MODEL_KEEP + 2):
+        F.bump_data_version()
+        artifacts.append(os.path.basename(F.train_fair_price_model()))
+    kept = sorted(name for name in os.listdir(F.MODEL_DIR) if name.endswith(".joblib"))
+    assert kept == artifacts[-F.MODEL_KEEP:]
+    F.score_fair_prices()
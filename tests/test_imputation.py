@@ -0,0 +1,53 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Functions as F
+
+
+def batch(rows, scrape_date):
+    df = pd.DataFrame(rows, columns=['title', 'ram', 'disk_size', 'extracted_price', 'rating'])
+    return df.assign(reviews=100.0, delivery=None, scrape_date=pd.Timestamp(scrape_date))
+
+
+def stats_table():
+    conn = sqlite3.connect("laptop_prices.db")
+    stats = pd.read_sql_query("SELECT * FROM imputation_stats ORDER BY level, group_key, column_name", conn)
+    conn.close()
+    return stats
+
+
+def test_fill_missing_uses_the_closest_group_with_enough_history(workdir):
+    first = batch([
+        ('Dell XPS 15', '16 GB', '512 GB', 1000.0, 4.0),
+        ('Dell XPS 15', '16 GB', '512 GB', 1100.0, 4.2),
+        ('Dell XPS 15', '16 GB', '512 GB', 1200.0, None),
+        ('Dell XPS 15', '16 GB', '1 TB', 2000.0, 4.4),
+        ('Dell Vostro', '32 GB', '512 GB', 600.0, 3.0),
+        ('Acer Aspire 5', '8 GB', '256 GB', 300.0, 4.0),
+        ('Acer Aspire 5', '8 GB', '256 GB', 500.0, 4.0),
+        ('Dell XPS 15', '16 GB', '512 GB', None, 4.0),  # its own group has 3 prices
+        ('Dell XPS 15', '16 GB', '1 TB', None, 4.0),    # 1 price in its group: brand + RAM
+        ('Dell Inspiron', '8 GB', '256 GB', None, 4.0),  # no Dell with 8 GB: brand
+        ('Acer Aspire 5', '8 GB', '256 GB', None, 4.0),  # 2 Acer prices only: global
+    ], '2026-03-02')
+    filled = F.fill_missing(first.copy())
+    np.testing.assert_allclose(filled['extracted_price'].iloc[-4:], [1100, 1325, 1180, 6700 / 7])
+    assert filled['rating'][2] == pytest.approx((4.0 + 4.2 + 4.0) / 3)  # the ratings of its own group
+    assert filled['rating_imputed'].tolist() == ['No', 'No', 'Yes'] + ['No'] * 8
+    assert (filled['delivery'] == "Info not available").all()
+
+    # the same scrape again adds nothing to the persisted statistics
+    stats = stats_table()
+    F.fill_missing(first.copy())
+    pd.testing.assert_frame_equal(stats, stats_table())
+
+    # a later scrape builds on the stored history: Acer now has 3 prices of its own
+    second = batch([
+        ('Acer Aspire 5', '8 GB', '256 GB', 700.0, 4.0),
+        ('Acer Aspire 5', '8 GB', '256 GB', None, 4.0),
+    ], '2026-03-09')
+    filled = F.fill_missing(second)
+    assert filled['extracted_price'].tolist() == [700.0, 500.0]
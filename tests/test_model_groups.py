@@ -0,0 +1,48 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+import Functions as F
+
+
+def test_connected_components():
+    labels = F._connected_components(6, np.array([0, 3, 4]), np.array([1, 4, 5]))
+    assert labels[0] == labels[1] and labels[3] == labels[4] == labels[5]
+    assert len(set(labels.tolist())) == 3
+
+
+def test_spec_keys_ignore_unknown_fields_but_compare_title_tokens():
+    df = pd.DataFrame({
+        'title': ['KAIGERR Gaming Laptop, 24GB DDR5 512GB SSD', 'KAIGERR Gaming Laptop, 16GB DDR5 512GB SSD',
+                  'KAIGERR Gaming Laptop, 16 GB DDR5 512GB SSD'],
+        'ram': ['Info not available'] * 3,
+        'disk_size': ['512 GB'] * 3,
+        'display_size': ['16 Inches'] * 3,
+    })
+    keys = F._spec_keys(df)
+    assert keys[0] != keys[1]
+    assert keys[1] == keys[2]
+    assert '|?|' in keys[0]
+
+
+def test_variants_with_different_specs_are_not_grouped(two_weeks):
+    groups = F.fetch_model_groups()
+    for a, b in [('B0GSK32B5B', 'B0GTMHHT57'),   # KAIGERR 24 GB vs 16 GB
+                 ('B0DZZWMB2L', 'B0FF5FQK8V')]:  # ROG Strix G16 RTX 5060 vs RTX 5050
+        assert groups[a] != groups[b]
+
+
+def test_legacy_spec_keys_are_regrouped(two_weeks):
+    conn = sqlite3.connect("laptop_prices.db")
+    conn.execute("UPDATE model_groups SET model_group_id = 'MG-legacy', spec_key = 'Brand|16 GB|512 GB|16 Inches'")
+    conn.commit()
+    conn.close()
+    batch = pd.read_csv("cleaned_Data.csv").head(5)
+    F.assign_model_groups(batch)
+    groups = F.fetch_model_groups()
+    assert 'MG-legacy' not in set(groups)
+    conn = sqlite3.connect("laptop_prices.db")
+    catalogue = {row[0] for row in conn.execute("SELECT asin FROM laptops")}
+    conn.close()
+    assert catalogue <= set(groups.index)
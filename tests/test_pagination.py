@@ -0,0 +1,61 @@
+import os
+import re
+import sqlite3
+from collections import Counter
+
+import pytest
+
+import Functions as F
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from conftest import ROOT  # noqa: E402
+from app_pages.laptop_details import CARDS_PER_PAGE  # noqa: E402
+
+
+def card_links(at):
+    return [re.search(r'href="([^"]+)"', m.value).group(1) for m in at.markdown if 'class="laptop-card"' in m.value]
+
+
+def view_entries(at, name):
+    return [key for key in at.session_state['_view_cache'] if key[0] == name]
+
+
+def test_cards_are_paged_and_views_memoized(two_weeks):
+    F.publish_snapshot()
+    conn = sqlite3.connect("laptop_prices.db")
+    # what the page's default filters pass: its price slider spans int(min price) to int(max price)
+    rows = Counter(link for (link,) in conn.execute("""
+        SELECT link_clean FROM laptops WHERE rating >= 0
+          AND extracted_price BETWEEN CAST((SELECT MIN(extracted_price) FROM laptops) AS INTEGER)
+                                  AND CAST((SELECT MAX(extracted_price) FROM laptops) AS INTEGER)"""))
+    conn.close()
+    pages = (sum(rows.values()) - 1) // CARDS_PER_PAGE + 1
+    assert pages > 2
+
+    at = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=60)
+    at.run()
+    at.sidebar.selectbox[0].select("💻 Laptop Details").run()
+    assert not at.exception
+    assert at.number_input[0].label == f"Page (of {pages})"
+    first = card_links(at)
+    assert len(first) == CARDS_PER_PAGE
+
+    # every row of the view shows up on exactly one page
+    shown = Counter(first)
+    for page in range(2, pages + 1):
+        at.number_input[0].set_value(page).run()
+        shown.update(card_links(at))
+    assert shown == rows
+    assert len(view_entries(at, 'details_filter')) == 1  # paging recomputes no view
+
+    # a new sort reuses the memoized filter, and the pager starts again at page 1
+    sort = next(box for box in at.selectbox if box.label == "Sort by:")
+    sort.select("Price (Low to High)").run()
+    assert len(view_entries(at, 'details_filter')) == 1
+    assert len(view_entries(at, 'details_sort')) == 2
+    assert at.number_input[0].value == 1
+    prices = [float(m) for m in re.findall(r'class="price-tag">\$([\d.]+)<', "".join(
+        m.value for m in at.markdown if 'class="laptop-card"' in m.value))]
+    assert prices == sorted(prices) and len(prices) == CARDS_PER_PAGE
@@ -0,0 +1,70 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+import Functions as F
+import api
+
+
+def current_table(db_path):
+    conn = F.connect_readonly(db_path, immutable=False)
+    df = pd.read_sql_query("SELECT * FROM laptops", conn)
+    conn.close()
+    return df
+
+
+def latest_of(df):
+    return df.sort_values('scrape_date').drop_duplicates('asin', keep='last').set_index('asin')['scrape_date'].sort_index()
+
+
+def test_latest_rows_stay_in_current_table(partitioned):
+    conn = sqlite3.connect("laptop_prices.db")
+    partitions = conn.execute("SELECT name, rows FROM partitions").fetchall()
+    conn.close()
+    assert len(partitions) >= 2 and all(rows for _, rows in partitions)
+
+    latest = F.fetch_latest_listings()
+    live = current_table("laptop_prices.db")
+    assert live['asin'].nunique() == latest['asin'].nunique() > 1
+    assert latest_of(live).equals(latest_of(latest))
+    # unchanged listings keep an old row as their latest one
+    assert live['scrape_date'].min() < "2026-03-01"
+    history = F.fetch_listing_history(latest['asin'])
+    assert not history.duplicated(['asin', 'scrape_date']).any()
+
+
+def test_readers_see_every_listing_after_partitioning(partitioned):
+    expected = F.fetch_latest_listings()['asin'].nunique()
+    snapshot = F.publish_snapshot()
+    for db_path in ("laptop_prices.db", snapshot):
+        assert current_table(db_path)['asin'].nunique() == expected
+        conn = F.connect_readonly(db_path, immutable=False)
+        conn.row_factory = sqlite3.Row
+        F.attach_partitions(conn)
+        assert api.query_aggregates(conn)['totals']['laptops'] == expected
+        assert api.query_listings(conn, {'limit': ['200']})['total'] == expected
+        conn.close()
+
+
+def test_partitions_written_before_the_fix_are_repaired(partitioned):
+    conn = sqlite3.connect("laptop_prices.db")
+    name, path, start, end = conn.execute("SELECT name, path, start_date, end_date FROM partitions").fetchone()
+    columns = [row[1] for row in conn.execute('PRAGMA table_info("laptops")')]
+    column_list = ", ".join(f'"{col}"' for col in columns)
+    where = "scrape_date >= ? AND scrape_date < ?"
+    assert conn.execute(f"SELECT COUNT(*) FROM laptops WHERE {where}", (start, end)).fetchone()[0]
+    # the old behaviour: the whole month, latest rows included, moved into the partition
+    F._rewrite_partition(conn, name, path, start, end, "laptops", columns, fill=(
+        f"INSERT OR REPLACE INTO staging.laptops ({column_list}) SELECT {column_list} FROM main.laptops WHERE {where}",
+        (start, end)))
+    conn.execute(f"DELETE FROM laptops WHERE {where}", (start, end))
+    conn.commit()
+    conn.close()
+    assert current_table("laptop_prices.db")['asin'].nunique() < F.fetch_latest_listings()['asin'].nunique()
+
+    F.partition_history()
+    latest = F.fetch_latest_listings()
+    assert latest_of(current_table("laptop_prices.db")).equals(latest_of(latest))
+    assert not F.fetch_listing_history(latest['asin']).duplicated(['asin', 'scrape_date']).any()
+    assert os.stat(path).st_mode & 0o222 == 0
@@ -0,0 +1,68 @@
+import json
+import logging
+import os
+from logging.handlers import RotatingFileHandler
+
+import pytest
+
+import Functions as F
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from conftest import ROOT  # noqa: E402
+from app_pages import perf  # noqa: E402
+
+
+@pytest.fixture
+def perf_log(two_weeks, monkeypatch):
+    """A fresh rolling log in the test directory, small enough to roll over"""
+    def close_files():  # a file opened in another test's directory
+        for handler in list(logger.handlers):
+            if isinstance(handler, RotatingFileHandler):
+                logger.removeHandler(handler)
+                handler.close()
+
+    logger = logging.getLogger("laptop_scout.perf")
+    close_files()
+    monkeypatch.setattr(perf, "PERF_LOG_BYTES", 1500)
+    yield os.path.join(two_weeks, perf.PERF_LOG_PATH)
+    close_files()
+
+
+def records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_panel_and_log_report_each_rerun(perf_log):
+    F.publish_snapshot()
+    at = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=60)
+    at.run()
+    assert not at.exception
+    first = records(perf_log)[-1]
+    assert first['page'] == "🏠 Dashboard" and first['total_ms'] > 0 and first['rows'] > 0
+    assert first['cache']['load_data'] == {'hits': 0, 'misses': 1}
+    sections = [entry['section'] for entry in first['sections']]
+    assert "load_data: query" in sections and "page: 🏠 Dashboard" in sections
+    # nested sections follow the one they run in
+    assert sections.index("load_data()") < sections.index("load_data: query")
+    assert 'df_memory_mb' not in first and not at.sidebar.expander  # no panel unless asked for
+
+    at.sidebar.checkbox(key='perf_debug').check().run()
+    second = records(perf_log)[-1]
+    assert second['cache']['load_data'] == {'hits': 1, 'misses': 0}
+    assert "load_data: query" not in [entry['section'] for entry in second['sections']]
+    assert second['df_memory_mb'] > 0
+    panel = at.sidebar.expander[0]
+    assert panel.label == "⏱️ This rerun"
+    assert panel.metric[0].label == "Total rerun"
+    captions = [caption.value for caption in panel.caption]
+    assert "load_data: 1 hit / 0 miss" in captions
+    assert any(caption.startswith("page: 🏠 Dashboard: ") for caption in captions)
+
+    # the log rolls over instead of growing without bound
+    for _ in range(5):
+        at.run()
+    assert os.path.exists(perf_log + ".1")
+    assert os.path.getsize(perf_log) <= perf.PERF_LOG_BYTES
@@ -0,0 +1,66 @@
+import functools
+import io
+import sqlite3
+import threading
+import time
+
+from PIL import Image
+
+import Functions as F
+import pipeline
+
+
+def test_database_writers_run_one_at_a_time(workdir, monkeypatch):
+    writers = ['watches', 'similar', 'fair_price', 'retention']
+    active, overlaps, lock = [0], [], threading.Lock()
+
+    def fake_run(results):
+        with lock:
+            active[0] += 1
+            overlaps.append(active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    for name in writers:
+        assert pipeline.STAGE_BY_NAME[name].writes_db
+        monkeypatch.setattr(pipeline.STAGE_BY_NAME[name], 'run', fake_run)
+    assert pipeline.run_pipeline(writers, force=True, workers=4)
+    assert len(overlaps) == len(writers) and max(overlaps) == 1
+
+
+def test_second_run_skips_unchanged_stages(workdir, monkeypatch):
+    calls = []
+    monkeypatch.setattr(pipeline.STAGE_BY_NAME['similar'], 'run', lambda results: calls.append('similar'))
+    monkeypatch.setattr(pipeline.STAGE_BY_NAME['similar'], 'outputs', [])
+    assert pipeline.run_pipeline(['similar'])
+    assert pipeline.run_pipeline(['similar'])
+    assert calls == ['similar']
+
+
+def test_thumbnail_fetches_overlap_database_writers(two_weeks, monkeypatch):
+    fetching = threading.Event()
+    image = io.BytesIO()
+    Image.new('RGB', (400, 300), 'white').save(image, format='PNG')
+
+    def fetcher(url):
+        fetching.set()
+        return image.getvalue()
+
+    def writer(results):
+        # holds the database lock until a thumbnail is being fetched, which deadlocks if the fetches need it too
+        assert fetching.wait(10)
+
+    monkeypatch.setattr(pipeline.STAGE_BY_NAME['similar'], 'run', writer)
+    monkeypatch.setattr(F, 'cache_thumbnails', functools.partial(F.cache_thumbnails, fetcher=fetcher))
+    assert pipeline.run_pipeline(['similar', 'thumbnails'], force=True, workers=2)
+    conn = sqlite3.connect("laptop_prices.db")
+    assert conn.execute("SELECT COUNT(*) FROM thumbnails").fetchone()[0]
+    conn.close()
+
+
+def test_run_all_runs_the_stage_graph(workdir, monkeypatch):
+    calls = []
+    monkeypatch.setattr(pipeline, 'run_pipeline', lambda *args, **kwargs: calls.append((args, kwargs)) or True)
+    assert F.run_all()
+    assert calls == [((), {})]
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("plotly")
+from app_pages import price_insights as P  # noqa: E402
+
+
+def listings(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'extracted_price': rng.uniform(200, 3000, rows).round(2),
+        'rating': rng.uniform(1, 5, rows).round(1),
+        'reviews': rng.integers(0, 5000, rows).astype(float),
+        'buy_now': rng.choice(['Yes', 'No'], rows),
+        'brand': rng.choice(['Dell', 'HP', 'Lenovo'], rows),
+        'title': 'Laptop',
+    })
+
+
+def trace_types(fig):
+    return {trace.type for trace in fig.data}
+
+
+# below WEBGL_CHART_ROWS plotly's own render_mode='auto' picks WebGL past 1000 points
+@pytest.mark.parametrize('rows, scatter, box, histogram', [
+    (500, {'scatter'}, 'points', 'histogram'),
+    (P.WEBGL_CHART_ROWS, {'scattergl'}, 'points', 'histogram'),
+    (P.WEBGL_CHART_ROWS + 1, {'scattergl'}, 'stats', 'histogram'),
+    (P.BINNED_CHART_ROWS, {'scattergl'}, 'stats', 'histogram'),
+    (P.BINNED_CHART_ROWS + 1, {'heatmap'}, 'stats', 'bar'),
+])
+def test_charts_switch_representation_at_the_row_thresholds(rows, scatter, box, histogram):
+    df = listings(rows)
+    assert trace_types(P.price_vs_rating(df)) == scatter
+    assert trace_types(P.rating_vs_reviews(df)) == scatter
+
+    boxes = P.box_chart(df, 'buy_now', 'extracted_price', 'Price', {'Yes': '#10b981', 'No': '#f59e0b'})
+    assert trace_types(boxes) == {'box'}
+    assert all((trace.q1 is None) == (box == 'points') for trace in boxes.data)
+    if box == 'stats':
+        # only the summary travels to the browser, and it is the one plotly would draw from the points
+        for trace in boxes.data:
+            values = df.loc[df['buy_now'] == trace.x[0], 'extracted_price']
+            assert trace.y is None
+            np.testing.assert_allclose([trace.q1[0], trace.median[0], trace.q3[0]], values.quantile([0.25, 0.5, 0.75]))
+            assert values.min() <= trace.lowerfence[0] <= trace.q1[0] <= trace.q3[0] <= trace.upperfence[0] <= values.max()
+
+    prices = P.price_histogram(df)
+    assert trace_types(prices) == {histogram}
+    if histogram == 'bar':
+        assert sum(prices.data[0].y) == rows and len(prices.data[0].x) == 30
+
+
+def test_binned_scatter_keeps_every_row_in_a_fixed_grid():
+    df = listings(P.BINNED_CHART_ROWS + 1)
+    df.loc[:9, 'rating'] = np.nan
+    heatmap = P.rating_vs_reviews(df).data[0]
+    z = np.asarray(heatmap.z, dtype=float)
+    assert z.shape == (P.DENSITY_BINS, P.DENSITY_BINS)
+    assert np.nansum(z) == len(df) - 10  # rows missing a coordinate are left out
+    assert np.isnan(z).any() and not (z == 0).any()  # empty cells stay blank
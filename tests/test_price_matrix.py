@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+import Functions as F
+from conftest import run_week, weekly_scrapes
+
+
+def random_prices(seed=0, shape=(40, 30)):
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(200, 2000, shape).round(2)
+    values[rng.random(shape) < 0.3] = np.nan
+    values[:5] = 999.99  # flat listings
+    values[5, :] = np.nan
+    return values
+
+
+def test_rolling_stats_match_pandas():
+    values = random_prices()
+    mean, std = F.matrix_rolling_stats(values, window=4)
+    frame = pd.DataFrame(values.T)
+    np.testing.assert_allclose(mean, frame.rolling(4, min_periods=1).mean().T.to_numpy(), rtol=1e-10)
+    np.testing.assert_allclose(std, frame.rolling(4, min_periods=2).std().T.to_numpy(), rtol=1e-8, atol=1e-9)
+    # a flat window is exactly its price, with no spread
+    assert (mean[:5] == 999.99).all() and (std[:5, 1:] == 0).all()
+
+
+def test_price_drops_and_stability_match_pandas():
+    values = random_prices(seed=1)
+    previous, change, dropped = F.matrix_price_drops(values)
+    expected = pd.DataFrame(values).ffill(axis=1).shift(1, axis=1).to_numpy()
+    np.testing.assert_array_equal(previous, expected)
+    np.testing.assert_allclose(change, (values - expected) / expected * 100)
+    np.testing.assert_array_equal(dropped, np.nan_to_num(change, nan=0) < -5)
+    np.testing.assert_allclose(F.matrix_price_stability(values), pd.DataFrame(values).std(axis=1).to_numpy(),
+                               rtol=1e-10, atol=1e-9)
+
+
+def test_price_features_match_groupby(workdir):
+    for raw in weekly_scrapes("2026-01-05", 6, seed=2):
+        run_week(raw)
+    history = F.fetch_merged_data_from_sqlite()
+    history['scrape_date'] = pd.to_datetime(history['scrape_date'])
+    out = F.compute_price_features(history)
+
+    grouped = out.groupby('asin')
+    previous = grouped['extracted_price'].shift(1)
+    first = previous.isna()
+    np.testing.assert_allclose(out['previous_price'], previous.fillna(out['extracted_price']))
+    assert out['previous_scrape_date'].equals(grouped['scrape_date'].shift(1).fillna(out['scrape_date']))
+    percent = ((out['extracted_price'] - previous) / previous * 100).where(~first, 0)
+    np.testing.assert_allclose(out['price_change_percent'], percent)
+    assert (out['buy_now'] == np.where((percent < -5) & (out['rating'] > 3.2), 'Yes', 'No')).all()
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import Functions as F
+from conftest import run_week, weekly_scrapes
+
+pytest.importorskip("pyarrow")
+
+WEEKS = 31  # whole months past RAW_RETENTION_DAYS, so compaction and partitioning both happen
+DERIVED_ELSEWHERE = ['fair_price', 'value_score', 'value_label', 'fair_price_model']
+
+
+def snapshot_of_history():
+    history = F.fetch_merged_data_from_sqlite().drop(columns=DERIVED_ELSEWHERE, errors='ignore')
+    history = history.sort_values(['asin', 'scrape_date']).reset_index(drop=True).astype(str)
+    conn = sqlite3.connect("laptop_prices.db")
+    tables = {}
+    for name, columns in [('price_rollup_weekly', '*'), ('listing_seen', '*'), ('imputation_stats', '*'),
+                          ('model_groups', 'asin, model_group_id, spec_key, hex(signature)'),
+                          ('listing_fingerprints', '*')]:
+        table = pd.read_sql_query(f"SELECT {columns} FROM {name}", conn).astype(str)
+        tables[name] = table.sort_values(list(table.columns)).reset_index(drop=True)
+    tables['partitions'] = pd.read_sql_query(
+        "SELECT name, start_date, end_date, rows FROM partitions ORDER BY name", conn).astype(str)
+    conn.close()
+    return history, tables
+
+
+def test_full_replay_matches_weekly_runs(workdir):
+    for raw in weekly_scrapes("2025-06-02", WEEKS, seed=4):
+        raw.to_csv("amazon_scrape_data.csv", index=False)
+        F.archive_raw_snapshot("amazon_scrape_data.csv")
+        run_week(raw)
+        F.compact_history()
+        F.partition_history()
+    weekly_history, weekly_tables = snapshot_of_history()
+    assert len(weekly_tables['price_rollup_weekly']) and len(weekly_tables['partitions'])
+
+    F.enable_wal()
+    for suffix in ("-wal", "-shm"):  # sidecars left behind by a writer of the old file
+        open("laptop_prices.db" + suffix, "wb").close()
+    F.replay_history(workers=2)
+    replay_history, replay_tables = snapshot_of_history()
+
+    # the swap leaves no sidecars or staging files, and every registered partition is in place
+    assert not any(os.path.exists(path) for path in ["laptop_prices.db-wal", "laptop_prices.db-shm",
+                                                     "laptop_prices.db.replay", "partitions.replay"])
+    conn = sqlite3.connect("laptop_prices.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    paths = [row[0] for row in conn.execute("SELECT path FROM partitions")]
+    conn.close()
+    assert paths and all(os.path.dirname(path) == F.PARTITION_DIR and os.path.exists(path) for path in paths)
+    assert sorted(os.listdir(F.PARTITION_DIR)) == sorted(os.path.basename(path) for path in paths)
+
+    pd.testing.assert_frame_equal(weekly_history, replay_history)
+    for name, table in weekly_tables.items():
+        pd.testing.assert_frame_equal(table, replay_tables[name], obj=name)
+
+    # a partial replay keeps the rows outside its range and stores the same observations
+    dates = F.list_raw_snapshots()
+    F.replay_history(start=dates[-8], end=dates[-3], workers=2)
+    partial_history, _ = snapshot_of_history()
+    observed = ['asin', 'scrape_date', 'extracted_price', 'previous_price', 'price_difference']
+    pd.testing.assert_frame_equal(weekly_history[observed], partial_history[observed])
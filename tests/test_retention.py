@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+
+import Functions as F
+from conftest import run_week, weekly_scrapes
+
+FEATURES = ['previous_price', 'price_change_percent', 'rolling_mean', 'rolling_std', 'all_time_low',
+            'below_rolling_mean', 'is_deal', 'price_stability', 'stability_label']
+PRICES = [1000, 700, 1000, 1000, 900, 950, 800, 800, 760]  # the 700 is compacted long before the 800 arrives
+
+
+def history_with_a_rebound(weeks=len(PRICES)):
+    for week, raw in enumerate(weekly_scrapes("2026-01-05", weeks, seed=5)):
+        asin = raw['asin'].dropna().iloc[0]
+        raw.loc[raw['asin'] == asin, 'extracted_price'] = PRICES[week]
+        yield asin, raw
+
+
+def features(asin=None):
+    df = F.fetch_merged_data_from_sqlite()
+    if asin is not None:
+        df = df[df['asin'] == asin]
+    return df.sort_values(['asin', 'scrape_date']).set_index(['asin', 'scrape_date'])[FEATURES]
+
+
+def test_compaction_keeps_features(tmp_path, monkeypatch):
+    results = {}
+    for compacted in (False, True):
+        os.makedirs(tmp_path / str(compacted))
+        monkeypatch.chdir(tmp_path / str(compacted))
+        for asin, raw in history_with_a_rebound():
+            run_week(raw)
+            if compacted:
+                F.compact_history(keep_days=21)
+        results[compacted] = features()
+
+    kept, full = results[True], results[False]
+    assert len(kept) < len(full)
+    # rows still stored raw after compaction were computed with the compacted history taken into account
+    pd.testing.assert_frame_equal(kept, full.loc[kept.index])
+
+    rebound = kept.loc[asin]
+    assert rebound.loc['2026-02-16', 'all_time_low'] == 'No'  # 800 is above the compacted 700
+    assert rebound.loc['2026-03-02', 'all_time_low'] == 'No'
+
+
+def test_compaction_rolls_old_rows_up(workdir):
+    for asin, raw in history_with_a_rebound():
+        run_week(raw)
+    before = F.fetch_price_history([asin])
+    F.compact_history(keep_days=21)
+    after = F.fetch_price_history([asin])
+
+    assert set(after['granularity']) == {'raw', 'week'}
+    assert len(after) == len(before) and not after.duplicated(['asin', 'scrape_date']).any()
+    weekly = after[after['granularity'] == 'week']
+    assert weekly['min_price'].min() == 700 and (weekly['observations'] == 1).all()
+    raw = after[after['granularity'] == 'raw']
+    assert raw['scrape_date'].min() >= weekly['scrape_date'].max()
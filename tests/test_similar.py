@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import Functions as F
+
+
+def brute_force(index, asin):
+    """Distances to every cheaper listing, nearest first"""
+    i = index['position'][asin]
+    distance = np.linalg.norm(index['features'].astype(np.float64) - index['features'][i], axis=1)
+    cheaper = np.flatnonzero(index['prices'] < index['prices'][i])
+    order = cheaper[np.argsort(distance[cheaper], kind='stable')]
+    return pd.DataFrame({'asin': index['asins'][order], 'distance': distance[order]})
+
+
+def same_neighbours(found, expected):
+    """The first len(found) distances, and the same ASINs wherever the distance isn't tied with a neighbour's"""
+    k = len(found)
+    np.testing.assert_allclose(found['distance'], expected['distance'][:k], atol=1e-3)
+    gaps = np.diff(np.append(expected['distance'].to_numpy(), np.inf))
+    distinct = ((gaps > 1e-3) & (np.append(np.inf, gaps[:-1]) > 1e-3))[:k]
+    assert found['asin'].to_numpy()[distinct].tolist() == expected['asin'].to_numpy()[:k][distinct].tolist()
+
+
+def test_similar_laptops_match_brute_force(two_weeks):
+    path = F.build_similarity_index()
+    index = F.load_similarity_index(path, data_version=F.get_data_version())
+    latest = F.fetch_latest_listings()
+    assert sorted(index['asins']) == sorted(latest['asin'])
+    assert index['features'].dtype == np.float32
+
+    asins = index['asins'][:: max(len(index['asins']) // 25, 1)]
+    for asin in asins:
+        found = F.similar_laptops(asin, index, k=5)
+        assert len(found) == min(5, len(brute_force(index, asin)))
+        same_neighbours(found, brute_force(index, asin))
+        assert (found['extracted_price'] < index['prices'][index['position'][asin]]).all()
+    cheapest = index['asins'][np.argmin(index['prices'])]
+    assert F.similar_laptops(cheapest, index).empty
+    assert len(F.similar_laptops(cheapest, index, k=4, cheaper_only=False)) == 4
+
+    # the blocked batch mode stores the same neighbours
+    alternatives = F.build_cheaper_alternatives(k=3, block_size=50)
+    for asin in asins:
+        stored = alternatives[alternatives['asin'] == asin].sort_values('rank')
+        assert stored['rank'].tolist() == list(range(1, min(3, len(brute_force(index, asin))) + 1))
+        same_neighbours(stored[['alt_asin', 'distance']].set_axis(['asin', 'distance'], axis=1), brute_force(index, asin))
+
+
+def test_similarity_index_follows_the_data_version(two_weeks):
+    path = F.build_similarity_index()
+    built = os.path.getmtime(path)
+    version = F.get_data_version()
+    assert F.build_similarity_index() == path and os.path.getmtime(path) == built  # unchanged data: not rebuilt
+
+    F.bump_data_version()
+    assert F.load_similarity_index(path, data_version=F.get_data_version()) is None  # stale for the new version
+    F.build_similarity_index()
+    assert F.load_similarity_index(path, data_version=version) is None
+    assert F.load_similarity_index(path, data_version=F.get_data_version()) is not None
@@ -0,0 +1,66 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+import Functions as F
+
+
+def test_snapshot_readers_open_read_only(partitioned, monkeypatch):
+    snapshot = F.publish_snapshot()
+    opened = []
+    connect = sqlite3.connect
+
+    def recording_connect(database, *args, **kwargs):
+        opened.append(str(database))
+        return connect(database, *args, **kwargs)
+
+    monkeypatch.setattr(F.sqlite3, "connect", recording_connect)
+    version = F.get_data_version(db_path=snapshot)
+    assert version != "0"
+    assert not F.fetch_top_deals(db_path=snapshot).empty
+    F.load_thumbnail_uris(db_path=snapshot)
+    latest = F.fetch_latest_listings(db_path=snapshot)
+    assert not F.fetch_price_history(latest['asin'].head(5), db_path=snapshot).empty
+    assert opened and all(uri.startswith("file:") and "mode=ro&immutable=1" in uri for uri in opened)
+
+    attached = F.connect_partitioned(snapshot, readonly=True)
+    files = [row[2] for row in attached.execute("PRAGMA database_list") if row[1].startswith("part_")]
+    attached.close()
+    assert files and all(".parts" in path for path in files)
+
+
+def test_snapshot_partitions_are_frozen(partitioned):
+    snapshot = F.publish_snapshot()
+    history = F.fetch_merged_data_from_sqlite(db_path=snapshot)
+
+    # rewrite every live partition in place of the pipeline
+    conn = sqlite3.connect("laptop_prices.db")
+    columns = [row[1] for row in conn.execute('PRAGMA table_info("laptops")')]
+    for name, path, start, end in conn.execute("SELECT name, path, start_date, end_date FROM partitions").fetchall():
+        F._rewrite_partition(conn, name, path, start, end, "laptops", columns, remove=("DELETE FROM staging.laptops", ()))
+    conn.commit()
+    conn.close()
+
+    assert len(F.fetch_merged_data_from_sqlite()) < len(history)
+    assert len(F.fetch_merged_data_from_sqlite(db_path=snapshot)) == len(history)
+
+
+def test_pruned_snapshots_take_their_partitions(partitioned):
+    published = []
+    for _ in range(F.SNAPSHOT_KEEP + 1):
+        F.bump_data_version()
+        published.append(F.publish_snapshot())
+    assert not os.path.exists(published[0])
+    assert not os.path.exists(published[0][:-len(".db")] + ".parts")
+    assert os.path.isdir(published[-1][:-len(".db")] + ".parts")
+
+
+def test_similarity_index_is_only_loaded_for_its_version(two_weeks):
+    assert F.load_similarity_index(data_version=F.get_data_version()) is None
+    F.build_similarity_index()
+    index = F.load_similarity_index(data_version=F.get_data_version())
+    assert index is not None and len(index['asins'])
+    assert F.load_similarity_index(data_version="stale") is None
+    assert F.similar_laptops(index['asins'][0], None).empty
+    assert isinstance(F.similar_laptops(index['asins'][0], index, k=3), pd.DataFrame)
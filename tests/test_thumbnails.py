@@ -0,0 +1,47 @@
+import base64
+import collections
+import io
+import os
+import sqlite3
+
+from PIL import Image
+
+import Functions as F
+
+COLORS = ['red', 'green', 'blue']
+
+
+def stub_fetcher(calls):
+    """Local stand-in for fetch_image: an 800x600 PNG in one of three colours, picked by the URL"""
+    def fetch(url):
+        calls[url] += 1
+        out = io.BytesIO()
+        Image.new('RGB', (800, 600), COLORS[sum(map(ord, url)) % len(COLORS)]).save(out, format='PNG')
+        return out.getvalue()
+    return fetch
+
+
+def test_thumbnails_are_cached_once_by_content(two_weeks):
+    conn = sqlite3.connect("laptop_prices.db")
+    urls = {row[0] for row in conn.execute("SELECT thumbnail FROM laptops WHERE thumbnail LIKE 'http%'")}
+    conn.close()
+    calls = collections.Counter()
+
+    assert F.cache_thumbnails(fetcher=stub_fetcher(calls)) == len(urls)
+    assert set(calls) == urls and set(calls.values()) == {1}  # every URL once, though listed on several rows
+    assert F.cache_thumbnails(fetcher=stub_fetcher(calls)) == 0  # nothing left to fetch
+    assert set(calls.values()) == {1}
+
+    files = [os.path.join(root, name) for root, _, names in os.walk(F.THUMB_CACHE_DIR) for name in names]
+    assert len(files) == len(COLORS)  # identical images are stored once, under their content hash
+    for path in files:
+        with Image.open(path) as image:
+            assert image.size == F.THUMB_SIZE and image.format == 'JPEG'
+
+    uris = F.load_thumbnail_uris()
+    assert set(uris) == urls
+    conn = sqlite3.connect("laptop_prices.db")
+    for url, path in conn.execute("SELECT url, path FROM thumbnails"):
+        with open(path, "rb") as f:
+            assert uris[url] == "data:image/jpeg;base64," + base64.b64encode(f.read()).decode()
+    conn.close()
@@ -0,0 +1,90 @@
+import ast
+import sqlite3
+
+import pandas as pd
+
+import Functions as F
+from conftest import SAMPLE_SCRAPE
+
+BROKEN = {  # one broken value per rule, each on its own valid sample row
+    'asin_format': ('asin', 'not-an-asin'),
+    'title_present': ('title', '   '),
+    'price_positive': ('extracted_price', 0),
+    'rating_range': ('rating', 7.5),
+    'reviews_non_negative': ('reviews', -3),
+    'scrape_date_valid': ('scrape_date', '20/04/2026'),
+    'specs_format': ('specs', 'display_size: 15.6 inches'),
+}
+
+
+def broken_scrape():
+    raw = pd.read_csv(SAMPLE_SCRAPE)
+    valid, _, _ = F.validate_batch(raw[F.RAW_COLUMNS])
+    once = valid[~raw.loc[valid.index, 'asin'].duplicated(keep=False)]  # no valid copy elsewhere in the scrape
+    rows = once.index[:len(BROKEN) + 1]
+    raw[['rating', 'reviews', 'extracted_price']] = raw[['rating', 'reviews', 'extracted_price']].astype(object)
+    for row, (column, value) in zip(rows, BROKEN.values()):
+        raw.loc[row, column] = value
+    raw.loc[rows[-1], ['rating', 'reviews']] = [-1, -1]  # two failures on one row
+    return raw, rows
+
+
+def test_every_rule_quarantines_its_rows(workdir):
+    raw, rows = broken_scrape()
+    _, sample_rejected, sample_failures = F.validate_batch(pd.read_csv(SAMPLE_SCRAPE)[F.RAW_COLUMNS])
+
+    valid, rejected, failures = F.validate_batch(raw[F.RAW_COLUMNS])
+    assert set(rows) <= set(rejected.index) and not set(rows) & set(valid.index)
+    assert len(valid) + len(rejected) == len(raw)
+    reasons = rejected['reasons']
+    for row, rule in zip(rows, BROKEN):
+        assert reasons[row] == rule
+    assert reasons[rows[-1]] == 'rating_range;reviews_non_negative'
+    for rule in BROKEN:
+        added = 2 if rule in ('rating_range', 'reviews_non_negative') else 1
+        assert failures[rule] == sample_failures[rule] + added
+
+    raw.to_csv("amazon_scrape_data.csv", index=False)
+    cleaned = F.data_cleaning("amazon_scrape_data.csv")
+    conn = sqlite3.connect("laptop_prices.db")
+    quarantine = pd.read_sql_query("SELECT asin, reasons, raw FROM quarantine", conn)
+    runs = pd.read_sql_query("SELECT rule, failures FROM validation_runs", conn).set_index('rule')['failures']
+    conn.close()
+    assert len(quarantine) == len(rejected) == len(sample_rejected) + len(rows)
+    assert sorted(quarantine['reasons']) == sorted(reasons)
+    # the raw values are kept as they were scraped
+    assert any('"rating":7.5' in line for line in quarantine['raw'])
+    assert runs.drop('quarantined').to_dict() == failures and runs['quarantined'] == len(rejected)
+    assert not cleaned['asin'].isin(raw.loc[rows, 'asin']).any()
+
+
+def literal_first_delivery(value):
+    try:
+        return ast.literal_eval(value)[0]
+    except (ValueError, SyntaxError, IndexError, TypeError):
+        return "Info not available"
+
+
+def literal_specs(value):
+    try:
+        specs = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        specs = {}
+    return [specs.get(key) for key in F.SPEC_KEYS]
+
+
+def test_vectorized_parsers_match_literal_eval(workdir):
+    raw = pd.read_csv(SAMPLE_SCRAPE)
+    expected = pd.DataFrame([literal_specs(v) for v in raw['specs']], columns=F.SPEC_KEYS, index=raw.index)
+    parsed = F.parse_specs(raw['specs'])
+    pd.testing.assert_frame_equal(parsed, expected.astype(object).where(expected.notna(), None))
+    assert F.clean_delivery(raw['delivery']).tolist() == [literal_first_delivery(v) for v in raw['delivery']]
+
+    # and data_cleaning stores exactly those values, with the empty ones unified
+    raw.to_csv("amazon_scrape_data.csv", index=False)
+    cleaned = F.data_cleaning("amazon_scrape_data.csv").set_index('asin')
+    first = raw.drop_duplicates('asin').set_index('asin').loc[cleaned.index]
+    specs = pd.DataFrame([literal_specs(v) for v in first['specs']], columns=F.SPEC_KEYS, index=first.index)
+    specs = specs.replace(['-', 'None', 'none', '', 'nan', 'NaN'], None).fillna("Info not available")
+    pd.testing.assert_frame_equal(cleaned[F.SPEC_KEYS], specs)
+    assert cleaned['delivery'].tolist() == [literal_first_delivery(v) for v in first['delivery'].fillna('Info not available')]
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+import Functions as F
+
+KEYS = ['watch_id', 'asin', 'scrape_date']
+
+
+def reference_matches(rows, watches):
+    """Every watch against every row, the loop match_watches replaces"""
+    matched = []
+    for _, row in rows.iterrows():
+        ram = F.spec_to_gb(pd.Series([row['ram']])).fillna(0)[0]
+        drop = -(0 if pd.isna(row['price_change_percent']) else row['price_change_percent'])
+        for _, watch in watches.iterrows():
+            if watch['kind'] == 'asin':
+                hit = row['asin'] == watch['asin'] and row['extracted_price'] <= watch['max_price']
+            elif watch['kind'] == 'brand':
+                min_ram = 0 if pd.isna(watch['min_ram_gb']) else watch['min_ram_gb']
+                hit = row['brand'] == watch['brand'] and ram >= min_ram and row['extracted_price'] <= watch['max_price']
+            else:
+                hit = drop > 0 and drop > watch['min_drop_percent'] and \
+                    (pd.isna(watch['brand']) or watch['brand'] == row['brand'])
+            if hit:
+                matched.append((watch['watch_id'], row['asin'], row['scrape_date']))
+    return sorted(matched)
+
+
+def test_match_watches_equals_the_pairwise_loop():
+    rng = np.random.default_rng(7)
+    n = 300
+    brands = np.array(['Apple', 'Dell', 'HP', 'Lenovo'])
+    rows = pd.DataFrame({
+        'asin': [f"B{i:09d}" for i in range(n)],
+        'brand': brands[rng.integers(0, len(brands), n)],
+        'scrape_date': '2026-03-09',
+        'extracted_price': rng.uniform(200, 2500, n).round(2),
+        'ram': rng.choice(['8 GB', '16 GB', '32 GB', '1 TB', 'Info not available'], n),
+        'price_change_percent': np.where(rng.random(n) < 0.7, rng.uniform(-40, 20, n).round(1), np.nan),
+    })
+    watches = pd.DataFrame([
+        # kind, asin, brand, min_ram_gb, max_price, min_drop_percent
+        ('asin', rows['asin'][0], None, None, 5000, None),
+        ('asin', rows['asin'][1], None, None, 1, None),
+        ('brand', None, 'Dell', 16, 1500, None),
+        ('brand', None, 'Apple', None, 2000, None),
+        ('drop', None, None, None, None, 10),
+        ('drop', None, 'HP', None, None, 5),
+        ('drop', None, None, None, None, 30),
+        ('drop', None, 'Lenovo', None, None, 30),
+    ], columns=['kind', 'asin', 'brand', 'min_ram_gb', 'max_price', 'min_drop_percent'])
+    watches.insert(0, 'watch_id', range(1, len(watches) + 1))
+    watches['contact'] = 'someone@example.com'
+    # a drop exactly at a threshold is not "more than" it
+    rows.loc[2, 'price_change_percent'] = -10.0
+
+    matched = F.match_watches(rows, watches)
+    assert sorted(map(tuple, matched[KEYS].values.tolist())) == reference_matches(rows, watches)
+    assert set(matched['watch_id']) == set(watches['watch_id']) - {2}
+    assert not ((matched['asin'] == rows['asin'][2]) & (matched['watch_id'] == 5)).any()
+
+
+def test_evaluate_watches_queues_each_match_once(two_weeks):
+    changed = F.fetch_changed_rows()
+    drops = changed[changed['price_change_percent'] < -5]
+    assert len(drops)
+    F.add_watch('drop', min_drop_percent=5, contact='someone@example.com')
+    asin, price = changed['asin'].iloc[0], changed['extracted_price'].iloc[0]
+    F.add_watch('asin', asin=asin, max_price=price + 1, contact='someone@example.com')
+
+    assert F.evaluate_watches(changed) == len(drops) + 1
+    assert F.evaluate_watches(changed) == 0  # the same scrape never notifies twice
+    sent = F.drain_watch_outbox(limit=1000)
+    assert sorted(sent['asin']) == sorted(list(drops['asin']) + [asin])
+    assert F.drain_watch_outbox().empty